@@ -0,0 +1,121 @@
+"""
+Article representation benchmark.
+
+Compares the former representation of search results, one dict per article serialized by
+FastMCP's default pydantic serializer, with Article records serialized by orjson. For both
+it reports the memory retained per article after formatting a decoded NewsAPI payload, the
+time to format the payload and the time to serialize a search_news response.
+
+Usage (from the python directory):
+    python -m benchmarks.articles --articles 10000
+    python -m benchmarks.articles --articles 100 --repeat 200 --output articles.json
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from fastmcp.tools.tool import default_serializer
+
+from benchmarks.stub_servers import _article
+from src.services.articles import Article
+from src.services.serialization import dumps
+
+
+def newsapi_payload(count: int) -> str:
+    """Return a NewsAPI /everything response body with `count` generated articles."""
+    articles = [_article("benchmark topic", index) for index in range(count)]
+    for index, article in enumerate(articles):
+        article["publishedAt"] = f"2024-01-{1 + index % 28:02d}T{index % 24:02d}:{index % 60:02d}:00Z"
+    return json.dumps({"status": "ok", "totalResults": count, "articles": articles})
+
+
+def format_as_dicts(raw_articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The former formatting: a fresh dict of five fields per article."""
+    return [
+        {
+            "title": article["title"],
+            "description": article["description"],
+            "url": article["url"],
+            "source_name": article["source"]["name"],
+            "published_at": article["publishedAt"],
+        }
+        for article in raw_articles
+    ]
+
+
+def format_as_records(raw_articles: List[Dict[str, Any]]) -> List[Article]:
+    return [Article.from_newsapi(article) for article in raw_articles]
+
+
+def retained_bytes_per_article(payload: str, formatter: Callable[[List[Dict[str, Any]]], List[Any]]) -> float:
+    """Decode the payload, format it, drop the raw payload and measure what the result keeps alive."""
+    gc.collect()
+    tracemalloc.start()
+    raw = json.loads(payload)
+    formatted = formatter(raw["articles"])
+    del raw
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained / max(1, len(formatted))
+
+
+def best_time_ms(function: Callable[[], Any], repeat: int) -> float:
+    """Return the fastest of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def compare(count: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Measure both representations for a page of `count` articles."""
+    payload = newsapi_payload(count)
+    raw_articles = json.loads(payload)["articles"]
+    quota = {"daily_limit": 100, "daily_remaining": 42, "resets_at": "2024-01-02T00:00:00+00:00"}
+    variants = {
+        "dict+pydantic": (format_as_dicts, default_serializer),
+        "Article+orjson": (format_as_records, dumps),
+    }
+
+    results = {}
+    for name, (formatter, serializer) in variants.items():
+        response = {"articles": formatter(raw_articles), "cursor": "2024-01-28T23:59:00Z", "quota": quota}
+        results[name] = {
+            "bytes_per_article": round(retained_bytes_per_article(payload, formatter), 1),
+            "format_ms": round(best_time_ms(lambda: formatter(raw_articles), repeat), 3),
+            "serialize_ms": round(best_time_ms(lambda: serializer(response), repeat), 3),
+            "response_bytes": len(serializer(response).encode()),
+        }
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Memory and CPU cost of the search result representation")
+    parser.add_argument("--articles", type=int, default=10000, help="articles in the measured page")
+    parser.add_argument("--repeat", type=int, default=20, help="timing runs, the fastest is reported")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    results = compare(args.articles, args.repeat)
+
+    columns = ["bytes_per_article", "format_ms", "serialize_ms", "response_bytes"]
+    print(f"{'representation':<16}" + "".join(f"{column:>20}" for column in columns))
+    for name, result in results.items():
+        print(f"{name:<16}" + "".join(f"{result[column]:>20}" for column in columns))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"articles": args.articles, "results": results}, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Offline load test of the MCP server.
+
+Starts the stub NewsAPI and OpenAI servers, launches `python -m src.main` against them,
+drives each tool from concurrent MCP SSE clients and reports latency percentiles,
+throughput, error counts and server memory per tool.
+
+Usage (from the python directory):
+    python -m benchmarks.run --clients 16 --requests 20
+    python -m benchmarks.run --tools search_news --newsapi-error-rate 0.05 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from fastmcp import Client
+from fastmcp.client.transports import SSETransport
+
+from benchmarks.stub_servers import StubServer, UpstreamProfile, create_newsapi_app, create_openai_app, free_port
+
+PYTHON_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MEMORY_SAMPLE_INTERVAL = 0.1
+
+TOOL_ARGUMENTS = {
+    "search_news": lambda query: {"query": query, "language": "en", "page_size": 10},
+    "search_news_pages": lambda query: {"query": query, "language": "en", "max_articles": 500, "stream_only": True},
+    "extract_information_from_article": lambda query: {"query": query, "language": "en"},
+    "extract_key_info_and_sentiment": lambda query: {"query": query, "language": "en", "max_articles_to_analyze": 10},
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Return the resident set size of a process, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def start_server(port: int, newsapi_url: str, openai_url: str, extra_env: Dict[str, str],
+                 poll_interval: float = 0.1) -> subprocess.Popen:
+    """Launch the MCP server against the stub upstreams and wait until it accepts connections."""
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "NEWSAPI_API_KEY": "benchmark",
+        "OPENAI_API_KEY": "benchmark",
+        "NEWSAPI_BASE_URL": f"{newsapi_url}/v2",
+        "OPENAI_BASE_URL": f"{openai_url}/v1",
+        # Quota and persistent caches would make runs depend on earlier runs
+        "NEWSAPI_DAILY_LIMIT": "0",
+        "NEWSAPI_REQUESTS_PER_SECOND": "0",
+        "ARTICLE_STORE_PATH": "",
+        "LLM_CACHE_PATH": "",
+        **extra_env,
+    }
+    server = subprocess.Popen([sys.executable, "-m", "src.main"], cwd=PYTHON_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"MCP server exited with code {server.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return server
+        except OSError:
+            time.sleep(poll_interval)
+    server.terminate()
+    raise RuntimeError("MCP server did not start within 30s")
+
+
+def _is_error(result: Any) -> bool:
+    try:
+        payload = json.loads(result[0].text)
+    except (IndexError, AttributeError, ValueError):
+        return False
+    return isinstance(payload, dict) and bool(payload.get("error"))
+
+
+async def _client_loop(url: str, tool: str, client_index: int, requests: int, distinct_queries: int,
+                       latencies: List[float], errors: List[str]) -> None:
+    async with Client(SSETransport(url)) as client:
+        for request_index in range(requests):
+            query = f"benchmark topic {(client_index * requests + request_index) % distinct_queries}"
+            started = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, TOOL_ARGUMENTS[tool](query))
+                if _is_error(result):
+                    errors.append("error response")
+            except Exception as e:
+                errors.append(type(e).__name__)
+            latencies.append(time.perf_counter() - started)
+
+
+async def _sample_memory(pid: int, samples: List[int], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        rss = rss_bytes(pid)
+        if rss is not None:
+            samples.append(rss)
+        try:
+            await asyncio.wait_for(stop.wait(), MEMORY_SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def benchmark_tool(url: str, server_pid: int, tool: str, clients: int, requests: int,
+                         distinct_queries: int) -> Dict[str, Any]:
+    """Run one tool from concurrent clients and summarize latency, throughput, errors and memory."""
+    latencies: List[float] = []
+    errors: List[str] = []
+    memory_samples: List[int] = []
+    stop_sampling = asyncio.Event()
+    sampler = asyncio.create_task(_sample_memory(server_pid, memory_samples, stop_sampling))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client_loop(url, tool, index, requests, distinct_queries, latencies, errors) for index in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+    stop_sampling.set()
+    await sampler
+
+    ordered = sorted(latencies)
+    return {
+        "tool": tool,
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_kinds": {kind: errors.count(kind) for kind in set(errors)},
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        "server_rss_peak_mb": round(max(memory_samples) / 2 ** 20, 1) if memory_samples else None,
+        "server_rss_end_mb": round(memory_samples[-1] / 2 ** 20, 1) if memory_samples else None,
+    }
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    columns = ("tool", "requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "server_rss_peak_mb")
+    widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print("  ".join(str(result[column]).ljust(width) for column, width in zip(columns, widths)))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test of the news MCP server")
+    parser.add_argument("--tools", nargs="+", choices=sorted(TOOL_ARGUMENTS), default=list(TOOL_ARGUMENTS))
+    parser.add_argument("--clients", type=int, default=8, help="concurrent MCP SSE clients per tool")
+    parser.add_argument("--requests", type=int, default=10, help="sequential calls per client")
+    parser.add_argument("--distinct-queries", type=int, default=1000,
+                        help="size of the query pool; smaller pools measure cache hits")
+    parser.add_argument("--newsapi-latency", type=float, default=0.08)
+    parser.add_argument("--newsapi-jitter", type=float, default=0.04)
+    parser.add_argument("--newsapi-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.4)
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-stream-chunk-delay", type=float, default=0.005)
+    parser.add_argument("--server-env", nargs="*", default=[], metavar="NAME=VALUE",
+                        help="extra environment for the MCP server, e.g. SENTIMENT_CHUNK_SIZE=5")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    newsapi = StubServer(create_newsapi_app(
+        UpstreamProfile(args.newsapi_latency, args.newsapi_jitter, args.newsapi_error_rate))).start()
+    openai_stub = StubServer(create_openai_app(
+        UpstreamProfile(args.llm_latency, args.llm_jitter, args.llm_error_rate), args.llm_stream_chunk_delay)).start()
+    port = free_port()
+    extra_env = dict(assignment.split("=", 1) for assignment in args.server_env)
+    server = start_server(port, newsapi.url, openai_stub.url, extra_env)
+    try:
+        results = []
+        for tool in args.tools:
+            results.append(await benchmark_tool(f"http://127.0.0.1:{port}/", server.pid, tool, args.clients,
+                                                args.requests, args.distinct_queries))
+        return results
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        newsapi.stop()
+        openai_stub.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"arguments": vars(args), "results": results}, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Cold start benchmark of the MCP server.
+
+Profiles `python -X importtime -c "import src.main"` and lists the modules with the largest
+cumulative import time, then repeatedly launches `python -m src.main` against zero-latency
+stub upstreams and reports the time until it accepts a TCP connection and the latency of the
+first LLM-backed tool call, which pays for any client libraries that are still loaded lazily.
+
+Usage (from the python directory):
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --first-call-delay 3 --server-env LLM_WARMUP=false --output startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from fastmcp import Client
+from fastmcp.client.transports import SSETransport
+
+from benchmarks.run import PYTHON_DIR, percentile, start_server
+from benchmarks.stub_servers import StubServer, UpstreamProfile, create_newsapi_app, create_openai_app, free_port
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+CONNECT_POLL_INTERVAL = 0.005
+FIRST_CALL_TOOL = "extract_information_from_article"
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse the stderr of `python -X importtime` into one entry per imported module."""
+    timings = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return timings
+
+
+def profile_imports(module: str = "src.main") -> List[ImportTiming]:
+    """Import a module in a fresh interpreter with -X importtime and return its timings."""
+    env = {**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "benchmark"}
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=PYTHON_DIR,
+                               env=env, capture_output=True, text=True, check=True)
+    return parse_importtime(completed.stderr)
+
+
+async def _first_call(url: str, delay: float) -> float:
+    await asyncio.sleep(delay)
+    started = time.perf_counter()
+    async with Client(SSETransport(url)) as client:
+        await client.call_tool(FIRST_CALL_TOOL, {"query": "startup benchmark", "language": "en"})
+    return time.perf_counter() - started
+
+
+def measure_cold_start(newsapi_url: str, openai_url: str, extra_env: Dict[str, str],
+                       first_call_delay: float = 0.0) -> Dict[str, float]:
+    """Launch one server and time its first accepted connection and first LLM tool call."""
+    port = free_port()
+    started = time.perf_counter()
+    server = start_server(port, newsapi_url, openai_url, extra_env, poll_interval=CONNECT_POLL_INTERVAL)
+    connect_seconds = time.perf_counter() - started
+    try:
+        first_call_seconds = asyncio.run(_first_call(f"http://127.0.0.1:{port}/", first_call_delay))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return {"connect_ms": round(connect_seconds * 1000, 1), "first_call_ms": round(first_call_seconds * 1000, 1)}
+
+
+def summarize(runs: List[Dict[str, float]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {"runs": len(runs)}
+    for key in ("connect_ms", "first_call_ms"):
+        ordered = sorted(run[key] for run in runs)
+        summary[f"{key}_p50"] = percentile(ordered, 0.50)
+        summary[f"{key}_max"] = ordered[-1] if ordered else 0.0
+    return summary
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cold start benchmark of the news MCP server")
+    parser.add_argument("--runs", type=int, default=5, help="server launches to time")
+    parser.add_argument("--top", type=int, default=15, help="modules to list by cumulative import time")
+    parser.add_argument("--first-call-delay", type=float, default=0.0,
+                        help="seconds between the first accepted connection and the first tool call")
+    parser.add_argument("--server-env", nargs="*", default=[], metavar="NAME=VALUE",
+                        help="extra environment for the MCP server, e.g. LLM_WARMUP=false")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+
+    timings = profile_imports()
+    total = next((timing for timing in timings if timing.module == "src.main"), None)
+    print(f"import src.main: {total.cumulative_us / 1000:.1f} ms" if total else "import src.main: not found")
+    top = sorted(timings, key=lambda timing: timing.cumulative_us, reverse=True)[:args.top]
+    for timing in top:
+        print(f"  {timing.cumulative_us / 1000:8.1f} ms  {timing.self_us / 1000:7.1f} ms self  {timing.module}")
+
+    newsapi = StubServer(create_newsapi_app(UpstreamProfile(latency=0))).start()
+    openai_stub = StubServer(create_openai_app(UpstreamProfile(latency=0), stream_chunk_delay=0)).start()
+    extra_env = dict(assignment.split("=", 1) for assignment in args.server_env)
+    try:
+        runs = [measure_cold_start(newsapi.url, openai_stub.url, extra_env, args.first_call_delay)
+                for _ in range(args.runs)]
+    finally:
+        newsapi.stop()
+        openai_stub.stop()
+    summary = summarize(runs)
+    print(f"time to first accepted connection: p50 {summary['connect_ms_p50']} ms, "
+          f"max {summary['connect_ms_max']} ms")
+    print(f"first {FIRST_CALL_TOOL} call: p50 {summary['first_call_ms_p50']} ms, "
+          f"max {summary['first_call_ms_max']} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({
+                "arguments": vars(args),
+                "import_ms": total.cumulative_us / 1000 if total else None,
+                "top_imports": [timing._asdict() for timing in top],
+                "runs": runs,
+                "summary": summary,
+            }, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
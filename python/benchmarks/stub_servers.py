@@ -0,0 +1,180 @@
+"""
+Stub upstream servers for offline benchmarks.
+
+This module serves a NewsAPI-compatible /v2/everything endpoint and an OpenAI-compatible
+/v1/chat/completions endpoint (plain and streamed) with configurable latency, jitter and
+error rate, so the MCP server can be load tested without network access, API keys or
+quota. Completions are chosen from the response schema requested by the prompt, so they
+parse like real model output.
+"""
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+STREAM_CHUNK_CHARS = 16
+# Number of results every stub search has, so deep paginated searches can be measured
+STUB_TOTAL_RESULTS = 1000
+# Mostly neutral wording, so the local sentiment tier escalates and the LLM path is exercised
+ARTICLE_WORDS = (
+    "officials", "announced", "report", "market", "policy", "company", "quarter", "analysts",
+    "meeting", "government", "plans", "industry", "statement", "regional", "update", "sources",
+)
+
+
+class UpstreamProfile(NamedTuple):
+    latency: float = 0.05
+    jitter: float = 0.0
+    error_rate: float = 0.0
+
+
+async def _simulate(profile: UpstreamProfile) -> bool:
+    """Sleep for the profile's latency and return whether this request should fail."""
+    await asyncio.sleep(max(0.0, profile.latency + random.uniform(-profile.jitter, profile.jitter)))
+    return random.random() < profile.error_rate
+
+
+def _article(query: str, index: int) -> Dict[str, Any]:
+    words = " ".join(random.choices(ARTICLE_WORDS, k=12))
+    return {
+        "source": {"id": None, "name": f"Stub Source {index % 7}"},
+        "author": "Benchmark",
+        "title": f"{query.title()} story {index}: {words[:60]}",
+        "description": f"{words} ({random.getrandbits(32):08x})",
+        "url": f"https://stub.example/{query.replace(' ', '-')}/{index}/{random.getrandbits(32):08x}",
+        "urlToImage": None,
+        "publishedAt": "2024-01-01T12:00:00Z",
+        "content": words,
+    }
+
+
+def create_newsapi_app(profile: UpstreamProfile) -> Starlette:
+    """Create a NewsAPI stand-in serving generated articles under /v2/everything."""
+    async def everything(request: Request) -> JSONResponse:
+        if await _simulate(profile):
+            return JSONResponse({"status": "error", "code": "unexpectedError", "message": "Stub NewsAPI error"},
+                                status_code=500)
+        query = request.query_params.get("q", "")
+        page_size = int(request.query_params.get("pageSize", 20))
+        first = (int(request.query_params.get("page", 1)) - 1) * page_size
+        articles = [_article(query, index) for index in range(first, min(first + page_size, STUB_TOTAL_RESULTS))]
+        return JSONResponse({"status": "ok", "totalResults": STUB_TOTAL_RESULTS, "articles": articles})
+
+    return Starlette(routes=[Route("/v2/everything", everything)])
+
+
+def fake_completion_content(prompt: str) -> str:
+    """Return a JSON answer for whichever structured output the prompt asks for."""
+    if "overall_sentiment" in prompt:
+        answer = {
+            "overall_sentiment": random.choice(("positive", "negative", "neutral")),
+            "sentiment_confidence": "medium",
+            "key_entities": {"people": ["Jane Doe"], "organizations": ["Stub Corp"], "locations": ["Springfield"]},
+            "key_takeaway_summary": "Stub coverage reports steady developments across the benchmark topic.",
+        }
+    elif "key_quotes" in prompt:
+        answer = {
+            "people": ["Jane Doe"],
+            "organizations": ["Stub Corp"],
+            "locations": ["Springfield"],
+            "key_quotes": ["We expect steady progress this quarter."],
+        }
+    else:
+        answer = {"key_takeaway_summary": "Combined stub summary of the benchmark topic."}
+    return f"```json\n{json.dumps(answer)}\n```"
+
+
+def _usage(prompt: str, content: str) -> Dict[str, int]:
+    prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def create_openai_app(profile: UpstreamProfile, stream_chunk_delay: float = 0.005) -> Starlette:
+    """Create an OpenAI stand-in serving /v1/chat/completions, with and without streaming."""
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if await _simulate(profile):
+            return JSONResponse({"error": {"message": "Stub OpenAI error", "type": "server_error"}}, status_code=500)
+
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        content = fake_completion_content(prompt)
+        base = {"id": f"chatcmpl-{random.getrandbits(48):012x}", "created": int(time.time()),
+                "model": body.get("model", "stub")}
+
+        if not body.get("stream"):
+            return JSONResponse({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": _usage(prompt, content),
+            })
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        async def events():
+            for start in range(0, len(content), STREAM_CHUNK_CHARS):
+                await asyncio.sleep(stream_chunk_delay)
+                delta = {"content": content[start:start + STREAM_CHUNK_CHARS]}
+                if start == 0:
+                    delta["role"] = "assistant"
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(final)}\n\n"
+            if include_usage:
+                usage = {**base, "object": "chat.completion.chunk", "choices": [], "usage": _usage(prompt, content)}
+                yield f"data: {json.dumps(usage)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+
+
+def free_port() -> int:
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class StubServer:
+    """Runs an ASGI app with uvicorn on a background thread."""
+
+    def __init__(self, app: Starlette, port: Optional[int] = None):
+        self.port = port or free_port()
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Stub server on port {self.port} did not start")
+            time.sleep(0.02)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
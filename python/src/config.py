@@ -7,6 +7,7 @@ It also includes a singleton instance of the Config class that can be accessed g
 from dotenv import load_dotenv
 import os
 import logging
+import tempfile
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,6 +23,68 @@ class Config:
         self.OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
         self.TEMPERATURE = os.getenv("TEMPERATURE")
         self.PORT = int(os.getenv("PORT", 3000))
+        self.HOST = os.getenv("HOST", "0.0.0.0")
+        self.WORKERS = int(os.getenv("WORKERS", 1))
+        self.WORKER_BASE_PORT = int(os.getenv("WORKER_BASE_PORT", 0))
+        self.WORKER_INDEX = int(os.getenv("WORKER_INDEX", 0))
+        self.WORKER_COUNT = int(os.getenv("WORKER_COUNT", 1))
+        self.NEWSAPI_BASE_URL = os.getenv("NEWSAPI_BASE_URL", "https://newsapi.org/v2")
+        self.OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+        self.NEWSAPI_TIMEOUT = float(os.getenv("NEWSAPI_TIMEOUT", 10.0))
+        self.NEWSAPI_CONNECT_TIMEOUT = float(os.getenv("NEWSAPI_CONNECT_TIMEOUT", 5.0))
+        self.NEWSAPI_MAX_CONNECTIONS = int(os.getenv("NEWSAPI_MAX_CONNECTIONS", 20))
+        self.NEWSAPI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("NEWSAPI_MAX_KEEPALIVE_CONNECTIONS", 10))
+        self.NEWSAPI_KEEPALIVE_EXPIRY = float(os.getenv("NEWSAPI_KEEPALIVE_EXPIRY", 30.0))
+        self.NEWSAPI_DAILY_LIMIT = int(os.getenv("NEWSAPI_DAILY_LIMIT", 100))
+        self.NEWSAPI_REQUESTS_PER_SECOND = float(os.getenv("NEWSAPI_REQUESTS_PER_SECOND", 1.0))
+        self.NEWSAPI_BURST = int(os.getenv("NEWSAPI_BURST", 5))
+        self.NEWSAPI_QUOTA_WAIT_TIMEOUT = float(os.getenv("NEWSAPI_QUOTA_WAIT_TIMEOUT", 5.0))
+        self.SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 300.0))
+        self.SEARCH_CACHE_STALE_WHILE_REVALIDATE = float(os.getenv("SEARCH_CACHE_STALE_WHILE_REVALIDATE", 60.0))
+        self.SEARCH_CACHE_STALE_IF_ERROR = float(os.getenv("SEARCH_CACHE_STALE_IF_ERROR", 3600.0))
+        self.SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+        self.SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "")
+        self.SEARCH_PAGE_CONCURRENCY = int(os.getenv("SEARCH_PAGE_CONCURRENCY", 3))
+        self.SEARCH_PAGES_MAX_ARTICLES = int(os.getenv("SEARCH_PAGES_MAX_ARTICLES", 1000))
+        self.SEARCH_INCREMENTAL = os.getenv("SEARCH_INCREMENTAL", "true").lower() == "true"
+        self.SEARCH_FETCH_LEASE = float(os.getenv("SEARCH_FETCH_LEASE", 30.0))
+        self.ARTICLE_STORE_PATH = os.getenv("ARTICLE_STORE_PATH", os.path.join(tempfile.gettempdir(), "news_articles.db"))
+        self.ARTICLE_STORE_MAX_AGE = float(os.getenv("ARTICLE_STORE_MAX_AGE", 900.0))
+        self.ARTICLE_STORE_RETENTION = float(os.getenv("ARTICLE_STORE_RETENTION", 7 * 24 * 3600.0))
+        self.LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "news_llm_cache.db"))
+        self.LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        self.EXTRACT_BATCH_MAX_CONCURRENCY = int(os.getenv("EXTRACT_BATCH_MAX_CONCURRENCY", 5))
+        self.SENTIMENT_TOKEN_BUDGET = int(os.getenv("SENTIMENT_TOKEN_BUDGET", 3000))
+        self.SENTIMENT_CHUNK_SIZE = int(os.getenv("SENTIMENT_CHUNK_SIZE", 10))
+        self.SENTIMENT_MAX_ARTICLES = int(os.getenv("SENTIMENT_MAX_ARTICLES", 100))
+        self.LOCAL_SENTIMENT_CONFIDENCE_THRESHOLD = float(os.getenv("LOCAL_SENTIMENT_CONFIDENCE_THRESHOLD", 0.6))
+        self.LOCAL_SENTIMENT_LEXICON_PATH = os.getenv("LOCAL_SENTIMENT_LEXICON_PATH", "")
+        self.GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "")
+        self.DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", 0.6))
+        self.UPSTREAM_MAX_ATTEMPTS = int(os.getenv("UPSTREAM_MAX_ATTEMPTS", 3))
+        self.UPSTREAM_RETRY_BASE_DELAY = float(os.getenv("UPSTREAM_RETRY_BASE_DELAY", 0.2))
+        self.UPSTREAM_RETRY_MAX_DELAY = float(os.getenv("UPSTREAM_RETRY_MAX_DELAY", 2.0))
+        self.UPSTREAM_RETRY_BUDGET_RATIO = float(os.getenv("UPSTREAM_RETRY_BUDGET_RATIO", 0.2))
+        self.UPSTREAM_RETRY_BUDGET_RESERVE = int(os.getenv("UPSTREAM_RETRY_BUDGET_RESERVE", 5))
+        self.CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+        self.CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", 30.0))
+        self.NEWSAPI_HEDGING = os.getenv("NEWSAPI_HEDGING", "false").lower() == "true"
+        self.OPENAI_HEDGING = os.getenv("OPENAI_HEDGING", "false").lower() == "true"
+        self.HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", 0.05))
+        self.TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "").strip().lower()
+        self.TRACING_JSON_PATH = os.getenv("TRACING_JSON_PATH", os.path.join(tempfile.gettempdir(), "news_traces.jsonl"))
+        self.TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+        self.TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "news-mcp-server")
+        self.LLM_WARMUP = os.getenv("LLM_WARMUP", "true").lower() == "true"
+        self.PREFETCH_QUERIES = os.getenv("PREFETCH_QUERIES", "")
+        self.PREFETCH_QUERIES_FILE = os.getenv("PREFETCH_QUERIES_FILE", "")
+        self.PREFETCH_LANGUAGE = os.getenv("PREFETCH_LANGUAGE", "en")
+        self.PREFETCH_PAGE_SIZE = int(os.getenv("PREFETCH_PAGE_SIZE", 5))
+        self.PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", 240.0))
+        self.PREFETCH_JITTER = float(os.getenv("PREFETCH_JITTER", 0.1))
+        self.PREFETCH_SENTIMENT = os.getenv("PREFETCH_SENTIMENT", "false").lower() == "true"
+        self.PREFETCH_QUOTA_SHARE = float(os.getenv("PREFETCH_QUOTA_SHARE", 0.5))
+        self.PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", 2))
         
         logger.info(f"Config initialized. OPENAI_API_KEY loaded: {bool(self.OPENAI_API_KEY)}")
         logger.info(f"Config initialized. NEWSAPI_API_KEY loaded: {bool(self.NEWSAPI_API_KEY)}")
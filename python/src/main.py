@@ -1,24 +1,79 @@
+import asyncio
 import sys
 import os
 import logging
+import threading
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.config import config
-from src.tools.search_news import search_news
-from src.tools.extract_tool import extract_information_from_article
-from src.tools.sentiment_tool import extract_key_info_and_sentiment
+from src.prefetch import prefetcher
+from src.services.llm import llm_service, openai_resilience
+from src.services.llm_cache import llm_result_cache
+from src.services.metrics import metrics, instrument_tool
+from src.services.news_api import newsapi_resilience
+from src.services.tracing import trace_tool
+from src.services.quota import newsapi_quota
+from src.services.serialization import dumps
+from src.tools.search_news import search_news, search_cache, search_flight
+from src.tools.search_pages import search_news_pages
+from src.tools.extract_tool import extract_information_from_article, extract_information_from_articles
+from src.tools.sentiment_tool import extract_key_info_and_sentiment, sentiment_escalations
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-mcp = FastMCP("news_assistant_mcp")
+# Tool responses are encoded with orjson instead of the default pydantic serializer
+mcp = FastMCP("news_assistant_mcp", tool_serializer=dumps)
 
-mcp.tool()(search_news)
-mcp.tool()(extract_information_from_article)
-mcp.tool()(extract_key_info_and_sentiment)
+mcp.tool()(instrument_tool(trace_tool(search_news)))
+mcp.tool()(instrument_tool(trace_tool(search_news_pages)))
+mcp.tool()(instrument_tool(trace_tool(extract_information_from_article)))
+mcp.tool()(instrument_tool(trace_tool(extract_information_from_articles)))
+mcp.tool()(instrument_tool(trace_tool(extract_key_info_and_sentiment)))
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> JSONResponse:
+    """Expose cache, request coalescing, quota and upstream resilience counters for scraping."""
+    # The shared search cache reads its occupancy from SQLite
+    search_cache_stats = await asyncio.to_thread(search_cache.stats)
+    return JSONResponse({
+        "search_cache": search_cache_stats,
+        "search_flight": search_flight.stats(),
+        "llm_cache": llm_result_cache.stats() if llm_result_cache is not None else None,
+        "sentiment_escalations": sentiment_escalations.stats(),
+        "newsapi_quota": newsapi_quota.stats(),
+        "newsapi_resilience": newsapi_resilience.stats(),
+        "openai_resilience": openai_resilience.stats(),
+        "prefetch": prefetcher.stats(),
+    })
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Expose tool and upstream latency histograms, in-flight gauges, error and token counters."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+async def serve() -> None:
+    """Serve MCP over SSE with the watchlist prefetcher running on the same event loop."""
+    prefetcher.start()
+    try:
+        await mcp.run_async(transport="sse", host=config.HOST, port=config.PORT, path="/")
+    finally:
+        await prefetcher.stop()
 
 if __name__ == "__main__":
-    logger.info("Starting MCP server for news assistant")
-    mcp.run(transport="sse", host="0.0.0.0", port=config.PORT, path="/")
+    if config.WORKERS > 1:
+        from src.supervisor import run_supervisor
+        logger.info(f"Starting MCP server for news assistant with {config.WORKERS} workers")
+        run_supervisor()
+    else:
+        logger.info("Starting MCP server for news assistant")
+        if not config.OPENAI_API_KEY:
+            logger.warning("No OpenAI API key configured, LLM tools will fail until one is provided")
+        elif config.LLM_WARMUP:
+            # The LLM client libraries are imported lazily; load them off the main thread while the server starts
+            threading.Thread(target=llm_service.warm_up, name="llm-warmup", daemon=True).start()
+        asyncio.run(serve())
@@ -0,0 +1,201 @@
+"""
+Watchlist prefetch module.
+
+A PrefetchScheduler keeps the search results of a watchlist of hot queries warm. Every query is
+refreshed on its own interval, shorter than the search cache TTL, so interactive calls for
+it are served from the cache. With PREFETCH_SENTIMENT the sentiment analysis is precomputed
+too, which fills the LLM result cache.
+
+Refreshes are spread out: the first ones are staggered evenly over one interval and every
+later one is jittered, so the watchlist never fires at once. Prefetching only spends its
+share of the NewsAPI quota. The interval is stretched until the watchlist fits in
+PREFETCH_QUOTA_SHARE of the daily and per-second limits, and refreshes are skipped once the
+remaining daily quota is down to what is reserved for interactive calls.
+"""
+import asyncio
+import logging
+import random
+from typing import Any, Dict, List, Optional
+
+from src.config import config
+from src.services.quota import QuotaScheduler, QuotaExceededError, SECONDS_PER_DAY, newsapi_quota
+from src.services.tracing import tracer
+from src.tools.search_news import refresh_search
+from src.tools.sentiment_tool import precompute_sentiment
+
+logger = logging.getLogger(__name__)
+
+
+def load_watchlist(queries: str, path: str = "") -> List[str]:
+    """
+    Read the watchlist from a comma-separated list and an optional file with one query per line.
+
+    Blank lines, lines starting with "#" and duplicates (ignoring case) are dropped.
+    """
+    candidates = queries.split(",")
+    if path:
+        try:
+            with open(path, encoding="utf-8") as watchlist_file:
+                candidates.extend(line for line in watchlist_file if not line.lstrip().startswith("#"))
+        except OSError as e:
+            logger.error(f"Failed to read prefetch watchlist {path}: {str(e)}")
+
+    watchlist, seen = [], set()
+    for candidate in candidates:
+        query = " ".join(candidate.split())
+        if query and query.lower() not in seen:
+            seen.add(query.lower())
+            watchlist.append(query)
+    return watchlist
+
+
+def quota_interval(query_count: int, interval: float, quota: QuotaScheduler, share: float) -> float:
+    """Return the shortest interval, at least the requested one, at which the queries fit in their quota share."""
+    if query_count == 0 or share <= 0:
+        return interval
+    minimum = 0.0
+    if quota.daily_limit:
+        minimum = query_count * SECONDS_PER_DAY / (quota.daily_limit * share)
+    if quota.requests_per_second:
+        minimum = max(minimum, query_count / (quota.requests_per_second * share))
+    return max(interval, minimum)
+
+
+class PrefetchScheduler:
+    """Refreshes a watchlist of queries in the background, spread over time and within a quota share."""
+
+    def __init__(
+        self,
+        queries: List[str],
+        language: str = "en",
+        page_size: int = 5,
+        interval: float = 240.0,
+        jitter: float = 0.1,
+        sentiment: bool = False,
+        quota: QuotaScheduler = newsapi_quota,
+        quota_share: float = 0.5,
+        concurrency: int = 2,
+    ):
+        """
+        Create the scheduler.
+
+        Args:
+            queries: Watchlist of queries to keep warm
+            language: News language of the refreshed searches
+            page_size: Page size of the refreshed searches; also the number of articles the
+                precomputed sentiment analysis covers, so both match interactive defaults
+            interval: Seconds between two refreshes of a query, stretched to fit the quota share
+            jitter: Random fraction by which every interval is lengthened or shortened
+            sentiment: Also precompute the sentiment analysis of each refreshed result
+            quota: Quota the refreshes are charged to
+            quota_share: Fraction of the quota prefetching may use; the rest is reserved for
+                interactive calls
+            concurrency: Maximum number of refreshes running at once
+        """
+        self.queries = queries
+        self.language = language
+        self.page_size = page_size
+        self.jitter = jitter
+        self.sentiment = sentiment
+        self.quota = quota
+        self.quota_share = quota_share
+        self.concurrency = concurrency
+        self.interval = quota_interval(len(queries), interval, quota, quota_share)
+        if self.interval > interval:
+            logger.warning(f"Prefetch interval stretched from {interval:.0f}s to {self.interval:.0f}s "
+                           f"to keep {len(queries)} queries within {quota_share:.0%} of the {quota.name} quota")
+        if queries and self.interval >= config.SEARCH_CACHE_TTL:
+            logger.warning(f"Prefetch interval of {self.interval:.0f}s is not below SEARCH_CACHE_TTL "
+                           f"({config.SEARCH_CACHE_TTL:.0f}s), prefetched results will expire between refreshes")
+
+        self._tasks: List[asyncio.Task] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._counters = {"refreshed": 0, "failed": 0, "skipped_quota": 0, "sentiment_precomputed": 0}
+
+    def _reserved_for_interactive(self) -> int:
+        return int(self.quota.daily_limit * (1 - self.quota_share)) if self.quota.daily_limit else 0
+
+    def _quota_reserved(self) -> bool:
+        remaining = self.quota.remaining()["daily_remaining"]
+        return remaining is not None and remaining <= self._reserved_for_interactive()
+
+    def next_delay(self) -> float:
+        """Return the jittered delay until the next refresh of a query."""
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def refresh(self, query: str) -> None:
+        """Refresh one query now, unless the remaining quota is reserved for interactive calls."""
+        if self._quota_reserved():
+            self._counters["skipped_quota"] += 1
+            logger.info(f"Skipping prefetch of '{query}', the remaining {self.quota.name} quota is reserved")
+            return
+
+        with tracer.span("prefetch.refresh", root=True, query=query, sentiment=self.sentiment):
+            try:
+                refreshed = await refresh_search(query, self.language, self.page_size)
+            except QuotaExceededError as e:
+                self._counters["skipped_quota"] += 1
+                logger.warning(f"Skipping prefetch of '{query}', {self.quota.name} quota exhausted: {str(e)}")
+                return
+            except Exception as e:
+                self._counters["failed"] += 1
+                logger.warning(f"Prefetch of '{query}' failed: {str(e)}")
+                return
+            self._counters["refreshed"] += 1
+
+            if self.sentiment:
+                # Analyzes the result just refreshed, so this costs no extra NewsAPI quota and
+                # neither counts as a search cache hit nor as a user sentiment request
+                result = await precompute_sentiment(query, refreshed)
+                if "error" in result:
+                    logger.warning(f"Precomputing sentiment for '{query}' failed: {result.get('message', result['error'])}")
+                else:
+                    self._counters["sentiment_precomputed"] += 1
+
+    async def _run_query(self, query: str, initial_delay: float) -> None:
+        await asyncio.sleep(initial_delay)
+        while True:
+            async with self._semaphore:
+                await self.refresh(query)
+            await asyncio.sleep(self.next_delay())
+
+    def start(self) -> None:
+        """Start refreshing on the running event loop, staggering the queries over one interval."""
+        if self._tasks or not self.queries:
+            return
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._run_query(query, index * self.interval / len(self.queries)))
+            for index, query in enumerate(self.queries)
+        ]
+        logger.info(f"Prefetching {len(self.queries)} queries every {self.interval:.0f}s")
+
+    async def stop(self) -> None:
+        """Cancel the refresh tasks and wait for them to finish."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the watchlist, the effective interval and the refresh counters."""
+        return {
+            "queries": self.queries,
+            "interval": self.interval,
+            "running": bool(self._tasks),
+            **self._counters,
+        }
+
+
+# With several workers, each one keeps its own slice of the watchlist warm within its quota share
+prefetcher = PrefetchScheduler(
+    queries=load_watchlist(config.PREFETCH_QUERIES, config.PREFETCH_QUERIES_FILE)[config.WORKER_INDEX::config.WORKER_COUNT],
+    language=config.PREFETCH_LANGUAGE,
+    page_size=config.PREFETCH_PAGE_SIZE,
+    interval=config.PREFETCH_INTERVAL,
+    jitter=config.PREFETCH_JITTER,
+    sentiment=config.PREFETCH_SENTIMENT,
+    quota_share=config.PREFETCH_QUOTA_SHARE,
+    concurrency=config.PREFETCH_CONCURRENCY,
+)
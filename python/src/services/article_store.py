@@ -0,0 +1,285 @@
+"""
+Local article store module.
+
+This module persists every article fetched from NewsAPI into SQLite, deduplicated by URL,
+with an FTS5 full-text index over titles and descriptions. It also records which queries
+were fetched and when, so a search can be answered locally when a recent fetch covers it:
+either the same query fetched with at least as many articles, or a broader query whose
+fetch returned every available article. Narrower queries are matched against titles and
+descriptions only, so they can miss articles NewsAPI matched on their body text.
+
+Queries using NewsAPI search operators (quoted phrases, +/- prefixes, AND/OR/NOT and
+parentheses) are neither recorded nor answered locally: reducing them to a set of words
+would match them against fetches of different queries.
+
+Fetches and articles older than the retention period are pruned, at most once per
+PRUNE_INTERVAL, so the store and its full-text index stay bounded. Articles still referenced
+by a remaining fetch are kept.
+"""
+import logging
+import re
+import sqlite3
+import threading
+import time
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+TERM_PATTERN = re.compile(r"\w+")
+
+# NewsAPI operators: phrases, required and excluded words, boolean keywords and grouping
+OPERATOR_PATTERN = re.compile(r'["()]|(?:^|\s)[+-]|\b(?:AND|OR|NOT)\b', re.IGNORECASE)
+
+# Queries with more terms only look for fetches of the same terms or of single terms, which
+# keeps the candidate list of the coverage lookup at 2^8 - 1 term sets at most
+MAX_SUBSET_TERMS = 8
+
+# Seconds between two retention passes
+PRUNE_INTERVAL = 3600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT,
+    description TEXT,
+    source_name TEXT,
+    published_at TEXT,
+    language TEXT,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_published_at ON articles (published_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, description, content='articles', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO articles_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+CREATE TABLE IF NOT EXISTS fetches (
+    id INTEGER PRIMARY KEY,
+    query_terms TEXT NOT NULL,
+    language TEXT NOT NULL,
+    page_size INTEGER NOT NULL,
+    article_count INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    UNIQUE (query_terms, language)
+);
+CREATE TABLE IF NOT EXISTS fetch_articles (
+    fetch_id INTEGER NOT NULL REFERENCES fetches (id) ON DELETE CASCADE,
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    PRIMARY KEY (fetch_id, article_id)
+);
+CREATE INDEX IF NOT EXISTS fetch_articles_article_id ON fetch_articles (article_id);
+CREATE INDEX IF NOT EXISTS articles_stored_at ON articles (stored_at);
+CREATE INDEX IF NOT EXISTS fetches_fetched_at ON fetches (fetched_at);
+"""
+
+ARTICLE_COLUMNS = ("title", "description", "url", "source_name", "published_at")
+
+
+def query_terms(query: str) -> Tuple[str, ...]:
+    """Split a query into its sorted, unique, lower-cased word terms."""
+    return tuple(sorted(set(TERM_PATTERN.findall(query.lower()))))
+
+
+def has_query_operators(query: str) -> bool:
+    """Return whether a query uses NewsAPI search operators, which a term set cannot represent."""
+    return OPERATOR_PATTERN.search(query) is not None
+
+
+def covering_term_sets(terms: Tuple[str, ...]) -> List[str]:
+    """Return the term sets, as stored in fetches.query_terms, whose fetches may cover a query."""
+    sizes = range(1, len(terms) + 1) if len(terms) <= MAX_SUBSET_TERMS else (1, len(terms))
+    return [" ".join(subset) for size in sizes for subset in combinations(terms, size)]
+
+
+class ArticleStore:
+    """SQLite-backed article store with a full-text index."""
+
+    def __init__(self, path: str, retention: float = 0.0):
+        """
+        Open (and if needed create) the store.
+
+        Args:
+            path: SQLite database path, or ":memory:" for a private in-memory store
+            retention: Seconds fetches and unreferenced articles are kept; 0 keeps them forever
+        """
+        self.path = path
+        self.retention = retention
+        self._last_pruned = 0.0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(SCHEMA)
+        logger.info(f"Opened article store at {path}")
+
+    def save_articles(self, query: str, language: str, page_size: int, articles: List[Dict[str, Any]]) -> None:
+        """
+        Upsert fetched articles and record the fetch that produced them.
+
+        Args:
+            query: The query the articles were fetched for
+            language: The language the articles were fetched for
+            page_size: The page size that was requested
+            articles: Formatted articles as returned by search_news
+        """
+        if has_query_operators(query):
+            return
+        terms = " ".join(query_terms(query))
+        now = time.time()
+        with self._lock, self._connection:
+            article_ids = []
+            for article in articles:
+                if not article.get("url"):
+                    continue
+                row = self._connection.execute(
+                    """
+                    INSERT INTO articles (url, title, description, source_name, published_at, language, stored_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (url) DO UPDATE SET
+                        title = excluded.title,
+                        description = excluded.description,
+                        source_name = excluded.source_name,
+                        published_at = excluded.published_at,
+                        stored_at = excluded.stored_at
+                    RETURNING id
+                    """,
+                    (article["url"], article["title"], article["description"], article["source_name"],
+                     article["published_at"], language, now),
+                ).fetchone()
+                article_ids.append(row["id"])
+
+            self._connection.execute(
+                "DELETE FROM fetches WHERE query_terms = ? AND language = ?", (terms, language)
+            )
+            fetch_id = self._connection.execute(
+                """
+                INSERT INTO fetches (query_terms, language, page_size, article_count, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (terms, language, page_size, len(articles), now),
+            ).lastrowid
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO fetch_articles (fetch_id, article_id) VALUES (?, ?)",
+                [(fetch_id, article_id) for article_id in article_ids],
+            )
+            if self.retention > 0 and now - self._last_pruned >= PRUNE_INTERVAL:
+                self._prune(now - self.retention)
+                self._last_pruned = now
+
+    def _prune(self, cutoff: float) -> None:
+        """Delete fetches older than the cutoff and the old articles no remaining fetch refers to."""
+        fetches = self._connection.execute("DELETE FROM fetches WHERE fetched_at < ?", (cutoff,)).rowcount
+        articles = self._connection.execute(
+            """
+            DELETE FROM articles WHERE stored_at < ?
+            AND NOT EXISTS (SELECT 1 FROM fetch_articles fa WHERE fa.article_id = articles.id)
+            """,
+            (cutoff,),
+        ).rowcount
+        if fetches or articles:
+            logger.info(f"Pruned {fetches} fetches and {articles} articles from the article store")
+
+    def _find_covering_fetch(self, terms: Tuple[str, ...], language: str, page_size: int,
+                             max_age: float) -> Optional[Tuple[int, bool]]:
+        """Return (fetch_id, is_exact) for the most recent fetch covering the query, if any."""
+        exact_terms = " ".join(terms)
+        candidates = covering_term_sets(terms)
+        placeholders = ", ".join("?" for _ in candidates)
+        # A broader query covers the narrower one only if its fetch returned every available article
+        row = self._connection.execute(
+            f"""
+            SELECT id, query_terms = ? AS is_exact FROM fetches
+            WHERE language = ? AND fetched_at >= ? AND query_terms IN ({placeholders})
+            AND (article_count < page_size OR (query_terms = ? AND page_size >= ?))
+            ORDER BY fetched_at DESC LIMIT 1
+            """,
+            (exact_terms, language, time.time() - max_age, *candidates, exact_terms, page_size),
+        ).fetchone()
+        if row is None:
+            return None
+        return row["id"], bool(row["is_exact"])
+
+    def search(self, query: str, language: str, page_size: int, max_age: float) -> Optional[List[Dict[str, Any]]]:
+        """
+        Answer a search from the local store if a recent enough fetch covers it.
+
+        Args:
+            query: Search query
+            language: News language
+            page_size: Maximum number of articles to return
+            max_age: Maximum age in seconds of the covering fetch
+
+        Returns:
+            Articles ordered by publication date (newest first), or None if no fetch covers the query
+        """
+        terms = query_terms(query)
+        if not terms or has_query_operators(query):
+            return None
+
+        with self._lock:
+            covering = self._find_covering_fetch(terms, language, page_size, max_age)
+            if covering is None:
+                return None
+
+            fetch_id, is_exact = covering
+            columns = ", ".join(f"a.{column}" for column in ARTICLE_COLUMNS)
+            if is_exact:
+                rows = self._connection.execute(
+                    f"""
+                    SELECT {columns} FROM articles a
+                    JOIN fetch_articles fa ON fa.article_id = a.id
+                    WHERE fa.fetch_id = ?
+                    ORDER BY a.published_at DESC LIMIT ?
+                    """,
+                    (fetch_id, page_size),
+                ).fetchall()
+            else:
+                match_expression = " ".join(f'"{term}"' for term in terms)
+                rows = self._connection.execute(
+                    f"""
+                    SELECT {columns} FROM articles_fts
+                    JOIN articles a ON a.id = articles_fts.rowid
+                    JOIN fetch_articles fa ON fa.article_id = a.id
+                    WHERE articles_fts MATCH ? AND fa.fetch_id = ?
+                    ORDER BY a.published_at DESC LIMIT ?
+                    """,
+                    (match_expression, fetch_id, page_size),
+                ).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+def _open_article_store() -> Optional[ArticleStore]:
+    """Open the configured store. The store is an optimization, so failing to open it only disables it."""
+    if not config.ARTICLE_STORE_PATH:
+        logger.info("ARTICLE_STORE_PATH is empty, local article store disabled")
+        return None
+    try:
+        return ArticleStore(config.ARTICLE_STORE_PATH, retention=config.ARTICLE_STORE_RETENTION)
+    except sqlite3.Error as e:
+        logger.error(f"Failed to open article store at {config.ARTICLE_STORE_PATH}: {str(e)}")
+        return None
+
+
+article_store = _open_article_store()
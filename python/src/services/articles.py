@@ -0,0 +1,121 @@
+"""
+Article record module.
+
+Search results are held as Article records instead of one dict per article. An Article keeps
+its five fields in __slots__, interns the source name (a page repeats a handful of them) and
+parses the publication time once, so results take less memory in caches and timestamp
+comparisons need no reparsing.
+
+An Article is a read-only Mapping with the keys of the formatted article dict, so code
+indexing articles by field name works with Articles and with plain dicts (e.g. results read
+back from the shared cache or the article store) alike.
+"""
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from src.services.tracing import traced
+
+ARTICLE_FIELDS = ("title", "description", "url", "source_name", "published_at")
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse an ISO 8601 time into an aware datetime, or return None if it is missing or malformed."""
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        # Python < 3.11 does not read a "Z" suffix
+        try:
+            parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def format_timestamp(value: datetime) -> str:
+    """Format a datetime the way NewsAPI does, with "Z" for UTC."""
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+class Article(Mapping):
+    """Compact, read-only record of one formatted article."""
+
+    __slots__ = ("title", "description", "url", "source_name", "published")
+
+    def __init__(self, title: Optional[str], description: Optional[str], url: str,
+                 source_name: Optional[str], published: Union[datetime, str, None]):
+        """
+        Create the record.
+
+        Args:
+            title: Article title
+            description: Article description
+            url: Article URL
+            source_name: Name of the publishing source; interned
+            published: Publication time, parsed if it is an ISO 8601 string; kept as given otherwise
+        """
+        self.title = title
+        self.description = description
+        self.url = url
+        self.source_name = sys.intern(source_name) if isinstance(source_name, str) else source_name
+        self.published = parse_timestamp(published) or published
+
+    @classmethod
+    def from_newsapi(cls, article: Dict[str, Any]) -> "Article":
+        """Build a record from a raw NewsAPI article."""
+        return cls(article["title"], article["description"], article["url"], article["source"]["name"],
+                   article["publishedAt"])
+
+    @property
+    def published_at(self) -> Optional[str]:
+        """Publication time as an ISO 8601 string."""
+        if isinstance(self.published, datetime):
+            return format_timestamp(self.published)
+        return self.published
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in ARTICLE_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(ARTICLE_FIELDS)
+
+    def __len__(self) -> int:
+        return len(ARTICLE_FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the article as a plain dict."""
+        return {field: getattr(self, field) for field in ARTICLE_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"Article({self.to_dict()!r})"
+
+
+def published_time(article: Mapping) -> Optional[datetime]:
+    """Return the parsed publication time of an Article or formatted article dict."""
+    if isinstance(article, Article):
+        return article.published if isinstance(article.published, datetime) else None
+    return parse_timestamp(article.get("published_at"))
+
+
+@traced("search.format_articles")
+def format_articles(news_data: Dict[str, Any]) -> List[Article]:
+    """Reduce raw NewsAPI articles to compact records of the fields exposed by the tools."""
+    return [Article.from_newsapi(article) for article in news_data["articles"]]
+
+
+def newest_published_at(articles: List[Mapping]) -> Optional[str]:
+    """Return the publication time of the newest article as an ISO 8601 string."""
+    newest, newest_at = None, None
+    for article in articles:
+        published_at = published_time(article)
+        if published_at is not None and (newest_at is None or published_at > newest_at):
+            newest, newest_at = article["published_at"], published_at
+    return newest
@@ -0,0 +1,199 @@
+"""
+In-process result cache module.
+
+This module provides a bounded TTL cache with LRU eviction by approximate byte size.
+Entries follow HTTP Cache-Control semantics (RFC 5861): they are fresh for `ttl`
+seconds, may then be served while a background refresh runs for another
+`stale_while_revalidate` seconds, and are kept as a fallback for upstream errors
+until `stale_if_error` seconds after they went stale.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Dict, Hashable, NamedTuple, Optional
+
+from src.services.serialization import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class CacheState(str, Enum):
+    FRESH = "fresh"
+    STALE = "stale"
+    EXPIRED = "expired"
+    MISS = "miss"
+
+
+class CacheLookup(NamedTuple):
+    value: Any
+    state: CacheState
+
+
+class _CacheEntry:
+    __slots__ = ("value", "size", "stored_at", "ttl")
+
+    def __init__(self, value: Any, size: int, stored_at: float, ttl: float):
+        self.value = value
+        self.size = size
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+
+class TTLCache:
+    """Thread-safe TTL cache with byte-size bounded LRU eviction."""
+
+    # Entries are private to this process, so in-process request coalescing is enough
+    shared = False
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int,
+        ttl: float,
+        stale_while_revalidate: float = 0.0,
+        stale_if_error: float = 0.0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Name used in logs and stats
+            max_bytes: Upper bound for the summed size of all cached values
+            ttl: Default number of seconds an entry stays fresh
+            stale_while_revalidate: Seconds after expiry during which a stale entry is served
+                while it is refreshed in the background
+            stale_if_error: Seconds after expiry during which a stale entry is kept as a
+                fallback when the upstream fails
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = max(stale_if_error, stale_while_revalidate)
+
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._refreshing: set = set()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "stale_errors_served": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """Approximate the memory footprint of a JSON-compatible value by its encoded length."""
+        return len(dumps_bytes(value))
+
+    def _state_of(self, entry: _CacheEntry, now: float) -> CacheState:
+        age = now - entry.stored_at
+        if age < entry.ttl:
+            return CacheState.FRESH
+        if age < entry.ttl + self.stale_while_revalidate:
+            return CacheState.STALE
+        if age < entry.ttl + self.stale_if_error:
+            return CacheState.EXPIRED
+        return CacheState.MISS
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._current_bytes -= entry.size
+
+    def get(self, key: Hashable) -> CacheLookup:
+        """
+        Look up a key and classify the entry.
+
+        Returns:
+            A CacheLookup whose state is FRESH or STALE when the value may be served,
+            EXPIRED when the value may only be used as an error fallback, or MISS
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return CacheLookup(None, CacheState.MISS)
+
+            state = self._state_of(entry, now)
+            if state == CacheState.MISS:
+                self._remove(key)
+                self._counters["misses"] += 1
+                return CacheLookup(None, CacheState.MISS)
+
+            self._entries.move_to_end(key)
+            if state == CacheState.FRESH:
+                self._counters["hits"] += 1
+            elif state == CacheState.STALE:
+                self._counters["stale_hits"] += 1
+            else:
+                self._counters["misses"] += 1
+            return CacheLookup(entry.value, state)
+
+    def peek(self, key: Hashable) -> CacheLookup:
+        """Look up a key like get, without counting the lookup or refreshing its recency."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            state = CacheState.MISS if entry is None else self._state_of(entry, now)
+            return CacheLookup(entry.value if state != CacheState.MISS else None, state)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting least recently used entries until it fits."""
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"Cache '{self.name}': value of {size} bytes exceeds cache size, not cached")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            while self._entries and self._current_bytes + size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._current_bytes -= evicted.size
+                self._counters["evictions"] += 1
+
+            self._entries[key] = _CacheEntry(value, size, time.monotonic(), self.ttl if ttl is None else ttl)
+            self._current_bytes += size
+
+    def record_stale_error_served(self) -> None:
+        """Count a stale value that was served because the upstream failed."""
+        with self._lock:
+            self._counters["stale_errors_served"] += 1
+
+    def try_begin_refresh(self, key: Hashable) -> bool:
+        """Mark a key as refreshing. Returns False if a refresh for it is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: Hashable) -> None:
+        """Clear the refreshing mark set by try_begin_refresh."""
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._refreshing.clear()
+            self._current_bytes = 0
+            for counter in self._counters:
+                self._counters[counter] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the cache counters and occupancy."""
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+            }
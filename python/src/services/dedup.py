@@ -0,0 +1,128 @@
+"""
+Near-duplicate detection module.
+
+This module collapses syndicated copies of the same story before analysis. Each article's
+title and description are cut into word shingles and summarized by a MinHash signature,
+whose agreement with another signature estimates the Jaccard similarity of their shingle
+sets. Locality-sensitive hashing over signature bands finds candidate pairs without
+comparing every pair, candidates above the similarity threshold are joined, and each
+resulting cluster is represented by its first (most recent) article, which keeps the
+cluster's source count and source names.
+"""
+import logging
+import re
+import zlib
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+SHINGLE_SIZE = 3
+BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERMUTATIONS = BANDS * ROWS_PER_BAND
+# Fixed seed so signatures are comparable across calls and processes
+SEED = 1_234_567
+
+_rng = np.random.default_rng(SEED)
+# Multiply-shift hashing: (a * x + b) mod 2^64, keeping the high 32 bits; a must be odd
+_HASH_A = _rng.integers(1, 2 ** 63, size=NUM_PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_HASH_B = _rng.integers(0, 2 ** 63, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def _shingles(article: Dict[str, Any]) -> np.ndarray:
+    """Hash the word shingles of an article's title and description to 32-bit integers."""
+    tokens = TOKEN_PATTERN.findall(f"{article.get('title') or ''} {article.get('description') or ''}".lower())
+    if not tokens:
+        # Articles without text are only duplicates of themselves
+        shingles = {article.get("url") or str(id(article))}
+    elif len(tokens) < SHINGLE_SIZE:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {" ".join(tokens[index:index + SHINGLE_SIZE]) for index in range(len(tokens) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64)
+
+
+def minhash_signature(article: Dict[str, Any]) -> np.ndarray:
+    """Return the MinHash signature of an article."""
+    shingle_hashes = _shingles(article)
+    with np.errstate(over="ignore"):
+        permuted = (shingle_hashes[:, None] * _HASH_A + _HASH_B) >> np.uint64(32)
+    return permuted.min(axis=0)
+
+
+def _find(parents: List[int], index: int) -> int:
+    while parents[index] != index:
+        parents[index] = parents[parents[index]]
+        index = parents[index]
+    return index
+
+
+def collapse_near_duplicates(articles: List[Dict[str, Any]],
+                             threshold: float) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Collapse clusters of near-duplicate articles to one representative each.
+
+    Args:
+        articles: Formatted articles, most relevant first
+        threshold: Minimum estimated Jaccard similarity of two articles' shingles to treat them
+            as copies of one story; values above 1 disable collapsing
+
+    Returns:
+        The representatives in input order, where those standing for several articles carry
+        source_count and sources, and a report of the fetched, unique and collapsed article
+        counts and the collapsed clusters
+    """
+    parents = list(range(len(articles)))
+    if threshold <= 1 and len(articles) > 1:
+        signatures = np.stack([minhash_signature(article) for article in articles])
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        for index, signature in enumerate(signatures):
+            for band in range(BANDS):
+                band_key = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+                buckets.setdefault((band, band_key), []).append(index)
+
+        compared = set()
+        for members in buckets.values():
+            for position, first in enumerate(members):
+                for second in members[position + 1:]:
+                    if (first, second) in compared:
+                        continue
+                    compared.add((first, second))
+                    similarity = float(np.mean(signatures[first] == signatures[second]))
+                    if similarity >= threshold:
+                        parents[_find(parents, second)] = _find(parents, first)
+
+    clusters: Dict[int, List[int]] = {}
+    for index in range(len(articles)):
+        clusters.setdefault(_find(parents, index), []).append(index)
+
+    representatives = []
+    duplicate_clusters = []
+    for members in sorted(clusters.values()):
+        if len(members) == 1:
+            representatives.append(articles[members[0]])
+            continue
+        sources = list(dict.fromkeys(
+            articles[index].get("source_name") for index in members if articles[index].get("source_name")
+        ))
+        representative = {**articles[members[0]], "source_count": len(members), "sources": sources}
+        representatives.append(representative)
+        duplicate_clusters.append({
+            "title": representative.get("title"),
+            "url": representative.get("url"),
+            "source_count": len(members),
+            "sources": sources,
+        })
+
+    report = {
+        "fetched_article_count": len(articles),
+        "unique_article_count": len(representatives),
+        "collapsed_article_count": len(articles) - len(representatives),
+        "duplicate_clusters": duplicate_clusters,
+    }
+    if duplicate_clusters:
+        logger.info(f"Collapsed {len(articles)} articles into {len(representatives)} unique stories")
+    return representatives, report
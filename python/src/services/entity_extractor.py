@@ -0,0 +1,321 @@
+"""
+Local entity extraction module.
+
+This module tags people, organizations and locations in article text without the LLM. All
+gazetteer names and aliases are compiled into one Aho-Corasick automaton, so a text is
+scanned once regardless of how many names the gazetteer holds. Matches must start and
+end on word boundaries; overlapping matches resolve to the leftmost, then longest, name.
+Quotes are detected by regex. Names not in the gazetteer are never found, which is why
+extract_information_from_article also offers a hybrid mode that merges in LLM results.
+
+A gazetteer is a JSON object mapping each entity type to a list of entries, each either a
+name or an object with a "name" and a list of "aliases".
+"""
+import json
+import logging
+import re
+from collections import Counter, deque
+from typing import Any, Dict, List, Tuple
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+ENTITY_TYPES = ("people", "organizations", "locations")
+QUOTE_PATTERNS = (
+    re.compile(r"[\"“]([^\"“”]{12,}?)[\"”]"),
+    re.compile(r"(?<!\w)['‘]([^'‘’]{12,}?)['’](?!\w)"),
+)
+
+DEFAULT_GAZETTEER = {
+    "people": [
+        {"name": "Joe Biden", "aliases": ["President Biden"]},
+        {"name": "Donald Trump", "aliases": ["President Trump"]},
+        {"name": "Kamala Harris"},
+        {"name": "Xi Jinping", "aliases": ["President Xi"]},
+        {"name": "Vladimir Putin", "aliases": ["President Putin"]},
+        {"name": "Volodymyr Zelensky", "aliases": ["Volodymyr Zelenskyy", "President Zelensky"]},
+        {"name": "Emmanuel Macron", "aliases": ["President Macron"]},
+        {"name": "Olaf Scholz"},
+        {"name": "Keir Starmer"},
+        {"name": "Narendra Modi", "aliases": ["Prime Minister Modi"]},
+        {"name": "Benjamin Netanyahu"},
+        {"name": "Ursula von der Leyen"},
+        {"name": "Jerome Powell", "aliases": ["Fed Chair Powell"]},
+        {"name": "Christine Lagarde"},
+        {"name": "Elon Musk"},
+        {"name": "Tim Cook"},
+        {"name": "Sundar Pichai"},
+        {"name": "Satya Nadella"},
+        {"name": "Mark Zuckerberg"},
+        {"name": "Jeff Bezos"},
+        {"name": "Andy Jassy"},
+        {"name": "Jensen Huang"},
+        {"name": "Sam Altman"},
+        {"name": "Warren Buffett"},
+        {"name": "Jamie Dimon"},
+        {"name": "Bill Gates"},
+    ],
+    "organizations": [
+        {"name": "Apple", "aliases": ["Apple Inc."]},
+        {"name": "Microsoft"},
+        {"name": "Alphabet"},
+        {"name": "Google"},
+        {"name": "Amazon"},
+        {"name": "Meta", "aliases": ["Meta Platforms"]},
+        {"name": "Nvidia"},
+        {"name": "Tesla"},
+        {"name": "OpenAI"},
+        {"name": "Intel"},
+        {"name": "AMD", "aliases": ["Advanced Micro Devices"]},
+        {"name": "IBM"},
+        {"name": "Samsung"},
+        {"name": "Sony"},
+        {"name": "Toyota"},
+        {"name": "Volkswagen"},
+        {"name": "Boeing"},
+        {"name": "Airbus"},
+        {"name": "Netflix"},
+        {"name": "Walmart"},
+        {"name": "JPMorgan Chase", "aliases": ["JPMorgan"]},
+        {"name": "Goldman Sachs"},
+        {"name": "Berkshire Hathaway"},
+        {"name": "ExxonMobil", "aliases": ["Exxon Mobil", "Exxon"]},
+        {"name": "Pfizer"},
+        {"name": "Moderna"},
+        {"name": "Federal Reserve", "aliases": ["the Fed"]},
+        {"name": "European Central Bank", "aliases": ["ECB"]},
+        {"name": "European Union", "aliases": ["EU"]},
+        {"name": "United Nations", "aliases": ["UN"]},
+        {"name": "NATO"},
+        {"name": "World Health Organization", "aliases": ["WHO"]},
+        {"name": "International Monetary Fund", "aliases": ["IMF"]},
+        {"name": "World Bank"},
+        {"name": "OPEC"},
+        {"name": "NASA"},
+        {"name": "FBI"},
+        {"name": "Securities and Exchange Commission", "aliases": ["SEC"]},
+        {"name": "Congress"},
+        {"name": "Senate"},
+        {"name": "White House"},
+        {"name": "Pentagon"},
+        {"name": "Kremlin"},
+    ],
+    "locations": [
+        {"name": "United States", "aliases": ["U.S.", "USA", "America"]},
+        {"name": "United Kingdom", "aliases": ["U.K.", "UK", "Britain"]},
+        {"name": "China"},
+        {"name": "Russia"},
+        {"name": "Ukraine"},
+        {"name": "Germany"},
+        {"name": "France"},
+        {"name": "Italy"},
+        {"name": "Spain"},
+        {"name": "Japan"},
+        {"name": "India"},
+        {"name": "Brazil"},
+        {"name": "Canada"},
+        {"name": "Mexico"},
+        {"name": "Australia"},
+        {"name": "Israel"},
+        {"name": "Gaza"},
+        {"name": "Iran"},
+        {"name": "Saudi Arabia"},
+        {"name": "Turkey"},
+        {"name": "South Korea"},
+        {"name": "North Korea"},
+        {"name": "Taiwan"},
+        {"name": "Europe"},
+        {"name": "Asia"},
+        {"name": "Africa"},
+        {"name": "Middle East"},
+        {"name": "Washington"},
+        {"name": "New York"},
+        {"name": "California"},
+        {"name": "Texas"},
+        {"name": "Silicon Valley"},
+        {"name": "Cupertino"},
+        {"name": "London"},
+        {"name": "Paris"},
+        {"name": "Berlin"},
+        {"name": "Brussels"},
+        {"name": "Moscow"},
+        {"name": "Kyiv", "aliases": ["Kiev"]},
+        {"name": "Beijing"},
+        {"name": "Shanghai"},
+        {"name": "Hong Kong"},
+        {"name": "Tokyo"},
+        {"name": "New Delhi"},
+        {"name": "Jerusalem"},
+        {"name": "Dubai"},
+    ],
+}
+
+
+class AhoCorasickAutomaton:
+    """Multi-pattern string matcher reporting every occurrence of any pattern in one pass."""
+
+    def __init__(self, patterns: Dict[str, Any]):
+        """
+        Compile the automaton.
+
+        Args:
+            patterns: Pattern string to the value reported when it matches
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[int, Any]]] = [[]]
+
+        for pattern, value in patterns.items():
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append((len(pattern), value))
+
+        # Breadth-first, so every fail target is complete before its dependents
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        """Return (start, end, value) for every pattern occurrence in text, overlapping ones included."""
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._outputs[state]:
+                matches.append((index + 1 - length, index + 1, value))
+        return matches
+
+
+class LocalEntityExtractor:
+    """Gazetteer and regex based extractor producing the LLM extraction result shape."""
+
+    def __init__(self, gazetteer: Dict[str, List[Any]]):
+        """
+        Build the extractor.
+
+        Args:
+            gazetteer: Entity type to entries, each a name or {"name": ..., "aliases": [...]}
+        """
+        patterns = {}
+        for entity_type in ENTITY_TYPES:
+            for entry in gazetteer.get(entity_type, []):
+                name = entry if isinstance(entry, str) else entry["name"]
+                aliases = [] if isinstance(entry, str) else entry.get("aliases", [])
+                for surface_form in [name, *aliases]:
+                    # Case-sensitive acronyms like "WHO" or "UN" would match ordinary words if lower-cased
+                    key = surface_form if surface_form.isupper() else surface_form.lower()
+                    patterns.setdefault(key, (entity_type, name))
+        self._automaton = AhoCorasickAutomaton(patterns)
+        logger.info(f"Compiled gazetteer with {len(patterns)} names and aliases")
+
+    def _find_entities(self, text: str) -> Dict[str, List[str]]:
+        # Lower-case everything except all-caps words, mirroring how the patterns were keyed
+        folded = re.sub(r"\b\w+\b", lambda word: word.group() if word.group().isupper() else word.group().lower(), text)
+        candidates = [
+            (start, end, value) for start, end, value in self._automaton.find_all(folded)
+            if (start == 0 or not folded[start - 1].isalnum()) and (end == len(folded) or not folded[end].isalnum())
+        ]
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+
+        entities = {entity_type: [] for entity_type in ENTITY_TYPES}
+        covered_until = 0
+        for start, end, (entity_type, name) in candidates:
+            if start < covered_until:
+                continue
+            covered_until = end
+            if name not in entities[entity_type]:
+                entities[entity_type].append(name)
+        return entities
+
+    @staticmethod
+    def _find_quotes(text: str) -> List[str]:
+        quotes = []
+        for pattern in QUOTE_PATTERNS:
+            for match in pattern.finditer(text):
+                quote = match.group(1).strip()
+                if quote not in quotes:
+                    quotes.append(quote)
+        return quotes
+
+    def extract(self, title: str, description: str) -> Dict[str, List[str]]:
+        """
+        Extract entities and quotes from an article.
+
+        Args:
+            title: The article title
+            description: The article description
+
+        Returns:
+            Dictionary with people, organizations, locations and key_quotes lists
+        """
+        text = f"{title or ''}\n{description or ''}"
+        return {**self._find_entities(text), "key_quotes": self._find_quotes(text)}
+
+    def key_entities(self, articles: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """
+        Find the entities mentioned across several articles.
+
+        Args:
+            articles: Article dictionaries with title and description
+
+        Returns:
+            Dictionary with people, organizations and locations lists, each ordered by the
+            number of articles mentioning the entity (ties in order of first mention)
+        """
+        mentions = {entity_type: Counter() for entity_type in ENTITY_TYPES}
+        for article in articles:
+            entities = self._find_entities(f"{article.get('title') or ''}\n{article.get('description') or ''}")
+            for entity_type in ENTITY_TYPES:
+                mentions[entity_type].update(entities[entity_type])
+        return {entity_type: [name for name, _ in mentions[entity_type].most_common()] for entity_type in ENTITY_TYPES}
+
+
+def merge_extractions(primary: Dict[str, List[str]], secondary: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Union two extraction results, keeping primary's order and skipping case-insensitive duplicates."""
+    merged = {}
+    for field in (*ENTITY_TYPES, "key_quotes"):
+        values = list(primary.get(field) or [])
+        seen = {str(value).lower() for value in values}
+        for value in secondary.get(field) or []:
+            if str(value).lower() not in seen:
+                seen.add(str(value).lower())
+                values.append(value)
+        merged[field] = values
+    return merged
+
+
+def load_gazetteer(path: str) -> Dict[str, List[Any]]:
+    """Load a gazetteer from a JSON file."""
+    with open(path, encoding="utf-8") as gazetteer_file:
+        return json.load(gazetteer_file)
+
+
+def _build_local_entity_extractor() -> LocalEntityExtractor:
+    """Build the extractor from the configured gazetteer, falling back to the built-in one."""
+    if config.GAZETTEER_PATH:
+        try:
+            return LocalEntityExtractor(load_gazetteer(config.GAZETTEER_PATH))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Failed to load gazetteer {config.GAZETTEER_PATH}, using the built-in gazetteer: {str(e)}")
+    return LocalEntityExtractor(DEFAULT_GAZETTEER)
+
+
+local_entity_extractor = _build_local_entity_extractor()
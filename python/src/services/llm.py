@@ -1,167 +1,484 @@
+"""
+LLM service module.
+
+langchain, langchain_openai and the OpenAI client take over a second to import, so they are
+only imported when the first LLM call needs them: the chat model, the output parsers and
+the compiled prompt templates are all built on first use. Importing this module and
+creating the shared llm_service stay cheap, which keeps server cold starts fast.
+"""
+import asyncio
+import functools
 import logging
-from typing import Dict, Any
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
 import os
 
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.output_parsers import ResponseSchema, StructuredOutputParser
-
 from src.config import config
+from src.services.llm_cache import llm_result_cache
+from src.services.metrics import record_llm_usage
+from src.services.resilience import build_resilient_caller
+from src.services.sentiment_reduce import chunk_articles, merge_entities, merge_packing_reports, merge_sentiments
+from src.services.singleflight import AsyncSingleFlight
+from src.services.streaming_json import IncrementalJsonObjectParser
+from src.services.token_budget import load_tokenizer, pack_articles
+from src.services.tracing import annotate, tracer, traced
+
+if TYPE_CHECKING:
+    from langchain.output_parsers import StructuredOutputParser
+    from langchain_openai import ChatOpenAI
 
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = "gpt-4o-mini"
+
+# Called with (field name, value) as each field of a streamed result completes
+FieldCallback = Callable[[str, Any], Awaitable[None]]
+
+# Bump these whenever a prompt template or its schemas change, so cached results are invalidated
+EXTRACT_PROMPT_VERSION = "1"
+SENTIMENT_PROMPT_VERSION = "2"
+SUMMARY_MERGE_PROMPT_VERSION = "1"
+
+class FieldSchema(NamedTuple):
+    """Output field of a structured prompt; turned into a langchain ResponseSchema on first use."""
+    name: str
+    description: str
+    type: str = "string"
+
 EXTRACT_INFO_SCHEMAS = [
-    ResponseSchema(name="people", description="List of people mentioned in the article", type="list"),
-    ResponseSchema(name="organizations", description="List of organizations mentioned in the article", type="list"),
-    ResponseSchema(name="locations", description="List of locations mentioned in the article", type="list"),
-    ResponseSchema(name="key_quotes", description="List of important quotes from the article", type="list")
+    FieldSchema(name="people", description="List of people mentioned in the article", type="list"),
+    FieldSchema(name="organizations", description="List of organizations mentioned in the article", type="list"),
+    FieldSchema(name="locations", description="List of locations mentioned in the article", type="list"),
+    FieldSchema(name="key_quotes", description="List of important quotes from the article", type="list")
 ]
 
 SENTIMENT_ANALYSIS_SCHEMAS = [
-    ResponseSchema(name="overall_sentiment", description="Overall sentiment of the articles: positive, negative, or neutral", type="string"),
-    ResponseSchema(name="sentiment_confidence", description="Confidence level of the sentiment analysis: high, medium, or low", type="string"),
-    ResponseSchema(name="key_entities", description="Dictionary containing lists of people, organizations, and locations mentioned", type="object"),
-    ResponseSchema(name="key_takeaway_summary", description="A brief summary of the key takeaways from the articles", type="string")
+    FieldSchema(name="overall_sentiment", description="Overall sentiment of the articles: positive, negative, or neutral", type="string"),
+    FieldSchema(name="sentiment_confidence", description="Confidence level of the sentiment analysis: high, medium, or low", type="string"),
+    FieldSchema(name="key_entities", description="Dictionary containing lists of people, organizations, and locations mentioned", type="object"),
+    FieldSchema(name="key_takeaway_summary", description="A brief summary of the key takeaways from the articles", type="string")
 ]
 
+SUMMARY_MERGE_SCHEMAS = [
+    FieldSchema(name="key_takeaway_summary", description="A brief summary combining the key takeaways of all summaries", type="string")
+]
+
+# Prompt templates; format_instructions is filled in once per template when it is first compiled
+EXTRACT_PROMPT_TEMPLATE = """
+        Analyze the following news article and extract key information into a structured format:
+
+        Title: {title}
+        Description: {description}
+
+        {format_instructions}
+        """
+
+SENTIMENT_PROMPT_TEMPLATE = """
+        Analyze the following news articles about "{query}" and determine the overall sentiment as well as key entities:
+
+        Articles:
+        {articles}
+
+        In your analysis, provide:
+        1. Overall sentiment (positive, negative, or neutral)
+        2. Sentiment confidence (high, medium, or low)
+        3. Key entities mentioned (people, organizations, locations)
+        4. A brief summary of the key takeaways
+
+        {format_instructions}
+        """
+
+SUMMARY_MERGE_PROMPT_TEMPLATE = """
+        The following summaries each cover a different batch of news articles about "{query}".
+        Combine them into one brief summary of the key takeaways, keeping points that recur across batches:
+
+        {summaries}
+
+        {format_instructions}
+        """
+
+def _build_parser(schemas: List[FieldSchema]) -> "StructuredOutputParser":
+    from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+    return StructuredOutputParser.from_response_schemas([ResponseSchema(**schema._asdict()) for schema in schemas])
+
+def _compile_template(template: str, format_instructions: str) -> str:
+    """Fill in the format instructions, escaping their braces so the result is a plain str.format template."""
+    escaped = format_instructions.replace("{", "{{").replace("}", "}}")
+    return template.replace("{format_instructions}", escaped)
+
+def _record_usage(response: Any) -> None:
+    """Count the token usage of an LLM response and add it to the current span."""
+    usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict):
+        record_llm_usage(usage)
+        annotate(prompt_tokens=usage.get("input_tokens") or 0, completion_tokens=usage.get("output_tokens") or 0)
+
+def _is_transient_openai_error(error: BaseException) -> bool:
+    """Connection failures, timeouts and 5xx answers are worth retrying; other API errors are not."""
+    # Any OpenAI error means the client was already imported by the call that raised it
+    import openai
+    return isinstance(error, (openai.APIConnectionError, openai.InternalServerError))
+
+openai_resilience = build_resilient_caller("OpenAI", _is_transient_openai_error, config.OPENAI_HEDGING)
+
 class LLMService:
     """Service for interacting with language models for text analysis and generation."""
     
     def __init__(self):
-        """Initialize the LLM service with OpenAI."""
-        self.llm = self._initialize_llm()
-        self.extract_parser = StructuredOutputParser.from_response_schemas(EXTRACT_INFO_SCHEMAS)
-        self.sentiment_parser = StructuredOutputParser.from_response_schemas(SENTIMENT_ANALYSIS_SCHEMAS)
-        logger.info("Initialized LLM service with OpenAI model")
+        """Initialize the LLM service; the OpenAI model is created on first use."""
+        self._llm = None
+        self._llm_lock = threading.Lock()
+        self._ready = False
+        self._async_inflight = AsyncSingleFlight()
+        self.result_cache = llm_result_cache
+        self.resilience = openai_resilience
+    
+    @property
+    def llm(self) -> "ChatOpenAI":
+        """The OpenAI chat model, created on first access."""
+        if self._llm is None:
+            # Held while the client libraries import, so a call racing the warm-up waits for it
+            with self._llm_lock:
+                if self._llm is None:
+                    self._llm = self._initialize_llm()
+        return self._llm
+    
+    @llm.setter
+    def llm(self, value: "ChatOpenAI") -> None:
+        self._llm = value
+    
+    @functools.cached_property
+    def extract_parser(self) -> "StructuredOutputParser":
+        return _build_parser(EXTRACT_INFO_SCHEMAS)
+    
+    @functools.cached_property
+    def sentiment_parser(self) -> "StructuredOutputParser":
+        return _build_parser(SENTIMENT_ANALYSIS_SCHEMAS)
+    
+    @functools.cached_property
+    def summary_parser(self) -> "StructuredOutputParser":
+        return _build_parser(SUMMARY_MERGE_SCHEMAS)
+    
+    @functools.cached_property
+    def _extract_template(self) -> str:
+        return _compile_template(EXTRACT_PROMPT_TEMPLATE, self.extract_parser.get_format_instructions())
+    
+    @functools.cached_property
+    def _sentiment_template(self) -> str:
+        return _compile_template(SENTIMENT_PROMPT_TEMPLATE, self.sentiment_parser.get_format_instructions())
     
-    def _initialize_llm(self) -> ChatOpenAI:
+    @functools.cached_property
+    def _summary_merge_template(self) -> str:
+        return _compile_template(SUMMARY_MERGE_PROMPT_TEMPLATE, self.summary_parser.get_format_instructions())
+    
+    def _build(self) -> None:
+        """Build the model, parsers and compiled prompts and load the tokenizer; reading the lazy attributes caches them."""
+        for attribute in ("llm", "_extract_template", "_sentiment_template", "_summary_merge_template"):
+            getattr(self, attribute)
+        # The first load may download the encoding, which must not happen on the event loop
+        load_tokenizer(MODEL_NAME)
+        self._ready = True
+    
+    def warm_up(self) -> None:
+        """Import the LLM client libraries and build the model, parsers, prompts and tokenizer ahead of the first call."""
+        try:
+            self._build()
+            logger.info("Warmed up LLM service")
+        except Exception as e:
+            logger.warning(f"LLM service warm-up failed, it will be retried on first use: {str(e)}")
+    
+    async def _aensure_ready(self) -> None:
+        """Build the lazy members in a worker thread, so a cold first call does not stall the event loop."""
+        if not self._ready:
+            await asyncio.to_thread(self._build)
+    
+    def _initialize_llm(self) -> "ChatOpenAI":
         """Initialize the OpenAI language model."""
         try:
             if not config.OPENAI_API_KEY:
                 raise ValueError("No OpenAI API key provided in configuration")
-                
-            return ChatOpenAI(
+            
+            from langchain_openai import ChatOpenAI
+            
+            llm = ChatOpenAI(
                 temperature=config.TEMPERATURE,
-                model_name="gpt-4o-mini",
-                openai_api_key=config.OPENAI_API_KEY
+                model_name=MODEL_NAME,
+                openai_api_key=config.OPENAI_API_KEY,
+                # Empty means the official endpoint; set to point at a compatible server such as the benchmark stub
+                openai_api_base=config.OPENAI_BASE_URL or None,
+                # Retries are handled by the resilience layer, which also enforces the retry budget
+                max_retries=0,
+                # Report token usage on the last streamed chunk too, for the token counters
+                stream_usage=True
             )
+            logger.info("Initialized LLM service with OpenAI model")
+            return llm
                 
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI LLM: {str(e)}")
             raise
     
-    def extract_article_information(self, title: str, description: str) -> Dict[str, Any]:
+    @traced("llm.prompt_format")
+    def _build_extract_prompt(self, title: str, description: str) -> str:
+        """Format the entity extraction prompt for one article."""
+        return self._extract_template.format(title=title, description=description)
+    
+    @traced("llm.prompt_format")
+    def _build_sentiment_prompt(self, query: str, articles: list) -> Tuple[str, Dict[str, Any]]:
+        """Format the sentiment analysis prompt for a set of articles packed into the token budget."""
+        articles, packing_report = pack_articles(articles, config.SENTIMENT_TOKEN_BUDGET, MODEL_NAME)
+        
+        articles_text = "\n\n".join([
+            f"Article {i+1}:\nTitle: {article['title']}\n"
+            f"Description: {article['description']}"
+            + (f"\nReported by {article['source_count']} sources" if article.get("source_count", 1) > 1 else "")
+            for i, article in enumerate(articles)
+        ])
+        
+        return self._sentiment_template.format(query=query, articles=articles_text), packing_report
+    
+    @traced("llm.prompt_format")
+    def _build_summary_merge_prompt(self, query: str, summaries: list) -> str:
+        """Format the prompt merging per-chunk sentiment summaries into one."""
+        summaries_text = "\n\n".join([
+            f"Summary {i+1}:\n{summary}"
+            for i, summary in enumerate(summaries)
+        ])
+        
+        return self._summary_merge_template.format(query=query, summaries=summaries_text)
+    
+    def _result_cache_key(self, formatted_prompt: str, prompt_version: str) -> Optional[str]:
+        """Return the result cache key for a prompt, or None when the cache is disabled."""
+        if self.result_cache is None:
+            return None
+        return self.result_cache.make_key(MODEL_NAME, config.TEMPERATURE, prompt_version, formatted_prompt)
+    
+    @staticmethod
+    @traced("llm.parse")
+    def _parse_response(content: str, parser: "StructuredOutputParser", response_label: str) -> Dict[str, Any]:
+        """Parse the structured LLM output, raising ValueError with a readable message on failure."""
+        try:
+            return parser.parse(content)
+        except Exception as parse_error:
+            error_msg = f"Failed to parse {response_label}: {str(parse_error)}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+    
+    async def _ainvoke_and_parse(self, formatted_prompt: str, parser: "StructuredOutputParser", response_label: str,
+                                 prompt_version: str) -> Dict[str, Any]:
         """
-        Extract structured information from a news article.
+        Invoke the LLM and parse its structured output.
+        
+        Results are served from the persistent result cache when the same prompt was already
+        answered by the same model configuration, and identical in-flight prompts share one call.
+        Result cache access runs in a worker thread so disk I/O never stalls the event loop.
         
         Args:
-            title: The article title
-            description: The article description
+            formatted_prompt: The complete prompt sent to the model
+            parser: Parser for the expected structured output
+            response_label: Name of the response used in parse error messages
+            prompt_version: Version of the prompt template, part of the cache key
             
         Returns:
-            Dictionary with extracted entities and quotes
+            The parsed LLM output
             
         Raises:
-            Exception: If the LLM fails to generate a valid response or the parsing fails
+            ValueError: If the LLM response cannot be parsed
         """
-        format_instructions = self.extract_parser.get_format_instructions()
+        cache_key = self._result_cache_key(formatted_prompt, prompt_version)
+        if cache_key is not None:
+            cached_result = await asyncio.to_thread(self.result_cache.get, cache_key)
+            if cached_result is not None:
+                logger.info("Serving LLM result from cache")
+                annotate(llm_cache_hit=True)
+                return cached_result
         
-        template = """
-        Analyze the following news article and extract key information into a structured format:
-
-        Title: {title}
-        Description: {description}
-
-        {format_instructions}
+        async def invoke_once() -> Dict[str, Any]:
+            with tracer.span("llm.invoke", model=MODEL_NAME, label=response_label):
+                response = await self.resilience.call(lambda: self.llm.ainvoke(formatted_prompt))
+                _record_usage(response)
+            parsed = self._parse_response(response.content, parser, response_label)
+            if cache_key is not None:
+                await asyncio.to_thread(self.result_cache.set, cache_key, parsed)
+            return parsed
+        
+        return await self._async_inflight.do(formatted_prompt, invoke_once)
+    
+    async def _astream_and_parse(self, formatted_prompt: str, parser: "StructuredOutputParser", response_label: str,
+                                 prompt_version: str, on_field: Optional[FieldCallback]) -> Dict[str, Any]:
         """
+        Stream the LLM completion and report each output field through on_field as soon as it is complete.
         
-        prompt = PromptTemplate(
-            template=template,
-            input_variables=["title", "description"],
-            partial_variables={"format_instructions": format_instructions}
-        )
+        Without on_field this is _ainvoke_and_parse. Fields of cached results, of calls joined
+        while already in flight, and any the incremental parser could not recover are reported
+        once the complete response has been parsed, so on_field sees every field exactly once.
+        
+        Args:
+            formatted_prompt: The complete prompt sent to the model
+            parser: Parser for the expected structured output
+            response_label: Name of the response used in parse error messages
+            prompt_version: Version of the prompt template, part of the cache key
+            on_field: Coroutine function called with each completed field name and value
+            
+        Returns:
+            The parsed LLM output
+            
+        Raises:
+            ValueError: If the LLM response cannot be parsed
+        """
+        if on_field is None:
+            return await self._ainvoke_and_parse(formatted_prompt, parser, response_label, prompt_version)
+        
+        reported_fields = set()
         
-        formatted_prompt = prompt.format(title=title, description=description)
+        async def report(name: str, value: Any) -> None:
+            reported_fields.add(name)
+            await on_field(name, value)
+        
+        cache_key = self._result_cache_key(formatted_prompt, prompt_version)
+        parsed = None
+        if cache_key is not None:
+            parsed = await asyncio.to_thread(self.result_cache.get, cache_key)
+            if parsed is not None:
+                logger.info("Serving LLM result from cache")
+                annotate(llm_cache_hit=True)
+        
+        async def stream_completion() -> str:
+            incremental_parser = IncrementalJsonObjectParser()
+            content_parts = []
+            async for chunk in self.llm.astream(formatted_prompt):
+                _record_usage(chunk)
+                content_parts.append(chunk.content)
+                for name, value in incremental_parser.feed(chunk.content):
+                    await report(name, value)
+            return "".join(content_parts)
+        
+        async def stream_once() -> Dict[str, Any]:
+            # Streams are never hedged, and are only retried while no field has been reported yet
+            with tracer.span("llm.invoke", model=MODEL_NAME, label=response_label, streamed=True):
+                content = await self.resilience.call(
+                    stream_completion, idempotent=False, retry_while=lambda: not reported_fields
+                )
+            streamed = self._parse_response(content, parser, response_label)
+            if cache_key is not None:
+                await asyncio.to_thread(self.result_cache.set, cache_key, streamed)
+            return streamed
+        
+        if parsed is None:
+            parsed = await self._async_inflight.do(formatted_prompt, stream_once)
+        for name, value in parsed.items():
+            if name not in reported_fields:
+                await report(name, value)
+        return parsed
+    
+    async def aextract_article_information(self, title: str, description: str,
+                                           on_field: Optional[FieldCallback] = None) -> Dict[str, Any]:
+        """
+        Extract structured information from a news article without blocking the event loop.
+        
+        Args:
+            title: The article title
+            description: The article description
+            on_field: Optional coroutine function receiving each field as soon as it is streamed
+            
+        Returns:
+            Dictionary with extracted entities and quotes
+            
+        Raises:
+            Exception: If the LLM fails to generate a valid response or the parsing fails
+        """
+        await self._aensure_ready()
+        formatted_prompt = self._build_extract_prompt(title, description)
         
         try:
             logger.info(f"Extracting information from article: {title}")
-            response = self.llm.invoke(formatted_prompt)
-            
-            try:
-                return self.extract_parser.parse(response.content)
-            except Exception as parse_error:
-                error_msg = f"Failed to parse LLM response: {str(parse_error)}"
-                logger.error(error_msg)
-                raise ValueError(error_msg)
+            return await self._astream_and_parse(
+                formatted_prompt, self.extract_parser, "LLM response", EXTRACT_PROMPT_VERSION, on_field
+            )
                 
         except Exception as e:
             error_msg = f"Error extracting information from article: {str(e)}"
             logger.error(error_msg)
             raise
     
-    def analyze_sentiment(self, query: str, articles: list) -> Dict[str, Any]:
+    async def aanalyze_sentiment(self, query: str, articles: list,
+                                 on_field: Optional[FieldCallback] = None) -> Dict[str, Any]:
         """
-        Analyze sentiment and extract key information from multiple articles.
+        Analyze sentiment and extract key information from multiple articles without blocking the event loop.
+        
+        More than SENTIMENT_CHUNK_SIZE articles are analyzed map-reduce style: chunks are analyzed
+        in parallel and then merged, so wall-clock time stays near two LLM round trips.
         
         Args:
             query: The original search query
             articles: List of article dictionaries with title and description
+            on_field: Optional coroutine function receiving each result field as soon as it is known
             
         Returns:
-            Dictionary with sentiment analysis and key information
+            Dictionary with sentiment analysis and key information, plus a prompt_packing
+            report of how much article text was trimmed to fit the token budget and the
+            number of chunks analyzed as chunk_count
             
         Raises:
             Exception: If the LLM fails to generate a valid response or the parsing fails
         """
-        format_instructions = self.sentiment_parser.get_format_instructions()
-        
-        articles_text = "\n\n".join([
-            f"Article {i+1}:\nTitle: {article['title']}\n"
-            f"Description: {article['description']}"
-            for i, article in enumerate(articles)
-        ])
-        
-        template = """
-        Analyze the following news articles about "{query}" and determine the overall sentiment as well as key entities:
-
-        Articles:
-        {articles}
-
-        In your analysis, provide:
-        1. Overall sentiment (positive, negative, or neutral)
-        2. Sentiment confidence (high, medium, or low)
-        3. Key entities mentioned (people, organizations, locations)
-        4. A brief summary of the key takeaways
-
-        {format_instructions}
-        """
-        
-        prompt = PromptTemplate(
-            template=template,
-            input_variables=["query", "articles"],
-            partial_variables={"format_instructions": format_instructions}
-        )
-        
-        formatted_prompt = prompt.format(query=query, articles=articles_text)
-        
         try:
-            logger.info(f"Analyzing sentiment for query: {query}")
-            response = self.llm.invoke(formatted_prompt)
+            await self._aensure_ready()
+            if len(articles) > config.SENTIMENT_CHUNK_SIZE:
+                return await self._amap_reduce_sentiment(query, articles, on_field)
             
-            try:
-                return self.sentiment_parser.parse(response.content)
-            except Exception as parse_error:
-                error_msg = f"Failed to parse sentiment analysis response: {str(parse_error)}"
-                logger.error(error_msg)
-                raise ValueError(error_msg)
+            logger.info(f"Analyzing sentiment for query: {query}")
+            return await self._aanalyze_sentiment_chunk(query, articles, on_field)
                 
         except Exception as e:
             error_msg = f"Error analyzing sentiment for query '{query}': {str(e)}"
             logger.error(error_msg)
             raise
+    
+    async def _aanalyze_sentiment_chunk(self, query: str, articles: list,
+                                        on_field: Optional[FieldCallback] = None) -> Dict[str, Any]:
+        """Analyze one prompt's worth of articles."""
+        formatted_prompt, packing_report = self._build_sentiment_prompt(query, articles)
+        sentiment_analysis = await self._astream_and_parse(
+            formatted_prompt, self.sentiment_parser, "sentiment analysis response", SENTIMENT_PROMPT_VERSION, on_field
+        )
+        return {**sentiment_analysis, "prompt_packing": packing_report, "chunk_count": 1}
+    
+    async def _amap_reduce_sentiment(self, query: str, articles: list,
+                                     on_field: Optional[FieldCallback] = None) -> Dict[str, Any]:
+        """
+        Analyze article chunks in parallel, then merge them with one summary-merging LLM call.
+        
+        The locally merged fields are reported through on_field before the summary merge starts.
+        """
+        chunks = chunk_articles(articles, config.SENTIMENT_CHUNK_SIZE)
+        logger.info(f"Analyzing sentiment for query: {query} in {len(chunks)} chunks of {len(articles)} articles")
+        
+        chunk_results = await asyncio.gather(*(
+            self._aanalyze_sentiment_chunk(query, chunk) for chunk in chunks
+        ))
+        merged = {
+            **merge_sentiments(chunk_results, [len(chunk) for chunk in chunks]),
+            "key_entities": merge_entities(chunk_results),
+        }
+        if on_field is not None:
+            for name, value in merged.items():
+                await on_field(name, value)
+        
+        summary_merge = await self._astream_and_parse(
+            self._build_summary_merge_prompt(query, [result["key_takeaway_summary"] for result in chunk_results]),
+            self.summary_parser, "summary merge response", SUMMARY_MERGE_PROMPT_VERSION, on_field
+        )
+        
+        return {
+            **merged,
+            "key_takeaway_summary": summary_merge["key_takeaway_summary"],
+            "prompt_packing": merge_packing_reports([result["prompt_packing"] for result in chunk_results]),
+            "chunk_count": len(chunks),
+        }
 
 
 llm_service = LLMService()
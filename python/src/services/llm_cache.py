@@ -0,0 +1,136 @@
+"""
+LLM result cache module.
+
+This module persists parsed LLM outputs in SQLite under a content hash of everything that
+determines them: model name, temperature, prompt version and the fully formatted prompt.
+Changing any of these produces a new key, so stale results are never served after a
+model or prompt change. The cache is bounded in bytes and evicts least recently used
+entries first.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_results_last_used_at ON llm_results (last_used_at);
+"""
+
+
+class LLMResultCache:
+    """Disk-backed, size-bounded LRU cache of parsed LLM outputs."""
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Open (and if needed create) the cache.
+
+        Args:
+            path: SQLite database path, or ":memory:" for a private in-memory cache
+            max_bytes: Upper bound for the summed size of all cached values
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(SCHEMA)
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(model_name: str, temperature: Any, prompt_version: str, prompt: str) -> str:
+        """Build the content hash identifying one LLM request."""
+        material = json.dumps([model_name, str(temperature), prompt_version, prompt])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None. Cache failures are logged and treated as misses."""
+        try:
+            with self._lock, self._connection:
+                row = self._connection.execute("SELECT value FROM llm_results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self._counters["misses"] += 1
+                    return None
+                self._connection.execute(
+                    "UPDATE llm_results SET last_used_at = ? WHERE key = ?", (time.time(), key)
+                )
+                self._counters["hits"] += 1
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {str(e)}")
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result and evict least recently used entries beyond the size limit."""
+        encoded = json.dumps(value)
+        size = len(encoded)
+        if size > self.max_bytes:
+            logger.warning(f"LLM result of {size} bytes exceeds cache size, not cached")
+            return
+
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO llm_results (key, value, size, last_used_at) VALUES (?, ?, ?, ?)",
+                    (key, encoded, size, time.time()),
+                )
+                self._evict()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {str(e)}")
+
+    def _evict(self) -> None:
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM llm_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._connection.execute("SELECT key, size FROM llm_results ORDER BY last_used_at").fetchall()
+        evicted_keys = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted_keys.append((key,))
+            total -= size
+
+        self._connection.executemany("DELETE FROM llm_results WHERE key = ?", evicted_keys)
+        self._counters["evictions"] += len(evicted_keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the cache counters and occupancy."""
+        with self._lock:
+            entries, total = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_results"
+            ).fetchone()
+            return {**self._counters, "entries": entries, "bytes": total, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+def _open_llm_result_cache() -> Optional[LLMResultCache]:
+    """Open the configured cache. The cache is an optimization, so failing to open it only disables it."""
+    if not config.LLM_CACHE_PATH:
+        logger.info("LLM_CACHE_PATH is empty, LLM result cache disabled")
+        return None
+    try:
+        return LLMResultCache(config.LLM_CACHE_PATH, config.LLM_CACHE_MAX_BYTES)
+    except sqlite3.Error as e:
+        logger.error(f"Failed to open LLM result cache at {config.LLM_CACHE_PATH}: {str(e)}")
+        return None
+
+
+llm_result_cache = _open_llm_result_cache()
@@ -0,0 +1,221 @@
+"""
+Local sentiment module.
+
+This module scores the sentiment of news articles on the CPU with a weighted lexicon, as a
+first tier in front of the LLM. Lexicon hits of all articles are summed in one NumPy pass
+and each article score is squashed to [-1, 1]. The scorer also reports how confident it is,
+so callers can escalate uncertain cases to the LLM. Confidence grows with the number of
+scored tokens (a handful of lexicon hits is weak evidence, however polar) and needs
+agreement both across articles and across the scored tokens, so sets of mixed news stay
+below the escalation threshold even when their average leans one way.
+
+A lexicon cannot tell a neutral story from one whose wording it does not cover, so neutral
+verdicts never get more than NEUTRAL_MAX_CONFIDENCE.
+"""
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.config import config
+from src.services.metrics import sentiment_requests
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+NEGATORS = frozenset({"not", "no", "never", "without", "neither", "nor", "hardly", "barely"})
+# Tokens after a negator whose polarity is flipped
+NEGATION_WINDOW = 3
+# VADER-style normalization constant: score / sqrt(score^2 + alpha)
+NORMALIZATION_ALPHA = 15.0
+POLARITY_THRESHOLD = 0.1
+STRONG_POLARITY = 0.4
+NEUTRAL_MAX_CONFIDENCE = 0.5
+# Scored tokens needed before the amount of evidence stops limiting the confidence
+MIN_SCORED_TOKENS = 8
+
+DEFAULT_LEXICON = {
+    # Positive
+    "gain": 1.5, "gains": 1.5, "gained": 1.5, "growth": 1.5, "grow": 1.0, "grows": 1.0, "growing": 1.0,
+    "surge": 2.0, "surges": 2.0, "surged": 2.0, "soar": 2.5, "soars": 2.5, "soared": 2.5,
+    "rally": 2.0, "rallies": 2.0, "rallied": 2.0, "profit": 1.5, "profits": 1.5, "profitable": 2.0,
+    "boost": 1.5, "boosts": 1.5, "boosted": 1.5, "win": 2.0, "wins": 2.0, "won": 2.0,
+    "success": 2.0, "successful": 2.0, "strong": 1.5, "stronger": 1.5, "improve": 1.5, "improves": 1.5,
+    "improved": 1.5, "improvement": 1.5, "breakthrough": 2.5, "beat": 1.0, "beats": 1.0, "upbeat": 2.0,
+    "optimism": 2.0, "optimistic": 2.0, "recovery": 1.5, "recover": 1.0, "recovers": 1.0, "recovered": 1.5,
+    "expand": 1.0, "expands": 1.0, "expansion": 1.0, "approve": 1.0, "approved": 1.0, "approval": 1.0,
+    "celebrate": 2.0, "celebrates": 2.0, "celebrated": 2.0, "praise": 2.0, "praised": 2.0,
+    "hope": 1.5, "hopeful": 1.5, "good": 1.5, "great": 2.5, "best": 2.5, "positive": 2.0,
+    "benefit": 1.5, "benefits": 1.5, "innovative": 1.5, "innovation": 1.5, "advance": 1.0, "advances": 1.0,
+    "milestone": 2.0, "thrive": 2.0, "thrives": 2.0, "thriving": 2.0, "bullish": 2.0,
+    "upgrade": 1.5, "upgraded": 1.5, "exceed": 1.5, "exceeds": 1.5, "exceeded": 1.5, "robust": 1.5,
+    "healthy": 1.5, "secure": 1.0, "secured": 1.0, "peace": 2.0, "rescue": 1.5, "rescued": 2.0,
+    "award": 2.0, "awarded": 2.0, "record": 1.0, "partnership": 1.0,
+    # Negative
+    "loss": -1.5, "losses": -1.5, "lose": -1.5, "lost": -1.5, "decline": -1.5, "declines": -1.5,
+    "declined": -1.5, "drop": -1.5, "drops": -1.5, "dropped": -1.5, "fall": -1.5, "falls": -1.5,
+    "fell": -1.5, "plunge": -2.5, "plunges": -2.5, "plunged": -2.5, "crash": -2.5, "crashes": -2.5,
+    "crashed": -2.5, "slump": -2.0, "slumps": -2.0, "slumped": -2.0, "weak": -1.5, "weaker": -1.5,
+    "crisis": -2.5, "fail": -2.0, "fails": -2.0, "failed": -2.0, "failure": -2.0, "fear": -2.0,
+    "fears": -2.0, "concern": -1.0, "concerns": -1.0, "warn": -1.5, "warns": -1.5, "warning": -1.5,
+    "risk": -1.0, "risks": -1.0, "threat": -2.0, "threats": -2.0, "attack": -2.5, "attacks": -2.5,
+    "attacked": -2.5, "war": -2.5, "kill": -3.0, "kills": -3.0, "killed": -3.0, "death": -2.5,
+    "deaths": -2.5, "dead": -2.5, "lawsuit": -1.5, "sued": -1.5, "fraud": -3.0, "scandal": -2.5,
+    "layoff": -2.0, "layoffs": -2.0, "recession": -2.5, "bankrupt": -3.0, "bankruptcy": -3.0,
+    "collapse": -2.5, "collapsed": -2.5, "conflict": -2.0, "protest": -1.0, "protests": -1.0,
+    "ban": -1.0, "banned": -1.5, "penalty": -1.5, "investigation": -1.0, "probe": -1.0,
+    "shortage": -1.5, "delay": -1.0, "delays": -1.0, "delayed": -1.0, "downgrade": -1.5,
+    "downgraded": -1.5, "bearish": -2.0, "negative": -2.0, "bad": -2.0, "worse": -2.0, "worst": -2.5,
+    "violence": -2.5, "disaster": -3.0, "damage": -2.0, "damaged": -2.0, "outage": -2.0, "breach": -2.0,
+    "hacked": -2.0, "recall": -1.5, "recalled": -1.5, "controversy": -1.5, "criticism": -1.5,
+    "criticized": -1.5, "struggle": -1.5, "struggles": -1.5, "uncertainty": -1.5, "turmoil": -2.5,
+    "slowdown": -1.5, "deficit": -1.0,
+}
+
+
+def _confidence_label(confidence: float) -> str:
+    if confidence >= 0.8:
+        return "high"
+    if confidence >= 0.5:
+        return "medium"
+    return "low"
+
+
+class LocalSentimentScorer:
+    """Vectorized lexicon scorer for the sentiment of a set of articles."""
+
+    def __init__(self, lexicon: Dict[str, float]):
+        """
+        Build the scorer.
+
+        Args:
+            lexicon: Lower-case word to polarity weight; positive weights mean positive sentiment
+        """
+        self._vocabulary = {word: index for index, word in enumerate(lexicon)}
+        self._weights = np.fromiter(lexicon.values(), dtype=np.float64, count=len(lexicon))
+
+    def _lexicon_hits(self, articles: List[Dict[str, Any]]):
+        """Return (article index, word index, sign) arrays for every lexicon word in the articles."""
+        article_ids, word_ids, signs = [], [], []
+        for article_id, article in enumerate(articles):
+            text = f"{article.get('title') or ''} {article.get('description') or ''}".lower()
+            negated_until = -1
+            for position, token in enumerate(TOKEN_PATTERN.findall(text)):
+                if token in NEGATORS or token.endswith("n't"):
+                    negated_until = position + NEGATION_WINDOW
+                    continue
+                word_id = self._vocabulary.get(token)
+                if word_id is not None:
+                    article_ids.append(article_id)
+                    word_ids.append(word_id)
+                    signs.append(-1.0 if position <= negated_until else 1.0)
+        return (np.array(article_ids, dtype=np.intp), np.array(word_ids, dtype=np.intp),
+                np.array(signs, dtype=np.float64))
+
+    def analyze(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Score the overall sentiment of articles.
+
+        Args:
+            articles: Article dictionaries with title and description
+
+        Returns:
+            A dictionary in the shape of LLMService.aanalyze_sentiment results (key_entities are
+            left empty for the caller to fill in), plus the numeric confidence in [0, 1] under
+            "confidence"
+        """
+        article_count = len(articles)
+        article_ids, word_ids, signs = self._lexicon_hits(articles)
+        contributions = self._weights[word_ids] * signs
+        raw_scores = np.bincount(article_ids, weights=contributions, minlength=article_count)
+        hit_counts = np.bincount(article_ids, minlength=article_count)
+        scores = raw_scores / np.sqrt(raw_scores ** 2 + NORMALIZATION_ALPHA)
+
+        mean_score = float(scores.mean()) if article_count else 0.0
+        covered = hit_counts > 0
+        coverage = float(covered.mean()) if article_count else 0.0
+
+        if mean_score >= POLARITY_THRESHOLD:
+            overall_sentiment, leaning = "positive", scores > 0
+        elif mean_score <= -POLARITY_THRESHOLD:
+            overall_sentiment, leaning = "negative", scores < 0
+        else:
+            overall_sentiment, leaning = "neutral", np.abs(scores) < POLARITY_THRESHOLD
+
+        if overall_sentiment == "neutral":
+            confidence = coverage * (1.0 - abs(mean_score) / POLARITY_THRESHOLD) * NEUTRAL_MAX_CONFIDENCE
+        else:
+            direction = -1.0 if overall_sentiment == "negative" else 1.0
+            article_agreement = float(leaning[covered].mean()) if covered.any() else 0.0
+            # Net share of the scored weight pointing the overall way: 1 when all tokens agree
+            token_agreement = max(0.0, direction * float(contributions.sum())) / float(np.abs(contributions).sum())
+            evidence = min(1.0, len(contributions) / MIN_SCORED_TOKENS)
+            strength = min(1.0, abs(mean_score) / STRONG_POLARITY)
+            confidence = coverage * article_agreement * token_agreement * evidence * (0.5 + 0.5 * strength)
+
+        if article_count and leaning.any():
+            direction = -1.0 if overall_sentiment == "negative" else 1.0
+            lead_index = int(np.argmax(np.where(leaning, scores * direction, -np.inf)))
+            summary = (f"{int(leaning.sum())} of {article_count} articles read as {overall_sentiment}, "
+                       f"led by \"{articles[lead_index].get('title')}\"")
+        else:
+            summary = f"No clear sentiment across {article_count} articles"
+
+        return {
+            "overall_sentiment": overall_sentiment,
+            "sentiment_confidence": _confidence_label(confidence),
+            "key_entities": {"people": [], "organizations": [], "locations": []},
+            "key_takeaway_summary": summary,
+            "confidence": round(confidence, 3),
+        }
+
+
+class EscalationCounter:
+    """Counts how many sentiment requests the local tier answered and how many went to the LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.local_answers = 0
+        self.escalations = 0
+
+    def record(self, escalated: bool) -> None:
+        """Record one sentiment request."""
+        with self._lock:
+            if escalated:
+                self.escalations += 1
+            else:
+                self.local_answers += 1
+        sentiment_requests.inc(("llm" if escalated else "local",))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the counters and the share of requests escalated to the LLM."""
+        with self._lock:
+            total = self.local_answers + self.escalations
+            return {
+                "local_answers": self.local_answers,
+                "escalations": self.escalations,
+                "escalation_rate": self.escalations / total if total else 0.0,
+            }
+
+
+def load_lexicon(path: str) -> Dict[str, float]:
+    """Load a lexicon from a JSON object of word to polarity weight."""
+    with open(path, encoding="utf-8") as lexicon_file:
+        return {word.lower(): float(weight) for word, weight in json.load(lexicon_file).items()}
+
+
+def _build_local_sentiment_scorer() -> LocalSentimentScorer:
+    """Build the scorer from the configured lexicon, falling back to the built-in one."""
+    if config.LOCAL_SENTIMENT_LEXICON_PATH:
+        try:
+            return LocalSentimentScorer(load_lexicon(config.LOCAL_SENTIMENT_LEXICON_PATH))
+        except (OSError, ValueError, AttributeError) as e:
+            logger.error(f"Failed to load sentiment lexicon {config.LOCAL_SENTIMENT_LEXICON_PATH}, "
+                         f"using the built-in lexicon: {str(e)}")
+    return LocalSentimentScorer(DEFAULT_LEXICON)
+
+
+local_sentiment_scorer = _build_local_sentiment_scorer()
@@ -0,0 +1,243 @@
+"""
+Metrics module.
+
+This module keeps in-process counters, gauges and histograms and renders them in the
+Prometheus text exposition format for the /metrics route. Recording is a dictionary
+lookup and an addition under a per-metric lock; labels are passed as tuples in the
+order of the metric's label names, and all formatting work happens at scrape time.
+State that other components already keep, such as the remaining daily quota, is exported
+through function gauges read at scrape time.
+"""
+import abc
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upstream calls range from milliseconds (cached NewsAPI answers) to a minute (long LLM completions)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(abc.ABC):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """Return the sample lines of the metric."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        return "\n".join(lines + self._samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in values]
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down."""
+
+    type_name = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class FunctionGauge(_Metric):
+    """Gauge whose values are read at scrape time from a function returning a value per label set."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...],
+                 read: Callable[[], Dict[Labels, Optional[float]]]):
+        super().__init__(name, documentation, labelnames)
+        self._read = read
+
+    def _samples(self) -> List[str]:
+        try:
+            values = self._read()
+        except Exception as e:
+            logger.warning(f"Failed to read metric {self.name}: {str(e)}")
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in values.items() if value is not None]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values per label set over fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum and count
+        self._series: Dict[Labels, List[Any]] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, labels: Labels = ()) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+        lines = []
+        for labels, bucket_counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), bucket_counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the process metrics and renders them for scraping."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_function(self, name: str, documentation: str, labelnames: Tuple[str, ...],
+                       read: Callable[[], Dict[Labels, Optional[float]]]) -> FunctionGauge:
+        return self._register(FunctionGauge(name, documentation, labelnames, read))
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+metrics = MetricsRegistry()
+
+tool_duration = metrics.histogram(
+    "news_mcp_tool_duration_seconds", "Duration of MCP tool calls", ("tool",))
+tool_in_flight = metrics.gauge(
+    "news_mcp_tool_in_flight", "MCP tool calls currently running", ("tool",))
+tool_errors = metrics.counter(
+    "news_mcp_tool_errors_total", "MCP tool calls that returned an error, by error category", ("tool", "category"))
+upstream_duration = metrics.histogram(
+    "news_mcp_upstream_duration_seconds", "Duration of upstream request attempts", ("upstream", "outcome"))
+upstream_in_flight = metrics.gauge(
+    "news_mcp_upstream_in_flight", "Upstream request attempts currently running", ("upstream",))
+llm_tokens = metrics.counter(
+    "news_mcp_llm_tokens_total", "Tokens used by LLM calls that were not served from cache", ("type",))
+quota_requests = metrics.counter(
+    "news_mcp_quota_requests_total", "Upstream quota token requests by outcome (granted, queued, rejected)",
+    ("upstream", "outcome"))
+quota_waiting = metrics.gauge(
+    "news_mcp_quota_waiting", "Requests currently queued for an upstream quota token", ("upstream",))
+sentiment_requests = metrics.counter(
+    "news_mcp_sentiment_requests_total", "Sentiment requests by the tier that answered them (local, llm)", ("tier",))
+
+
+def record_llm_usage(usage_metadata: Optional[Dict[str, Any]]) -> None:
+    """Count the prompt and completion tokens of an LLM response, if it reported usage."""
+    if not isinstance(usage_metadata, dict):
+        return
+    llm_tokens.inc(("prompt",), usage_metadata.get("input_tokens") or 0)
+    llm_tokens.inc(("completion",), usage_metadata.get("output_tokens") or 0)
+
+
+def instrument_tool(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Wrap an async MCP tool to record its duration, in-flight calls and error responses.
+
+    The wrapper keeps the tool's name, docstring and signature, so FastMCP derives the same
+    tool schema from it. Error responses are counted by their "error" value; exceptions are
+    counted under the "exception" category.
+    """
+    labels = (fn.__name__,)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        tool_in_flight.inc(labels)
+        started = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception:
+            tool_errors.inc((fn.__name__, "exception"))
+            raise
+        finally:
+            tool_in_flight.dec(labels)
+            tool_duration.observe(time.perf_counter() - started, labels)
+        if isinstance(result, dict) and result.get("error"):
+            tool_errors.inc((fn.__name__, str(result["error"])))
+        return result
+
+    return wrapper
@@ -0,0 +1,185 @@
+"""
+NewsAPI client module.
+
+This module provides an async NewsAPI client backed by a pooled httpx connection pool.
+A single shared instance is created at import time and reused by every tool call, so
+keep-alive connections (and their TCP+TLS handshakes) survive between requests.
+It also holds what the news tools share around that client: parameter validation and
+call_newsapi, which sends a request under the NewsAPI quota and resilience policy.
+"""
+import logging
+from typing import Dict, Any, Optional
+
+import httpx
+
+from src.config import config
+from src.services.quota import newsapi_quota
+from src.services.resilience import build_resilient_caller
+
+logger = logging.getLogger(__name__)
+
+NEWSAPI_BASE_URL = "https://newsapi.org/v2"
+EVERYTHING_ENDPOINT = "/everything"
+
+
+RATE_LIMITED_CODE = "rateLimited"
+# Returned when a page lies beyond the number of results the API plan may page through
+MAX_RESULTS_REACHED_CODE = "maximumResultsReached"
+
+
+class NewsApiError(Exception):
+    """Raised when NewsAPI answers with an error payload or an unexpected status code."""
+
+    def __init__(self, message: str, code: Optional[str] = None, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+
+
+class AsyncNewsApiClient:
+    """Async NewsAPI client sharing one keep-alive connection pool per process."""
+
+    def __init__(
+        self,
+        base_url: str = NEWSAPI_BASE_URL,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the client with pool limits and timeouts taken from the configuration.
+
+        Args:
+            base_url: NewsAPI base URL
+            transport: Optional httpx transport, mainly useful for testing
+        """
+        self.base_url = base_url
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled httpx client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=config.NEWSAPI_MAX_CONNECTIONS,
+                max_keepalive_connections=config.NEWSAPI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.NEWSAPI_KEEPALIVE_EXPIRY,
+            )
+            timeout = httpx.Timeout(config.NEWSAPI_TIMEOUT, connect=config.NEWSAPI_CONNECT_TIMEOUT)
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=limits,
+                timeout=timeout,
+                transport=self._transport,
+            )
+            logger.info(
+                f"Created NewsAPI connection pool (max_connections={config.NEWSAPI_MAX_CONNECTIONS}, "
+                f"max_keepalive={config.NEWSAPI_MAX_KEEPALIVE_CONNECTIONS})"
+            )
+        return self._client
+
+    async def get_everything(
+        self,
+        api_key: str,
+        q: str,
+        language: str,
+        page_size: int,
+        sort_by: str = "publishedAt",
+        from_date: Optional[str] = None,
+        page: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Call the NewsAPI /everything endpoint.
+
+        Args:
+            api_key: NewsAPI API key
+            q: Search query
+            language: News language (e.g., "en")
+            page_size: Amount of articles to return per page
+            sort_by: Sort order of the results
+            from_date: Optional ISO 8601 timestamp of the oldest article to return (inclusive)
+            page: Optional 1-based page number of the results
+
+        Returns:
+            The decoded NewsAPI JSON payload
+
+        Raises:
+            NewsApiError: If NewsAPI returns an error payload
+            httpx.HTTPError: If the request fails at the transport level
+        """
+        params = {
+            "q": q,
+            "language": language,
+            "pageSize": page_size,
+            "sortBy": sort_by,
+        }
+        if from_date:
+            params["from"] = from_date
+        if page:
+            params["page"] = page
+        response = await self._get_client().get(
+            EVERYTHING_ENDPOINT,
+            params=params,
+            headers={"X-Api-Key": api_key},
+        )
+
+        try:
+            payload = response.json()
+        except ValueError:
+            raise NewsApiError(f"NewsAPI returned a non-JSON response (HTTP {response.status_code})",
+                               status_code=response.status_code)
+
+        if response.status_code != 200 or payload.get("status") != "ok":
+            code = payload.get("code") or (RATE_LIMITED_CODE if response.status_code == 429 else None)
+            raise NewsApiError(payload.get("message", f"NewsAPI returned HTTP {response.status_code}"), code,
+                               response.status_code)
+
+        return payload
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+news_api_client = AsyncNewsApiClient(base_url=config.NEWSAPI_BASE_URL)
+
+
+def _is_transient_newsapi_error(error: BaseException) -> bool:
+    """Transport failures and 5xx answers are worth retrying; other NewsAPI errors are not."""
+    if isinstance(error, httpx.TransportError):
+        return True
+    return isinstance(error, NewsApiError) and (error.status_code or 0) >= 500
+
+# Retries and hedges each take their own quota token, so they stay within the NewsAPI quota
+newsapi_resilience = build_resilient_caller("NewsAPI", _is_transient_newsapi_error, config.NEWSAPI_HEDGING)
+
+
+def validate_search_params(query: str, page_size: int, api_key: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Return an error response if the search parameters are invalid, otherwise None."""
+    if not query:
+        logger.error("Query parameter is required")
+        return {"error": "Query parameter is required"}
+
+    if page_size < 1 or page_size > 100:
+        logger.error(f"Invalid page size: {page_size}")
+        return {"error": "Invalid page size", "message": "Page size must be between 1 and 100"}
+
+    if not api_key:
+        logger.error("NEWSAPI_API_KEY not configured")
+        return {"error": "Configuration error", "message": "NEWSAPI_API_KEY is required in environment variables"}
+
+    return None
+
+
+async def call_newsapi(params: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    """Send one /everything request, taking a quota token per attempt, under the resilience policy."""
+    async def request_once() -> Dict[str, Any]:
+        await newsapi_quota.acquire(config.NEWSAPI_QUOTA_WAIT_TIMEOUT)
+        try:
+            return await news_api_client.get_everything(api_key=api_key, **params)
+        except NewsApiError as e:
+            if e.code == RATE_LIMITED_CODE:
+                newsapi_quota.mark_exhausted()
+            raise
+
+    return await newsapi_resilience.call(request_once)
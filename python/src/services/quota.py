@@ -0,0 +1,178 @@
+"""
+Upstream quota module.
+
+This module keeps a process-wide account of a request quota with two limits: a token bucket
+for the per-second rate (its capacity allows short bursts) and a daily allowance that resets
+at midnight UTC. Callers acquire a token before every upstream request. When none is
+available they wait in a first-come, first-served queue up to their deadline; if the next
+token cannot arrive in time they fail immediately with QuotaExceededError instead of
+waiting for nothing, so callers can fall back to cached data.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from src.config import config
+from src.services.metrics import metrics, quota_requests, quota_waiting
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+
+
+class QuotaExceededError(Exception):
+    """Raised when no quota token can be obtained before the caller's deadline."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QuotaScheduler:
+    """Token bucket for the per-second rate combined with a daily request allowance."""
+
+    def __init__(self, name: str, daily_limit: int, requests_per_second: float, burst: int = 1):
+        """
+        Create the scheduler.
+
+        Args:
+            name: Name of the upstream, used in logs and errors
+            daily_limit: Requests allowed per UTC day; 0 disables the daily limit
+            requests_per_second: Sustained request rate; 0 disables the rate limit
+            burst: Number of requests that may be sent back to back before the rate applies
+        """
+        self.name = name
+        self.daily_limit = daily_limit
+        self.requests_per_second = requests_per_second
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._day = self._current_day()
+        self._used_today = 0
+        self._queue_lock = None
+        self._queue_loop = None
+        self._counters = {"granted": 0, "queued": 0, "rejected": 0}
+
+    @staticmethod
+    def _current_day() -> int:
+        return int(time.time() // SECONDS_PER_DAY)
+
+    def _roll_day(self) -> None:
+        today = self._current_day()
+        if today != self._day:
+            self._day = today
+            self._used_today = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.requests_per_second > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.requests_per_second)
+        self._refilled_at = now
+
+    def _seconds_until_available(self) -> float:
+        """Return how long until a request may be sent, assuming no one else takes the token."""
+        self._roll_day()
+        if self.daily_limit and self._used_today >= self.daily_limit:
+            return (self._day + 1) * SECONDS_PER_DAY - time.time()
+        if self.requests_per_second <= 0:
+            return 0.0
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.requests_per_second
+
+    def _get_queue_lock(self) -> asyncio.Lock:
+        """Return the queue lock of the running event loop; asyncio.Lock wakes waiters in FIFO order."""
+        loop = asyncio.get_running_loop()
+        if self._queue_loop is not loop:
+            self._queue_lock = asyncio.Lock()
+            self._queue_loop = loop
+        return self._queue_lock
+
+    def _take(self) -> None:
+        self._used_today += 1
+        if self.requests_per_second > 0:
+            self._tokens -= 1
+        self._counters["granted"] += 1
+        quota_requests.inc((self.name, "granted"))
+
+    async def acquire(self, timeout: float) -> None:
+        """
+        Take one request token, waiting in line for at most timeout seconds.
+
+        Args:
+            timeout: Maximum seconds to wait, including time spent queued behind other callers
+
+        Raises:
+            QuotaExceededError: If no token can be obtained within timeout
+        """
+        deadline = time.monotonic() + timeout
+        queue_lock = self._get_queue_lock()
+        if not queue_lock.locked() and self._seconds_until_available() == 0:
+            self._take()
+            return
+
+        self._counters["queued"] += 1
+        quota_requests.inc((self.name, "queued"))
+        quota_waiting.inc((self.name,))
+        try:
+            try:
+                await asyncio.wait_for(queue_lock.acquire(), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                self._reject(self._seconds_until_available())
+
+            try:
+                while True:
+                    wait = self._seconds_until_available()
+                    if wait == 0:
+                        self._take()
+                        return
+                    if time.monotonic() + wait > deadline:
+                        self._reject(wait)
+                    await asyncio.sleep(wait)
+            finally:
+                queue_lock.release()
+        finally:
+            quota_waiting.dec((self.name,))
+
+    def _reject(self, retry_after: float) -> None:
+        self._counters["rejected"] += 1
+        quota_requests.inc((self.name, "rejected"))
+        logger.warning(f"{self.name} quota exhausted, next request possible in {retry_after:.1f}s")
+        raise QuotaExceededError(f"{self.name} request quota exhausted, retry in {retry_after:.1f}s", retry_after)
+
+    def mark_exhausted(self) -> None:
+        """Treat today's allowance as used up, e.g. after the upstream itself reported a rate limit."""
+        self._roll_day()
+        if self.daily_limit:
+            self._used_today = max(self._used_today, self.daily_limit)
+        self._tokens = 0.0
+        self._refilled_at = time.monotonic()
+        logger.warning(f"{self.name} reported its rate limit as reached")
+
+    def remaining(self) -> Dict[str, Any]:
+        """Return the remaining daily allowance and when it resets."""
+        self._roll_day()
+        return {
+            "daily_limit": self.daily_limit or None,
+            "daily_remaining": max(0, self.daily_limit - self._used_today) if self.daily_limit else None,
+            "resets_at": datetime.fromtimestamp((self._day + 1) * SECONDS_PER_DAY, timezone.utc).isoformat(),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the remaining quota and the granted, queued and rejected request counters."""
+        return {**self.remaining(), "requests_per_second": self.requests_per_second, **self._counters}
+
+
+newsapi_quota = QuotaScheduler(
+    name="NewsAPI",
+    daily_limit=config.NEWSAPI_DAILY_LIMIT,
+    requests_per_second=config.NEWSAPI_REQUESTS_PER_SECOND,
+    burst=config.NEWSAPI_BURST,
+)
+
+metrics.gauge_function(
+    "news_mcp_quota_daily_remaining", "Requests left in today's upstream quota; absent without a daily limit",
+    ("upstream",), lambda: {(newsapi_quota.name,): newsapi_quota.remaining()["daily_remaining"]})
@@ -0,0 +1,324 @@
+"""
+Upstream resilience module.
+
+This module wraps calls to an upstream (NewsAPI, OpenAI) with:
+
+- bounded retries with full-jitter exponential backoff, limited by a retry budget so
+  retries can add at most a fixed share of extra load to an already struggling upstream;
+- a circuit breaker that fails fast after consecutive failures and lets a single probe
+  call through once the recovery timeout has passed;
+- optional hedging: when an attempt is slower than the recent p95 latency, a duplicate
+  is sent and whichever finishes first wins.
+
+Retries and hedges repeat the call, so they are only used for idempotent calls. Circuit
+state changes are logged and counted.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from src.config import config
+from src.services.metrics import upstream_duration, upstream_in_flight
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Hedging needs a latency distribution to compute the p95 delay from
+MIN_LATENCY_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        """
+        Create a closed breaker.
+
+        Args:
+            name: Name of the upstream, used in logs and errors
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds the circuit stays open before a probe call is allowed
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.transitions: Dict[str, int] = {}
+        self.short_circuited = 0
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == self.state:
+            return
+        transition = f"{self.state.value}->{state.value}"
+        self.transitions[transition] = self.transitions.get(transition, 0) + 1
+        log = logger.info if state == CircuitState.CLOSED else logger.warning
+        log(f"{self.name} circuit {transition}")
+        self.state = state
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may go through.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half open with its probe already in flight
+        """
+        if self.state == CircuitState.OPEN:
+            remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+            if remaining > 0:
+                self.short_circuited += 1
+                raise CircuitOpenError(f"{self.name} circuit is open, failing fast", remaining)
+            self._transition(CircuitState.HALF_OPEN)
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probe_in_flight:
+                self.short_circuited += 1
+                raise CircuitOpenError(f"{self.name} circuit is half open, waiting for the probe call",
+                                       self.recovery_timeout)
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit after too many consecutive failures."""
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(CircuitState.OPEN)
+
+    def release_probe(self) -> None:
+        """Give up a probe call that ended without an upstream verdict, e.g. because it was cancelled."""
+        self._probe_in_flight = False
+
+
+class RetryBudget:
+    """Allows retries up to a fixed ratio of requests, plus a small reserve."""
+
+    def __init__(self, ratio: float, reserve: int):
+        """
+        Create a full budget.
+
+        Args:
+            ratio: Retries earned per request, e.g. 0.2 allows one retry per five requests
+            reserve: Maximum retries that can be saved up, so bursts after idle time are bounded
+        """
+        self.ratio = ratio
+        self.reserve = reserve
+        self._balance = float(reserve)
+
+    def record_request(self) -> None:
+        self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget, returning False if it is exhausted."""
+        if self._balance < 1:
+            return False
+        self._balance -= 1
+        return True
+
+
+class ResilientCaller:
+    """Applies the circuit breaker, retries and hedging to calls to one upstream."""
+
+    def __init__(
+        self,
+        name: str,
+        is_retryable: Callable[[BaseException], bool],
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        retry_budget: RetryBudget,
+        breaker: CircuitBreaker,
+        hedging: bool = False,
+        hedge_min_delay: float = 0.0,
+    ):
+        """
+        Create the caller.
+
+        Args:
+            name: Name of the upstream, used in logs
+            is_retryable: Whether an error is transient; only these are retried and count against the circuit
+            max_attempts: Maximum attempts per call, the first one included
+            base_delay: Backoff before the first retry, doubled for every further retry
+            max_delay: Upper bound of the backoff
+            retry_budget: Budget shared by all calls to the upstream
+            breaker: Circuit breaker of the upstream
+            hedging: Whether to send a duplicate attempt once one is slower than the recent p95
+            hedge_min_delay: Lower bound of the hedging delay
+        """
+        self.name = name
+        self.is_retryable = is_retryable
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.breaker = breaker
+        self.hedging = hedging
+        self.hedge_min_delay = hedge_min_delay
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counters = {"calls": 0, "failures": 0, "retries": 0, "retry_budget_exhausted": 0,
+                          "hedges": 0, "hedge_wins": 0}
+
+    def _backoff(self, retry: int) -> float:
+        """Full-jitter exponential backoff for the given retry number (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Return the p95 latency of recent attempts, or None until enough samples exist."""
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return max(self.hedge_min_delay, ordered[int(0.95 * (len(ordered) - 1))])
+
+    async def _timed(self, fn: Callable[[], Awaitable[T]]) -> T:
+        upstream_in_flight.inc((self.name,))
+        started = time.monotonic()
+        outcome = "error"
+        try:
+            result = await fn()
+            outcome = "ok"
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            upstream_in_flight.dec((self.name,))
+            upstream_duration.observe(elapsed, (self.name, outcome))
+        self._latencies.append(elapsed)
+        return result
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], hedge: bool) -> T:
+        """Run one attempt, hedged with a duplicate when it outlasts the p95 delay."""
+        hedge_delay = self._hedge_delay() if hedge else None
+        if hedge_delay is None:
+            return await self._timed(fn)
+
+        primary = asyncio.ensure_future(self._timed(fn))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            self._counters["hedges"] += 1
+            hedged = asyncio.ensure_future(self._timed(fn))
+            tasks.append(hedged)
+            pending = {primary, hedged}
+            first_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedged:
+                            self._counters["hedge_wins"] += 1
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def call(self, fn: Callable[[], Awaitable[T]], idempotent: bool = True,
+                   retry_while: Optional[Callable[[], bool]] = None) -> T:
+        """
+        Call the upstream through the circuit breaker, retrying and hedging idempotent calls.
+
+        Args:
+            fn: Coroutine function performing one upstream request
+            idempotent: Whether fn may safely run more than once; otherwise it is neither retried nor hedged
+            retry_while: For a call that is not idempotent, checked after a failed attempt; the call is
+                still retried (never hedged) while it returns True, e.g. until a side effect has happened
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: The last error once attempts or retry budget are exhausted, or any non-retryable error
+        """
+        self._counters["calls"] += 1
+        self.retry_budget.record_request()
+        attempt = 1
+        while True:
+            self.breaker.before_call()
+            try:
+                result = await self._attempt(fn, hedge=idempotent and self.hedging)
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                if not self.is_retryable(e):
+                    self.breaker.release_probe()
+                    raise
+                self.breaker.record_failure()
+                self._counters["failures"] += 1
+                retryable = idempotent or (retry_while is not None and retry_while())
+                if not retryable or attempt >= self.max_attempts:
+                    raise
+                if not self.retry_budget.try_spend():
+                    self._counters["retry_budget_exhausted"] += 1
+                    logger.warning(f"{self.name} retry budget exhausted, not retrying: {str(e)}")
+                    raise
+                delay = self._backoff(attempt)
+                self._counters["retries"] += 1
+                logger.warning(f"{self.name} attempt {attempt} failed, retrying in {delay:.2f}s: {str(e)}")
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the circuit state, its transition counts and the retry and hedging counters."""
+        hedge_delay = self._hedge_delay()
+        return {
+            "circuit_state": self.breaker.state.value,
+            "circuit_transitions": dict(self.breaker.transitions),
+            "short_circuited": self.breaker.short_circuited,
+            **self._counters,
+            "hedge_delay": round(hedge_delay, 4) if hedge_delay is not None else None,
+        }
+
+
+def build_resilient_caller(name: str, is_retryable: Callable[[BaseException], bool], hedging: bool) -> ResilientCaller:
+    """Create a caller for an upstream using the configured retry, budget and circuit settings."""
+    return ResilientCaller(
+        name=name,
+        is_retryable=is_retryable,
+        max_attempts=config.UPSTREAM_MAX_ATTEMPTS,
+        base_delay=config.UPSTREAM_RETRY_BASE_DELAY,
+        max_delay=config.UPSTREAM_RETRY_MAX_DELAY,
+        retry_budget=RetryBudget(config.UPSTREAM_RETRY_BUDGET_RATIO, config.UPSTREAM_RETRY_BUDGET_RESERVE),
+        breaker=CircuitBreaker(name, config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RECOVERY_TIMEOUT),
+        hedging=hedging,
+        hedge_min_delay=config.HEDGE_MIN_DELAY,
+    )
@@ -0,0 +1,103 @@
+"""
+Sentiment map-reduce module.
+
+This module splits large article sets into chunks for parallel sentiment analysis and
+merges the per-chunk results without another model call: sentiments are combined by a
+vote weighted by chunk size and confidence, and entity lists are unioned and ranked by
+how many chunks mention them. Only the summaries need the LLM to be merged.
+"""
+import math
+from typing import Any, Dict, List
+
+CONFIDENCE_WEIGHTS = {"high": 1.0, "medium": 0.6, "low": 0.3}
+DEFAULT_CONFIDENCE_WEIGHT = CONFIDENCE_WEIGHTS["medium"]
+ENTITY_TYPES = ("people", "organizations", "locations")
+MAX_MERGED_ENTITIES = 20
+PACKING_COUNTERS = ("tokens_before", "tokens_after", "trimmed_tokens", "truncated_descriptions")
+
+
+def chunk_articles(articles: List[Dict[str, Any]], chunk_size: int) -> List[List[Dict[str, Any]]]:
+    """Split articles into the fewest chunks of at most chunk_size, balanced so no chunk is a tiny tail."""
+    chunk_count = max(1, math.ceil(len(articles) / chunk_size))
+    base_size, larger_chunks = divmod(len(articles), chunk_count)
+    chunks = []
+    start = 0
+    for index in range(chunk_count):
+        end = start + base_size + (1 if index < larger_chunks else 0)
+        chunks.append(articles[start:end])
+        start = end
+    return chunks
+
+
+def _confidence_label(score: float) -> str:
+    if score >= 0.7:
+        return "high"
+    if score >= 0.4:
+        return "medium"
+    return "low"
+
+
+def merge_sentiments(results: List[Dict[str, Any]], article_counts: List[int]) -> Dict[str, str]:
+    """
+    Combine per-chunk sentiments by a vote weighted by article count and confidence.
+
+    The merged confidence is the mean chunk confidence scaled by how strongly the chunks
+    agree, so a split vote lowers confidence even when every chunk was confident.
+
+    Args:
+        results: Per-chunk sentiment analyses
+        article_counts: Number of articles in each chunk
+
+    Returns:
+        The merged overall_sentiment and sentiment_confidence
+    """
+    votes: Dict[str, float] = {}
+    confidence_total = 0.0
+    for result, article_count in zip(results, article_counts):
+        sentiment = str(result.get("overall_sentiment", "")).strip().lower() or "neutral"
+        confidence = CONFIDENCE_WEIGHTS.get(
+            str(result.get("sentiment_confidence", "")).strip().lower(), DEFAULT_CONFIDENCE_WEIGHT
+        )
+        votes[sentiment] = votes.get(sentiment, 0.0) + article_count * confidence
+        confidence_total += article_count * confidence
+
+    total_articles = sum(article_counts)
+    overall_sentiment = max(votes, key=votes.get)
+    agreement = votes[overall_sentiment] / confidence_total if confidence_total else 0.0
+    mean_confidence = confidence_total / total_articles if total_articles else 0.0
+    return {
+        "overall_sentiment": overall_sentiment,
+        "sentiment_confidence": _confidence_label(agreement * mean_confidence),
+    }
+
+
+def merge_entities(results: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Union the key entities of all chunks, most frequently mentioned first, ignoring case duplicates."""
+    merged = {}
+    for entity_type in ENTITY_TYPES:
+        mentions: Dict[str, int] = {}
+        spellings: Dict[str, str] = {}
+        for result in results:
+            entities = result.get("key_entities")
+            if not isinstance(entities, dict):
+                continue
+            seen_in_chunk = set()
+            for entity in entities.get(entity_type) or []:
+                normalized = " ".join(str(entity).lower().split())
+                if not normalized or normalized in seen_in_chunk:
+                    continue
+                seen_in_chunk.add(normalized)
+                spellings.setdefault(normalized, str(entity).strip())
+                mentions[normalized] = mentions.get(normalized, 0) + 1
+        # sorted() is stable, so equally frequent entities keep their first-seen order
+        ranked = sorted(mentions, key=mentions.get, reverse=True)
+        merged[entity_type] = [spellings[normalized] for normalized in ranked[:MAX_MERGED_ENTITIES]]
+    return merged
+
+
+def merge_packing_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum the per-chunk prompt packing reports; token_budget stays the per-chunk budget."""
+    merged = {"token_budget": reports[0]["token_budget"] if reports else 0}
+    for counter in PACKING_COUNTERS:
+        merged[counter] = sum(report[counter] for report in reports)
+    return merged
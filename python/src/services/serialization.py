@@ -0,0 +1,41 @@
+"""
+JSON serialization module.
+
+Tool responses, search cache entries and progress notifications are encoded with orjson,
+which is several times faster than the standard library encoder and than FastMCP's default
+pydantic serializer, and writes compact output. Article records are encoded as the
+article dicts, their parsed publication times written back with "Z" for UTC as NewsAPI does;
+other mappings are encoded as dicts and values orjson does not know fall back to their string
+form, as they do with FastMCP's default serializer.
+"""
+from collections.abc import Mapping
+from typing import Any
+
+import orjson
+
+from src.services.articles import Article
+
+
+def _default(value: Any) -> Any:
+    if type(value) is Article:
+        # Built inline rather than with to_dict(): orjson calls this once per article
+        return {"title": value.title, "description": value.description, "url": value.url,
+                "source_name": value.source_name, "published_at": value.published}
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+def dumps_bytes(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON."""
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+def dumps(value: Any) -> str:
+    """Encode a value as a compact JSON string; used as the MCP tool serializer."""
+    return dumps_bytes(value).decode()
+
+
+def loads(data: Any) -> Any:
+    """Decode JSON from a string or bytes."""
+    return orjson.loads(data)
@@ -0,0 +1,330 @@
+"""
+Shared result cache module.
+
+This module provides a SQLite-backed counterpart of TTLCache for servers running several
+worker processes. Every worker opens the same database file, so an entry stored by one
+worker is a hit for all of them. Entries follow the same fresh, stale-while-revalidate and
+stale-if-error lifecycle, timed with the wall clock because monotonic clocks are per process.
+
+Refresh and fetch marks are leases stored in the database. Only one worker revalidates a stale
+entry or fetches a missing one, and the others can wait for its result instead of calling the
+upstream too. A lease expires on its own if its holder dies.
+
+Every method does blocking SQLite I/O, so async callers run them in a worker thread. Reads
+do not write: LRU recency of hits is collected in memory and written in one batch at most
+every RECENCY_FLUSH_INTERVAL seconds, or before the next store evicts. Connections wait at
+most BUSY_TIMEOUT seconds for another worker's write lock; a cache that stays locked for
+longer is treated as a miss rather than stalling the request.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from src.services.cache import CacheLookup, CacheState
+from src.services.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    ttl REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_entries_last_used_at ON cache_entries (last_used_at);
+CREATE TABLE IF NOT EXISTS cache_leases (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+"""
+
+LEASE_POLL_INTERVAL = 0.05
+
+# Seconds a statement waits for the write lock held by another worker before failing
+BUSY_TIMEOUT = 0.5
+
+# Seconds between writes of the recency of entries that were read
+RECENCY_FLUSH_INTERVAL = 5.0
+
+
+class SqliteTTLCache:
+    """Process-shared TTL cache with byte-size bounded LRU eviction, stored in SQLite."""
+
+    # Other processes see the entries, so callers coordinate upstream fetches through leases
+    shared = True
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        max_bytes: int,
+        ttl: float,
+        stale_while_revalidate: float = 0.0,
+        stale_if_error: float = 0.0,
+        lease_seconds: float = 30.0,
+    ):
+        """
+        Open (and if needed create) the cache.
+
+        Args:
+            name: Name used in logs and stats
+            path: SQLite database path shared by all worker processes
+            max_bytes: Upper bound for the summed size of all cached values
+            ttl: Default number of seconds an entry stays fresh
+            stale_while_revalidate: Seconds after expiry during which a stale entry is served
+                while it is refreshed in the background
+            stale_if_error: Seconds after expiry during which a stale entry is kept as a
+                fallback when the upstream fails
+            lease_seconds: Seconds after which a refresh or fetch lease expires if its holder
+                did not release it
+        """
+        self.name = name
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = max(stale_if_error, stale_while_revalidate)
+        self.lease_seconds = lease_seconds
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(SCHEMA)
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "stale_errors_served": 0,
+            "evictions": 0,
+            "fetch_waits": 0,
+        }
+        # Encoded key to last read time, written to last_used_at by _flush_recency
+        self._recently_used: Dict[str, float] = {}
+        self._recency_flushed_at = time.time()
+
+    @staticmethod
+    def _encode_key(key: Hashable) -> str:
+        return json.dumps(key)
+
+    def _state_of(self, stored_at: float, ttl: float, now: float) -> CacheState:
+        age = now - stored_at
+        if age < ttl:
+            return CacheState.FRESH
+        if age < ttl + self.stale_while_revalidate:
+            return CacheState.STALE
+        if age < ttl + self.stale_if_error:
+            return CacheState.EXPIRED
+        return CacheState.MISS
+
+    def _read(self, encoded_key: str) -> Optional[Tuple[str, float, float]]:
+        return self._connection.execute(
+            "SELECT value, stored_at, ttl FROM cache_entries WHERE key = ?", (encoded_key,)
+        ).fetchone()
+
+    def get(self, key: Hashable) -> CacheLookup:
+        """
+        Look up a key and classify the entry.
+
+        Cache failures are logged and treated as misses.
+
+        Returns:
+            A CacheLookup whose state is FRESH or STALE when the value may be served,
+            EXPIRED when the value may only be used as an error fallback, or MISS
+        """
+        encoded_key = self._encode_key(key)
+        now = time.time()
+        try:
+            with self._lock, self._connection:
+                row = self._read(encoded_key)
+                if row is None:
+                    self._counters["misses"] += 1
+                    return CacheLookup(None, CacheState.MISS)
+
+                value, stored_at, ttl = row
+                state = self._state_of(stored_at, ttl, now)
+                if state == CacheState.MISS:
+                    self._connection.execute("DELETE FROM cache_entries WHERE key = ?", (encoded_key,))
+                    self._counters["misses"] += 1
+                    return CacheLookup(None, CacheState.MISS)
+
+                self._recently_used[encoded_key] = now
+                if state == CacheState.FRESH:
+                    self._counters["hits"] += 1
+                elif state == CacheState.STALE:
+                    self._counters["stale_hits"] += 1
+                else:
+                    self._counters["misses"] += 1
+                lookup = CacheLookup(loads(value), state)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache '{self.name}': read failed: {str(e)}")
+            return CacheLookup(None, CacheState.MISS)
+
+        if now - self._recency_flushed_at >= RECENCY_FLUSH_INTERVAL:
+            try:
+                with self._lock, self._connection:
+                    self._flush_recency(now)
+            except sqlite3.Error as e:
+                # The read times are kept and written with the next flush
+                self._recency_flushed_at = now
+                logger.warning(f"Cache '{self.name}': recency update failed: {str(e)}")
+        return lookup
+
+    def peek(self, key: Hashable) -> CacheLookup:
+        """Look up a key like get, without counting the lookup or recording its recency."""
+        try:
+            with self._lock:
+                row = self._read(self._encode_key(key))
+        except sqlite3.Error as e:
+            logger.warning(f"Cache '{self.name}': read failed: {str(e)}")
+            return CacheLookup(None, CacheState.MISS)
+        if row is None:
+            return CacheLookup(None, CacheState.MISS)
+
+        value, stored_at, ttl = row
+        state = self._state_of(stored_at, ttl, time.time())
+        return CacheLookup(loads(value) if state != CacheState.MISS else None, state)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting least recently used entries until the cache fits."""
+        encoded = dumps(value)
+        size = len(encoded)
+        if size > self.max_bytes:
+            logger.warning(f"Cache '{self.name}': value of {size} bytes exceeds cache size, not cached")
+            return
+
+        now = time.time()
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, size, stored_at, ttl, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self._encode_key(key), encoded, size, now, self.ttl if ttl is None else ttl, now),
+                )
+                self._flush_recency(now)
+                self._evict()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache '{self.name}': write failed: {str(e)}")
+
+    def _flush_recency(self, now: float) -> None:
+        """Write the collected read times of entries; the caller holds the lock and a transaction."""
+        if self._recently_used:
+            self._connection.executemany(
+                "UPDATE cache_entries SET last_used_at = MAX(last_used_at, ?) WHERE key = ?",
+                [(used_at, key) for key, used_at in self._recently_used.items()],
+            )
+            self._recently_used.clear()
+        self._recency_flushed_at = now
+
+    def _evict(self) -> None:
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._connection.execute("SELECT key, size FROM cache_entries ORDER BY last_used_at").fetchall()
+        evicted_keys = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted_keys.append((key,))
+            total -= size
+
+        self._connection.executemany("DELETE FROM cache_entries WHERE key = ?", evicted_keys)
+        self._counters["evictions"] += len(evicted_keys)
+
+    def record_stale_error_served(self) -> None:
+        """Count a stale value that was served because the upstream failed."""
+        with self._lock:
+            self._counters["stale_errors_served"] += 1
+
+    def _try_acquire_lease(self, lease_key: str) -> bool:
+        now = time.time()
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "DELETE FROM cache_leases WHERE key = ? AND expires_at <= ?", (lease_key, now)
+                )
+                cursor = self._connection.execute(
+                    "INSERT OR IGNORE INTO cache_leases (key, expires_at) VALUES (?, ?)",
+                    (lease_key, now + self.lease_seconds),
+                )
+                return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            # Without a working lease table every caller fetches for itself, as with a private cache
+            logger.warning(f"Cache '{self.name}': lease failed: {str(e)}")
+            return True
+
+    def _release_lease(self, lease_key: str) -> None:
+        try:
+            with self._lock, self._connection:
+                self._connection.execute("DELETE FROM cache_leases WHERE key = ?", (lease_key,))
+        except sqlite3.Error as e:
+            logger.warning(f"Cache '{self.name}': lease release failed: {str(e)}")
+
+    def _lease_held(self, lease_key: str) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM cache_leases WHERE key = ? AND expires_at > ?", (lease_key, time.time())
+            ).fetchone()
+        return row is not None
+
+    def try_begin_refresh(self, key: Hashable) -> bool:
+        """Take the refresh lease of a key. Returns False if any worker is already refreshing it."""
+        return self._try_acquire_lease("refresh:" + self._encode_key(key))
+
+    def end_refresh(self, key: Hashable) -> None:
+        """Release the refresh lease taken by try_begin_refresh."""
+        self._release_lease("refresh:" + self._encode_key(key))
+
+    def try_begin_fetch(self, key: Hashable) -> bool:
+        """Take the fetch lease of a missing key. Returns False if another worker is fetching it."""
+        return self._try_acquire_lease("fetch:" + self._encode_key(key))
+
+    def end_fetch(self, key: Hashable) -> None:
+        """Release the fetch lease taken by try_begin_fetch."""
+        self._release_lease("fetch:" + self._encode_key(key))
+
+    async def wait_for_fetch(self, key: Hashable) -> CacheLookup:
+        """
+        Wait until the worker holding the fetch lease of a key has stored it or given up.
+
+        Returns:
+            The lookup of the key once the lease is released or has expired
+        """
+        lease_key = "fetch:" + self._encode_key(key)
+        with self._lock:
+            self._counters["fetch_waits"] += 1
+        try:
+            while await asyncio.to_thread(self._lease_held, lease_key):
+                await asyncio.sleep(LEASE_POLL_INTERVAL)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache '{self.name}': lease check failed: {str(e)}")
+        return await asyncio.to_thread(self.get, key)
+
+    def clear(self) -> None:
+        """Drop all entries and leases and reset the counters."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cache_entries")
+            self._connection.execute("DELETE FROM cache_leases")
+            self._recently_used.clear()
+            for counter in self._counters:
+                self._counters[counter] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of this worker's counters and the shared occupancy."""
+        with self._lock:
+            entries, total = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+            return {**self._counters, "entries": entries, "bytes": total, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,74 @@
+"""
+Request coalescing module.
+
+This module provides a single-flight helper: while a call for a given key is in flight,
+identical calls wait for it and receive its result (or its exception) instead of
+hitting the upstream again. Keys are forgotten as soon as the call finishes, so this
+deduplicates concurrent work only and never serves old results.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class _AsyncCall:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """Coalesces concurrent identical calls made from coroutines on one event loop."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _AsyncCall] = {}
+        self.coalesced = 0
+
+    def _forget(self, key: Hashable, call: _AsyncCall) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn unless a call for key is already in flight, in which case join it.
+
+        The shared call runs in its own task, so cancelling one caller does not cancel
+        it for the others. It is cancelled only once every caller has gone away.
+
+        Args:
+            key: Identity of the call
+            fn: Coroutine function performing the upstream call
+
+        Returns:
+            The result of the single shared call
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _AsyncCall(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                logger.info("All callers cancelled, cancelling the shared in-flight call")
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of in-flight and coalesced calls."""
+        return {"in_flight": len(self._calls), "coalesced": self.coalesced}
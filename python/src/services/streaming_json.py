@@ -0,0 +1,102 @@
+"""
+Incremental JSON module.
+
+This module parses the top-level JSON object of a streamed LLM completion as it arrives
+and reports each field as soon as its value is complete, so callers can act on the first
+fields long before the completion ends. Text around the object (such as the markdown code
+fence requested by the structured output format instructions) is ignored. The parser is
+best effort: the complete response is still parsed normally once streaming finishes.
+"""
+import json
+import logging
+from typing import Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalJsonObjectParser:
+    """Emits the completed top-level fields of a JSON object fed in arbitrary chunks."""
+
+    def __init__(self):
+        self._text = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._field_start = None
+        self._after_colon = False
+        self._field_emitted = False
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next chunk of the completion.
+
+        Args:
+            chunk: Newly streamed text
+
+        Returns:
+            (name, value) pairs of the fields completed by this chunk, in document order
+        """
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        completed = []
+
+        while self._position < len(self._text) and not self.done:
+            index = self._position
+            char = self._text[index]
+            self._position += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._after_colon:
+                        self._emit(index + 1, completed)
+                continue
+
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._start_field(index + 1)
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == ":" and self._depth == 1:
+                self._after_colon = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 1 and self._after_colon:
+                    self._emit(index + 1, completed)
+                elif self._depth == 0:
+                    self._emit(index, completed)
+                    self.done = True
+            elif char == "," and self._depth == 1:
+                self._emit(index, completed)
+                self._start_field(index + 1)
+
+        return completed
+
+    def _start_field(self, start: int) -> None:
+        self._field_start = start
+        self._after_colon = False
+        self._field_emitted = False
+
+    def _emit(self, end: int, completed: List[Tuple[str, Any]]) -> None:
+        """Parse the current field up to end and record it, unless it was already emitted."""
+        if self._field_emitted or not self._after_colon:
+            return
+        self._field_emitted = True
+        try:
+            field = json.loads("{" + self._text[self._field_start:end] + "}")
+        except json.JSONDecodeError as e:
+            logger.debug(f"Skipping unparseable streamed field: {str(e)}")
+            return
+        completed.extend(field.items())
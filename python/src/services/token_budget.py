@@ -0,0 +1,133 @@
+"""
+Token budget module.
+
+This module counts tokens for the configured model and packs article text into a token
+budget. Titles are always kept; descriptions are truncated longest-first (water-filling),
+so short descriptions survive intact and long ones are cut to a common cap.
+
+If the tiktoken encoding cannot be loaded (it is downloaded on first use), token counts
+fall back to a characters-per-token estimate so prompts can still be built offline. The
+download is blocking, so callers on the event loop load the tokenizer in a worker thread
+first (see load_tokenizer); tiktoken itself is only imported then.
+"""
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import tiktoken
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_ENCODING = "o200k_base"
+APPROX_CHARS_PER_TOKEN = 4
+# Tokens spent on the "Article N:\nTitle: ...\nDescription: ..." framing around each article
+ARTICLE_OVERHEAD_TOKENS = 8
+TRUNCATION_MARKER = "..."
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model_name: str) -> Optional["tiktoken.Encoding"]:
+    """Load the tokenizer for a model once, or None if it is unavailable."""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception as e:
+        logger.warning(f"Tokenizer for {model_name} unavailable, estimating token counts: {str(e)}")
+        return None
+
+
+def load_tokenizer(model_name: str) -> None:
+    """Import tiktoken and load (downloading if needed) the tokenizer for a model ahead of the first count."""
+    _get_encoding(model_name)
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    """Count the tokens of text for the given model."""
+    if not text:
+        return 0
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        return -(-len(text) // APPROX_CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: str) -> str:
+    """Cut text to at most max_tokens tokens, marking the cut with an ellipsis."""
+    if count_tokens(text, model_name) <= max_tokens:
+        return text
+    content_tokens = max_tokens - count_tokens(TRUNCATION_MARKER, model_name)
+    if content_tokens <= 0:
+        return ""
+
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        truncated = text[:content_tokens * APPROX_CHARS_PER_TOKEN]
+    else:
+        truncated = encoding.decode(encoding.encode(text)[:content_tokens])
+    return truncated.rstrip() + TRUNCATION_MARKER
+
+
+def _description_cap(description_tokens: List[int], available: int) -> int:
+    """Return the largest per-description cap whose capped total fits in the available tokens."""
+    remaining = available
+    ordered = sorted(description_tokens)
+    for index, tokens in enumerate(ordered):
+        uncapped_count = len(ordered) - index
+        if tokens * uncapped_count > remaining:
+            return remaining // uncapped_count
+        remaining -= tokens
+    return ordered[-1] if ordered else 0
+
+
+def pack_articles(articles: List[Dict[str, Any]], token_budget: int,
+                  model_name: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Fit the title and description text of articles into a token budget.
+
+    Args:
+        articles: Article dictionaries with title and description
+        token_budget: Maximum tokens for all article text
+        model_name: Model whose tokenizer is used for counting
+
+    Returns:
+        The packed articles and a report of how much was trimmed
+    """
+    title_tokens = [count_tokens(article["title"] or "", model_name) for article in articles]
+    description_tokens = [count_tokens(article["description"] or "", model_name) for article in articles]
+    fixed_tokens = sum(title_tokens) + ARTICLE_OVERHEAD_TOKENS * len(articles)
+    tokens_before = fixed_tokens + sum(description_tokens)
+
+    report = {
+        "token_budget": token_budget,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_before,
+        "trimmed_tokens": 0,
+        "truncated_descriptions": 0,
+    }
+    if tokens_before <= token_budget:
+        return articles, report
+
+    cap = _description_cap(description_tokens, max(0, token_budget - fixed_tokens))
+    packed_articles = []
+    packed_description_tokens = 0
+    for article, tokens in zip(articles, description_tokens):
+        if tokens > cap:
+            article = {**article, "description": truncate_to_tokens(article["description"], cap, model_name)}
+            report["truncated_descriptions"] += 1
+        packed_description_tokens += count_tokens(article["description"] or "", model_name)
+        packed_articles.append(article)
+
+    report["tokens_after"] = fixed_tokens + packed_description_tokens
+    report["trimmed_tokens"] = tokens_before - report["tokens_after"]
+    if report["tokens_after"] > token_budget:
+        logger.warning(f"Article titles alone exceed the token budget of {token_budget}")
+
+    logger.info(
+        f"Packed articles from {tokens_before} to {report['tokens_after']} tokens "
+        f"({report['truncated_descriptions']} descriptions truncated)"
+    )
+    return packed_articles, report
@@ -0,0 +1,277 @@
+"""
+Tracing module.
+
+This module records spans for tool calls and the work they do (NewsAPI fetches, article
+formatting, prompt formatting, LLM calls and output parsing). The current span is kept in a
+context variable, so spans opened in tasks spawned by asyncio.gather or asyncio.to_thread
+nest under the span that was current when the task was created.
+
+Finished spans are handed to a background thread that exports them in batches, either as
+JSON lines to a local file or as OTLP/HTTP JSON to a collector, so exporting never blocks
+the event loop. Without an exporter spans are still created, which keeps trace ids
+available for response metadata, but they are dropped when they end.
+"""
+import atexit
+import functools
+import inspect
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+MAX_EXPORT_BATCH = 512
+OTLP_EXPORT_TIMEOUT = 5.0
+# OTLP span kind and status codes
+SPAN_KIND_INTERNAL = 1
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the span as a flat JSON-serializable dictionary."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "duration_ms": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+        }
+
+
+class JsonFileSpanExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as trace_file:
+            trace_file.write("".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans))
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpSpanExporter:
+    """Sends finished spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=OTLP_EXPORT_TIMEOUT)
+
+    def _otlp_span(self, span: Span) -> Dict[str, Any]:
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+            "status": {"code": STATUS_CODE_ERROR, "message": span.error} if span.error else {"code": STATUS_CODE_OK},
+        }
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+        return otlp_span
+
+    def export(self, spans: List[Span]) -> None:
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [self._otlp_span(span) for span in spans]}],
+        }]}
+        response = self._client.post(self.endpoint, json=payload)
+        response.raise_for_status()
+
+
+class Tracer:
+    """Creates spans and exports finished ones from a background thread."""
+
+    def __init__(self, exporter: Optional[Any] = None):
+        """
+        Create the tracer.
+
+        Args:
+            exporter: Object with an export(spans) method, or None to drop finished spans
+        """
+        self.exporter = exporter
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, root: bool = False, **attributes: Any) -> Iterator[Span]:
+        """
+        Open a span as a child of the current one, making it current until the block exits.
+
+        Args:
+            name: Span name
+            root: Start a new trace even if a span is current
+            **attributes: Initial span attributes
+
+        Yields:
+            The span, for adding attributes
+        """
+        parent = None if root else _current_span.get()
+        trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        span = Span(name, trace_id, parent.span_id if parent else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {str(e)}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        if self.exporter is None:
+            return
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._export_loop, name="span-exporter", daemon=True)
+                    self._worker.start()
+        self._queue.put(span)
+
+    def _export_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < MAX_EXPORT_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [item for item in batch if isinstance(item, Span)]
+            if spans:
+                try:
+                    self.exporter.export(spans)
+                except Exception as e:
+                    logger.warning(f"Failed to export {len(spans)} spans: {str(e)}")
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until every span finished so far has been exported."""
+        if self._worker is None:
+            return
+        flushed = threading.Event()
+        self._queue.put(flushed)
+        flushed.wait(timeout)
+
+
+def current_span() -> Optional[Span]:
+    """Return the span of the current context, if any."""
+    return _current_span.get()
+
+
+def annotate(**attributes: Any) -> None:
+    """Add attributes to the current span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorate a function or coroutine function to run inside a span of the given name."""
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_tool(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Wrap an async MCP tool so each call is the root span of a new trace.
+
+    The query argument becomes a span attribute, error responses mark the span as failed, and
+    the trace id is added to the response under metadata.trace_id.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with tracer.span(f"tool.{fn.__name__}", root=True, tool=fn.__name__) as span:
+            if "query" in kwargs:
+                span.set_attributes(query=kwargs["query"])
+            result = await fn(*args, **kwargs)
+            if isinstance(result, dict) and result.get("error"):
+                span.set_error(str(result["error"]))
+        if isinstance(result, dict):
+            result = {**result, "metadata": {**(result.get("metadata") or {}), "trace_id": span.trace_id}}
+        return result
+
+    return wrapper
+
+
+def _build_exporter() -> Optional[Any]:
+    """Build the configured span exporter."""
+    if config.TRACING_EXPORTER == "json":
+        logger.info(f"Exporting trace spans to {config.TRACING_JSON_PATH}")
+        return JsonFileSpanExporter(config.TRACING_JSON_PATH)
+    if config.TRACING_EXPORTER == "otlp":
+        logger.info(f"Exporting trace spans to {config.TRACING_OTLP_ENDPOINT}")
+        return OtlpHttpSpanExporter(config.TRACING_OTLP_ENDPOINT, config.TRACING_SERVICE_NAME)
+    if config.TRACING_EXPORTER:
+        logger.error(f"Unknown TRACING_EXPORTER '{config.TRACING_EXPORTER}', trace spans are not exported")
+    return None
+
+
+tracer = Tracer(_build_exporter())
+atexit.register(tracer.flush)
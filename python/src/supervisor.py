@@ -0,0 +1,384 @@
+"""
+Multi-worker server module.
+
+With WORKERS > 1, `python -m src.main` runs this supervisor instead of serving requests itself.
+It starts WORKERS copies of the server as subprocesses on local ports and serves a small HTTP
+router on PORT in front of them. Workers that exit are restarted.
+
+An MCP SSE session lives in the worker that accepted its event stream, so every later message
+of the session has to reach that same worker. Each worker therefore advertises its message
+endpoint under its own /workers/<index>/ prefix, and the router sends requests with that
+prefix straight to it. New event streams and other requests go to the ready worker with the
+fewest open streams.
+
+Counters are per process, so /stats and /metrics are never forwarded to an arbitrary worker.
+/workers/<index>/stats and /workers/<index>/metrics reach one worker's own routes, while the
+router's /stats collects every worker's stats and its /metrics merges every worker's metrics
+with a worker label, so a single Prometheus target sees all processes.
+
+Workers share the search cache, the LLM result cache and the article store through SQLite,
+so a cache hit on one worker is a hit on all of them. The NewsAPI quota is split evenly
+between the workers, so together they stay within it, and each worker prefetches its own slice
+of the watchlist.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+PYTHON_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_SHARED_SEARCH_CACHE_PATH = os.path.join(tempfile.gettempdir(), "news_search_cache.db")
+WORKER_PATH = re.compile(r"^/workers/(\d+)/")
+# Per-worker scrape routes, forwarded to the worker's own /stats and /metrics
+WORKER_SCRAPE_PATH = re.compile(r"^/workers/\d+(/(?:stats|metrics))$")
+# Headers that describe a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = frozenset((
+    "connection", "keep-alive", "proxy-connection", "transfer-encoding", "te", "trailer", "upgrade", "host",
+))
+HTTP_METHODS = ["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+WORKER_CONNECT_TIMEOUT = 5.0
+WORKER_STOP_TIMEOUT = 10.0
+HEALTH_CHECK_INTERVAL = 1.0
+READY_POLL_INTERVAL = 0.05
+# How long a request waits for a starting or restarting worker before it is answered with 503
+READY_WAIT_TIMEOUT = 10.0
+# How long the router waits for each worker's /stats or /metrics
+WORKER_SCRAPE_TIMEOUT = 5.0
+
+
+def worker_message_path(index: int) -> str:
+    """Return the SSE message path a worker advertises to its sessions."""
+    return f"/workers/{index}/messages/"
+
+
+def split_limit(total: int, workers: int, index: int) -> int:
+    """
+    Return one worker's share of an integer limit, spreading the remainder over the first workers.
+
+    A total of 0 means unlimited and stays unlimited. Every share is at least 1 because 0
+    would lift the limit for that worker.
+    """
+    if total <= 0:
+        return 0
+    return max(1, total // workers + (1 if index < total % workers else 0))
+
+
+def worker_env(index: int, port: int, workers: int, base_env: Mapping[str, str]) -> Dict[str, str]:
+    """Build the environment of one worker process."""
+    return {
+        **base_env,
+        "WORKERS": "1",
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "WORKER_INDEX": str(index),
+        "WORKER_COUNT": str(workers),
+        "FASTMCP_SERVER_MESSAGE_PATH": worker_message_path(index),
+        "SEARCH_CACHE_PATH": config.SEARCH_CACHE_PATH or DEFAULT_SHARED_SEARCH_CACHE_PATH,
+        "NEWSAPI_DAILY_LIMIT": str(split_limit(config.NEWSAPI_DAILY_LIMIT, workers, index)),
+        "NEWSAPI_REQUESTS_PER_SECOND": str(config.NEWSAPI_REQUESTS_PER_SECOND / workers),
+        "NEWSAPI_BURST": str(max(1, config.NEWSAPI_BURST // workers)),
+    }
+
+
+def _with_worker_label(sample: str, index: int) -> str:
+    """Add a worker label to a Prometheus sample line."""
+    label = f'worker="{index}"'
+    name_end = sample.find(" ")
+    brace = sample.find("{")
+    if brace != -1 and brace < name_end:
+        return f"{sample[:brace + 1]}{label},{sample[brace + 1:]}"
+    return f"{sample[:name_end]}{{{label}}}{sample[name_end:]}"
+
+
+def merge_worker_metrics(expositions: Dict[int, str]) -> str:
+    """
+    Merge the Prometheus text expositions of several workers into one.
+
+    Every sample gets a worker label, and the samples of one metric family stay together
+    under a single HELP and TYPE header, as the exposition format requires.
+    """
+    headers: Dict[str, List[str]] = {}
+    samples: Dict[str, List[str]] = {}
+    for index, exposition in expositions.items():
+        family = ""
+        declared = set()
+        for line in exposition.splitlines():
+            if not line:
+                continue
+            if line.startswith("#"):
+                parts = line.split(" ", 3)
+                if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                    family = parts[2]
+                    samples.setdefault(family, [])
+                    if family not in headers or family in declared:
+                        headers.setdefault(family, []).append(line)
+                        declared.add(family)
+                continue
+            samples.setdefault(family, []).append(_with_worker_label(line, index))
+    lines = [line for family, family_samples in samples.items() for line in headers.get(family, []) + family_samples]
+    return "\n".join(lines) + "\n"
+
+
+class Worker:
+    """One server process behind the router."""
+
+    def __init__(self, index: int, port: int, env: Dict[str, str]):
+        self.index = index
+        self.port = port
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+        self.ready = False
+        self.open_streams = 0
+        self.restarts = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> None:
+        self.ready = False
+        self.process = subprocess.Popen([sys.executable, "-m", "src.main"], cwd=PYTHON_DIR, env=self.env)
+        logger.info(f"Started worker {self.index} (pid {self.process.pid}) on port {self.port}")
+
+    def exited(self) -> bool:
+        return self.process is None or self.process.poll() is not None
+
+    def stop(self) -> None:
+        if self.exited():
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=WORKER_STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "port": self.port,
+            "pid": self.process.pid if self.process else None,
+            "ready": self.ready,
+            "open_streams": self.open_streams,
+            "restarts": self.restarts,
+        }
+
+
+class StickyRouter:
+    """Forwards HTTP requests to workers, keeping every MCP SSE session on the worker that holds it."""
+
+    def __init__(self, workers: List[Worker], transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Create the router.
+
+        Args:
+            workers: Worker processes, indexed by their position
+            transport: Optional httpx transport, e.g. a mock in tests
+        """
+        self.workers = workers
+        self._next_index = 0
+        # Event streams stay open for the whole session, so only connecting is time-limited
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(None, connect=WORKER_CONNECT_TIMEOUT), transport=transport
+        )
+
+    def pick(self, path: str) -> Optional[Worker]:
+        """Return the worker a request path belongs to, or the least busy ready worker."""
+        match = WORKER_PATH.match(path)
+        if match:
+            index = int(match.group(1))
+            return self.workers[index] if index < len(self.workers) else None
+
+        ready = [worker for worker in self.workers if worker.ready]
+        if not ready:
+            return None
+        # Rotate between equally busy workers, so sessions opened together spread out
+        count = len(self.workers)
+        worker = min(ready, key=lambda candidate: (candidate.open_streams, (candidate.index - self._next_index) % count))
+        self._next_index = (worker.index + 1) % count
+        return worker
+
+    async def _pick_ready(self, path: str) -> Optional[Worker]:
+        deadline = time.monotonic() + READY_WAIT_TIMEOUT
+        while True:
+            worker = self.pick(path)
+            if worker is not None and worker.ready:
+                return worker
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(READY_POLL_INTERVAL)
+
+    async def scrape(self, path: str) -> Dict[int, httpx.Response]:
+        """Fetch a route from every ready worker concurrently; workers that fail to answer are left out."""
+        ready = [worker for worker in self.workers if worker.ready]
+        responses = await asyncio.gather(
+            *[self._client.get(worker.url + path, timeout=WORKER_SCRAPE_TIMEOUT) for worker in ready],
+            return_exceptions=True,
+        )
+        scraped = {}
+        for worker, response in zip(ready, responses):
+            if isinstance(response, Exception) or response.status_code != 200:
+                logger.warning(f"Worker {worker.index} did not answer {path}: {response}")
+                continue
+            scraped[worker.index] = response
+        return scraped
+
+    async def forward(self, request: Request) -> Response:
+        """Forward a request to its worker and stream the response back."""
+        worker = await self._pick_ready(request.url.path)
+        if worker is None:
+            return JSONResponse(
+                {"error": "Worker unavailable", "message": "No server worker is ready to handle the request"},
+                status_code=503, headers={"Retry-After": "1"},
+            )
+
+        scrape_path = WORKER_SCRAPE_PATH.match(request.url.path)
+        path = scrape_path.group(1) if scrape_path else request.url.path
+        url = worker.url + path + (f"?{request.url.query}" if request.url.query else "")
+        headers = [(name, value) for name, value in request.headers.items() if name not in HOP_BY_HOP_HEADERS]
+        upstream_request = self._client.build_request(
+            request.method, url, headers=headers, content=await request.body() or None
+        )
+        try:
+            upstream = await self._client.send(upstream_request, stream=True)
+        except httpx.TransportError as e:
+            logger.warning(f"Worker {worker.index} did not answer: {str(e)}")
+            return JSONResponse({"error": "Worker unavailable", "message": str(e)}, status_code=502)
+
+        streaming = upstream.headers.get("content-type", "").startswith("text/event-stream")
+        if streaming:
+            worker.open_streams += 1
+
+        async def relay() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in upstream.aiter_raw():
+                    yield chunk
+            finally:
+                await upstream.aclose()
+                if streaming:
+                    worker.open_streams -= 1
+
+        response_headers = {name: value for name, value in upstream.headers.items() if name not in HOP_BY_HOP_HEADERS}
+        return StreamingResponse(relay(), status_code=upstream.status_code, headers=response_headers)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+async def _accepts_connections(port: int) -> bool:
+    try:
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+    except OSError:
+        return False
+    writer.close()
+    await writer.wait_closed()
+    return True
+
+
+async def monitor_workers(workers: List[Worker]) -> None:
+    """Mark workers ready once they accept connections and restart the ones that exited."""
+    while True:
+        for worker in workers:
+            if worker.exited():
+                logger.error(f"Worker {worker.index} exited with code {worker.process.returncode}, restarting")
+                worker.restarts += 1
+                worker.open_streams = 0
+                worker.start()
+            elif not worker.ready and await _accepts_connections(worker.port):
+                worker.ready = True
+                logger.info(f"Worker {worker.index} is ready")
+        await asyncio.sleep(HEALTH_CHECK_INTERVAL if all(worker.ready for worker in workers) else READY_POLL_INTERVAL)
+
+
+def create_router_app(workers: List[Worker], router: Optional[StickyRouter] = None,
+                      manage_workers: bool = True) -> Starlette:
+    """
+    Create the router application.
+
+    Args:
+        workers: Worker processes behind the router
+        router: Router to use; one is created for the workers if omitted
+        manage_workers: Start, monitor and stop the worker processes with the application
+    """
+    router = router or StickyRouter(workers)
+
+    async def worker_status(request: Request) -> JSONResponse:
+        """List the workers; /workers/<index>/stats and /workers/<index>/metrics reach each one."""
+        return JSONResponse({"workers": [worker.stats() for worker in workers]})
+
+    async def all_worker_stats(request: Request) -> JSONResponse:
+        """Collect the /stats of every worker, keyed by worker index; unavailable workers are null."""
+        scraped = await router.scrape("/stats")
+        return JSONResponse({"workers": {
+            str(worker.index): scraped[worker.index].json() if worker.index in scraped else None
+            for worker in workers
+        }})
+
+    async def all_worker_metrics(request: Request) -> PlainTextResponse:
+        """Merge the /metrics of every worker, each sample labelled with its worker index."""
+        scraped = await router.scrape("/metrics")
+        exposition = merge_worker_metrics({index: response.text for index, response in sorted(scraped.items())})
+        return PlainTextResponse(exposition, media_type="text/plain; version=0.0.4")
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        monitor = None
+        if manage_workers:
+            for worker in workers:
+                worker.start()
+            monitor = asyncio.create_task(monitor_workers(workers))
+        try:
+            yield
+        finally:
+            if monitor is not None:
+                monitor.cancel()
+                for worker in workers:
+                    worker.stop()
+            await router.aclose()
+
+    return Starlette(
+        routes=[
+            Route("/workers", worker_status, methods=["GET"]),
+            Route("/stats", all_worker_stats, methods=["GET"]),
+            Route("/metrics", all_worker_metrics, methods=["GET"]),
+            Route("/{path:path}", router.forward, methods=HTTP_METHODS),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def run_supervisor() -> None:
+    """Start config.WORKERS worker processes and route requests on config.PORT to them."""
+    base_port = config.WORKER_BASE_PORT or config.PORT + 1
+    if 0 < config.NEWSAPI_DAILY_LIMIT < config.WORKERS:
+        logger.warning(f"NEWSAPI_DAILY_LIMIT of {config.NEWSAPI_DAILY_LIMIT} is below the worker count, "
+                       f"the workers together may send up to {config.WORKERS} requests a day")
+    if config.LLM_CACHE_PATH == ":memory:" or config.ARTICLE_STORE_PATH == ":memory:":
+        logger.warning("In-memory LLM cache or article store paths are private to each worker")
+
+    workers = [
+        Worker(index, base_port + index, worker_env(index, base_port + index, config.WORKERS, os.environ))
+        for index in range(config.WORKERS)
+    ]
+    logger.info(f"Routing port {config.PORT} to {config.WORKERS} workers on ports "
+                f"{base_port}-{base_port + config.WORKERS - 1}")
+    uvicorn.run(create_router_app(workers), host=config.HOST, port=config.PORT, timeout_graceful_shutdown=0)
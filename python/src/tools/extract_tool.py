@@ -1,17 +1,52 @@
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from fastmcp import Context
+
+from src.config import config
+from src.tools.progress import field_progress_reporter
 from src.tools.search_news import search_news
-from src.services.llm import llm_service
+from src.services.llm import llm_service, EXTRACT_INFO_SCHEMAS, FieldCallback
+from src.services.entity_extractor import local_entity_extractor, merge_extractions
 
 logger = logging.getLogger(__name__)
 
-def extract_information_from_article(query: str, language: str = "en") -> Dict[str, Any]:
+MAX_BATCH_ARTICLES = 50
+
+# "llm" asks the model, "fast" uses only the local gazetteer and quote matcher, "hybrid" merges both
+EXTRACTION_MODES = ("llm", "fast", "hybrid")
+
+def _validate_mode(mode: str) -> Optional[Dict[str, Any]]:
+    """Return an error response if the extraction mode is unknown, otherwise None."""
+    if mode not in EXTRACTION_MODES:
+        logger.error(f"Invalid mode: {mode}")
+        return {"error": "Invalid parameter", "message": f"mode must be one of {', '.join(EXTRACTION_MODES)}"}
+    return None
+
+async def _extract_entities(title: str, description: str, mode: str,
+                            on_field: Optional[FieldCallback] = None) -> Dict[str, Any]:
+    """Extract entities and quotes from one article with the requested mode."""
+    if mode == "fast":
+        return local_entity_extractor.extract(title, description)
+    
+    extracted_info = await llm_service.aextract_article_information(title, description, on_field=on_field)
+    if mode == "hybrid":
+        return merge_extractions(extracted_info, local_entity_extractor.extract(title, description))
+    return extracted_info
+
+async def extract_information_from_article(query: str, language: str = "en", mode: str = "llm",
+                                           ctx: Optional[Context] = None) -> Dict[str, Any]:
     """Extract structured information from a news article.
     
+    Each extracted field is sent as a progress notification as soon as the model has produced it.
+    
     Args:
         query: Search news query to find article
         language: News language (e.g., "en")
+        mode: "llm" (default), "fast" for local gazetteer matching without the LLM,
+            or "hybrid" to merge local matches into the LLM result
+        ctx: MCP request context, injected by the server
         
     Returns:
         A dictionary with structured information from the article
@@ -20,8 +55,12 @@ def extract_information_from_article(query: str, language: str = "en") -> Dict[s
         logger.error("Query parameter is required")
         return {"error": "Query parameter is required"}
     
+    mode_error = _validate_mode(mode)
+    if mode_error:
+        return mode_error
+    
     try:
-        search_result = search_news(query, language, 1)
+        search_result = await search_news(query, language, 1)
         
         if "error" in search_result:
             logger.error(f"Error searching for articles: {search_result['error']}")
@@ -37,7 +76,9 @@ def extract_information_from_article(query: str, language: str = "en") -> Dict[s
         description = article["description"]
         
         try:
-            extracted_info = llm_service.extract_article_information(title, description)
+            extracted_info = await _extract_entities(
+                title, description, mode, on_field=field_progress_reporter(ctx, len(EXTRACT_INFO_SCHEMAS))
+            )
             return {
                 "result": {
                     "fetched_article_title": title,
@@ -55,3 +96,85 @@ def extract_information_from_article(query: str, language: str = "en") -> Dict[s
         logger.error(f"Error in extract_information_from_article: {str(e)}")
         return {"error": "Processing error", "message": str(e)}
 
+async def _extract_one(article: Dict[str, Any], semaphore: asyncio.Semaphore, mode: str = "llm") -> Dict[str, Any]:
+    """Run the extraction for one article, reporting failures in the per-article result."""
+    title = article["title"]
+    async with semaphore:
+        try:
+            extracted_info = await _extract_entities(title, article["description"], mode)
+        except Exception as e:
+            logger.error(f"Error extracting information from article '{title}': {str(e)}")
+            return {"fetched_article_title": title, "url": article["url"], "error": "LLM processing error", "message": str(e)}
+
+    return {
+        "fetched_article_title": title,
+        "url": article["url"],
+        "people": extracted_info["people"],
+        "organizations": extracted_info["organizations"],
+        "locations": extracted_info["locations"],
+        "key_quotes": extracted_info["key_quotes"]
+    }
+
+async def extract_information_from_articles(
+    query: str,
+    language: str = "en",
+    max_articles: int = 5,
+    max_concurrency: Optional[int] = None,
+    mode: str = "llm"
+) -> Dict[str, Any]:
+    """Extract structured information from several news articles in one call.
+    
+    Args:
+        query: Search news query to find articles
+        language: News language (e.g., "en")
+        max_articles: Maximum articles to analyze
+        max_concurrency: Maximum parallel LLM calls (defaults to the configured limit)
+        mode: "llm" (default), "fast" for local gazetteer matching without the LLM,
+            or "hybrid" to merge local matches into the LLM result
+        
+    Returns:
+        A dictionary with structured information per article; failed articles carry an error instead
+    """
+    if not query:
+        logger.error("Query parameter is required")
+        return {"error": "Query parameter is required"}
+    
+    if max_articles < 1 or max_articles > MAX_BATCH_ARTICLES:
+        logger.error(f"Invalid max_articles: {max_articles}")
+        return {"error": "Invalid parameter", "message": f"max_articles must be between 1 and {MAX_BATCH_ARTICLES}"}
+    
+    concurrency = max_concurrency if max_concurrency is not None else config.EXTRACT_BATCH_MAX_CONCURRENCY
+    if concurrency < 1:
+        logger.error(f"Invalid max_concurrency: {concurrency}")
+        return {"error": "Invalid parameter", "message": "max_concurrency must be at least 1"}
+    
+    mode_error = _validate_mode(mode)
+    if mode_error:
+        return mode_error
+    
+    try:
+        search_result = await search_news(query, language, max_articles)
+        
+        if "error" in search_result:
+            logger.error(f"Error searching for articles: {search_result['error']}")
+            return search_result
+        
+        articles = search_result["articles"]
+        if not articles:
+            logger.warning(f"No articles found for query: {query}")
+            return {"error": "No articles found", "message": f"No articles found for query: {query}"}
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        results = await asyncio.gather(*(_extract_one(article, semaphore, mode) for article in articles))
+        
+        return {
+            "result": {
+                "query": query,
+                "articles": results,
+                "failed_article_count": sum(1 for result in results if "error" in result)
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in extract_information_from_articles: {str(e)}")
+        return {"error": "Processing error", "message": str(e)}
@@ -0,0 +1,47 @@
+import logging
+from typing import Any, Optional
+
+from fastmcp import Context
+
+from src.services.llm import FieldCallback
+from src.services.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+def _progress_token(ctx: Context) -> Any:
+    """Return the progress token the client sent with the request, or None when it asked for no progress."""
+    try:
+        meta = ctx.request_context.meta
+    except (AttributeError, LookupError, ValueError):
+        # No request is being handled, e.g. the tool was called outside an MCP session
+        return None
+    return getattr(meta, "progressToken", None) if meta is not None else None
+
+def field_progress_reporter(ctx: Optional[Context], total_fields: int) -> Optional[FieldCallback]:
+    """Build a callback that sends each completed result field to the MCP client as a progress notification.
+
+    Args:
+        ctx: The MCP request context, or None when the tool is called directly
+        total_fields: Number of fields the result will have
+
+    Returns:
+        The callback, or None when there is no client to notify. Without a callback the LLM
+        call is not streamed, so it keeps the retries and hedging of the resilience layer.
+    """
+    if ctx is None or _progress_token(ctx) is None:
+        return None
+
+    reported_fields = 0
+
+    async def report_field(name: str, value: Any) -> None:
+        nonlocal reported_fields
+        reported_fields += 1
+        try:
+            await ctx.report_progress(
+                reported_fields, total_fields, dumps({"field": name, "value": value})
+            )
+        except Exception as e:
+            # A client that stopped listening must not fail the tool call
+            logger.warning(f"Failed to send progress for field '{name}': {str(e)}")
+
+    return report_field
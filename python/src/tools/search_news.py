@@ -1,61 +1,366 @@
+import asyncio
 import logging
-from typing import Dict, Any
+import sqlite3
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 from src.config import config
-from newsapi.newsapi_client import NewsApiClient
+from src.services.article_store import article_store
+from src.services.articles import ARTICLE_FIELDS, format_articles, newest_published_at, parse_timestamp, published_time
+from src.services.cache import TTLCache, CacheLookup, CacheState
+from src.services.shared_cache import SqliteTTLCache
+from src.services.news_api import call_newsapi, validate_search_params
+from src.services.quota import newsapi_quota, QuotaExceededError
+from src.services.resilience import CircuitOpenError
+from src.services.singleflight import AsyncSingleFlight
+from src.services.tracing import annotate, tracer
 
 logger = logging.getLogger(__name__)
 
-def search_news(query: str, language: str, page_size: int) -> Dict[str, Any]:
+def _open_search_cache() -> Union[TTLCache, SqliteTTLCache]:
+    """Open the cache shared by all workers at SEARCH_CACHE_PATH, or a private in-process cache."""
+    if config.SEARCH_CACHE_PATH:
+        try:
+            logger.info(f"Sharing the search cache through {config.SEARCH_CACHE_PATH}")
+            return SqliteTTLCache(
+                name="search_news",
+                path=config.SEARCH_CACHE_PATH,
+                max_bytes=config.SEARCH_CACHE_MAX_BYTES,
+                ttl=config.SEARCH_CACHE_TTL,
+                stale_while_revalidate=config.SEARCH_CACHE_STALE_WHILE_REVALIDATE,
+                stale_if_error=config.SEARCH_CACHE_STALE_IF_ERROR,
+                lease_seconds=config.SEARCH_FETCH_LEASE,
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open shared search cache at {config.SEARCH_CACHE_PATH}, "
+                         f"using an in-process cache: {str(e)}")
+    return TTLCache(
+        name="search_news",
+        max_bytes=config.SEARCH_CACHE_MAX_BYTES,
+        ttl=config.SEARCH_CACHE_TTL,
+        stale_while_revalidate=config.SEARCH_CACHE_STALE_WHILE_REVALIDATE,
+        stale_if_error=config.SEARCH_CACHE_STALE_IF_ERROR,
+    )
+
+search_cache = _open_search_cache()
+
+# Article layouts of search_news responses
+RESPONSE_LAYOUTS = ("records", "columns")
+
+# Concurrent identical fetches (interactive misses and background refreshes alike) share one upstream call
+search_flight = AsyncSingleFlight()
+
+T = TypeVar("T")
+
+async def _cache_io(operation: Callable[..., T], *args: Any) -> T:
+    """Run a search cache operation, in a worker thread when it is SQLite I/O on the cache shared by workers."""
+    if search_cache.shared:
+        return await asyncio.to_thread(operation, *args)
+    return operation(*args)
+
+# Strong references to background refresh tasks so they are not garbage collected mid-flight
+_background_tasks = set()
+
+def _merge_articles(new_articles: List[Mapping], previous_articles: List[Mapping], page_size: int) -> List[Mapping]:
+    """Merge newly fetched articles into an earlier result, newest first, dropping repeated URLs."""
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    # The sort is stable, so a refetched article keeps its new version
+    candidates = sorted(
+        new_articles + previous_articles,
+        key=lambda article: published_time(article) or oldest,
+        reverse=True,
+    )
+    merged, seen_urls = [], set()
+    for article in candidates:
+        if article["url"] in seen_urls:
+            continue
+        seen_urls.add(article["url"])
+        merged.append(article)
+        if len(merged) == page_size:
+            break
+    return merged
+
+def _cache_key(query: str, language: str, page_size: int) -> Tuple[str, str, int]:
+    """Normalize the search parameters so equivalent queries share a cache entry."""
+    return (" ".join(query.lower().split()), language.strip().lower(), page_size)
+
+async def _fetch_news(query: str, language: str, page_size: int,
+                      previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Fetch, format and cache articles with the shared NewsAPI client, coalescing identical calls.
+
+    With SEARCH_INCREMENTAL and an earlier result for the same search, only articles published
+    since that result's cursor are requested and merged into it.
+    """
+    key = _cache_key(query, language, page_size)
+    return await search_flight.do(
+        key, lambda: _fetch_news_once_across_workers(key, query, language, page_size, previous)
+    )
+
+async def _fetch_news_once_across_workers(key: Tuple[str, str, int], query: str, language: str,
+                                          page_size: int, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """With a cache shared by several workers, let one of them fetch a key while the others wait for it."""
+    if not search_cache.shared:
+        result = await _fetch_news_uncoalesced(query, language, page_size, previous)
+        search_cache.set(key, result)
+        return result
+
+    holds_lease = await _cache_io(search_cache.try_begin_fetch, key)
+    if not holds_lease:
+        lookup = await search_cache.wait_for_fetch(key)
+        if lookup.state in (CacheState.FRESH, CacheState.STALE):
+            logger.info(f"Serving news for query '{query}' fetched by another worker")
+            return lookup.value
+        # The other worker failed or gave up, so fetch (and report errors) ourselves
+    try:
+        result = await _fetch_news_uncoalesced(query, language, page_size, previous)
+        await _cache_io(search_cache.set, key, result)
+        return result
+    finally:
+        if holds_lease:
+            await _cache_io(search_cache.end_fetch, key)
+
+async def _fetch_news_uncoalesced(query: str, language: str, page_size: int,
+                                  previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    cursor = previous.get("cursor") if config.SEARCH_INCREMENTAL and previous else None
+    params = {"q": query, "language": language, "page_size": page_size, "sort_by": 'publishedAt'}
+    if cursor:
+        # "from" is inclusive, so the newest known article comes back and is deduplicated by URL
+        params["from_date"] = cursor
+
+    with tracer.span("search.fetch", query=query, language=language, page_size=page_size,
+                     incremental=bool(cursor)) as span:
+        news_data = await call_newsapi(params, config.NEWSAPI_API_KEY)
+        span.set_attributes(total_results=news_data.get("totalResults", 0))
+    articles = format_articles(news_data)
+    has_more = False
+    if cursor:
+        known_urls = {article["url"] for article in previous["articles"]}
+        new_count = sum(1 for article in articles if article["url"] not in known_urls)
+        logger.info(f"Fetched {new_count} new articles for query '{query}' since {cursor}")
+        annotate(new_article_count=new_count)
+        # "from" is inclusive, so a full page without the newest known article leaves a gap before it
+        has_more = new_count >= page_size
+        articles = _merge_articles(articles, previous["articles"], page_size)
+    result = {"articles": articles, "cursor": newest_published_at(articles) or cursor, "has_more": has_more}
+    annotate(article_count=len(articles))
+    await asyncio.to_thread(_store_articles, query, language, page_size, articles)
+    return result
+
+def _store_articles(query: str, language: str, page_size: int, articles: List[Dict[str, Any]]) -> None:
+    """Persist fetched articles to the local store. Store failures never fail the search."""
+    if article_store is None:
+        return
+    try:
+        article_store.save_articles(query, language.strip().lower(), page_size, articles)
+    except Exception as e:
+        logger.warning(f"Failed to store articles for query '{query}': {str(e)}")
+
+def _search_local_index(query: str, language: str, page_size: int,
+                        max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Answer from the local article store if a recent fetch covers the query, otherwise None."""
+    if article_store is None:
+        return None
+    if max_age is None:
+        max_age = config.ARTICLE_STORE_MAX_AGE
+    try:
+        articles = article_store.search(query, language.strip().lower(), page_size, max_age)
+    except Exception as e:
+        logger.warning(f"Local index lookup failed for query '{query}': {str(e)}")
+        return None
+    if articles is None:
+        return None
+    logger.info(f"Serving news for query '{query}' from the local index")
+    return {"articles": articles, "served_from": "local_index"}
+
+def _refresh_in_background(key: Tuple[str, str, int], query: str, language: str, page_size: int,
+                           previous: Dict[str, Any]) -> None:
+    """Revalidate a stale cache entry on a task of the running event loop."""
+    async def refresh():
+        if not await _cache_io(search_cache.try_begin_refresh, key):
+            return
+        try:
+            await _fetch_news(query, language, page_size, previous)
+        except Exception as e:
+            logger.warning(f"Background refresh failed for query '{query}': {str(e)}")
+        finally:
+            await _cache_io(search_cache.end_refresh, key)
+
+    task = asyncio.get_running_loop().create_task(refresh())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def refresh_search(query: str, language: str, page_size: int) -> Dict[str, Any]:
+    """
+    Fetch a search from NewsAPI and store it in the cache, even if a fresh entry exists.
+
+    Used by the prefetch scheduler. Unlike search_news, upstream and quota errors are raised.
+    """
+    validation_error = validate_search_params(query, page_size, config.NEWSAPI_API_KEY)
+    if validation_error:
+        raise ValueError(validation_error.get("message", validation_error["error"]))
+    # Peek so background refreshes do not count as cache hits or misses of user traffic
+    previous = (await _cache_io(search_cache.peek, _cache_key(query, language, page_size))).value
+    return await _fetch_news(query, language, page_size, previous)
+
+def _stale_or_error(lookup: CacheLookup, query: str, error_response: Dict[str, Any]) -> Dict[str, Any]:
+    """Fall back to an expired cache entry when the upstream call failed."""
+    if lookup.state == CacheState.EXPIRED:
+        logger.warning(f"Serving stale news for query '{query}' after upstream error")
+        search_cache.record_stale_error_served()
+        return lookup.value
+    return error_response
+
+async def _unavailable_fallback(lookup: CacheLookup, query: str, language: str, page_size: int,
+                                error_response: Dict[str, Any]) -> Dict[str, Any]:
+    """Serve an expired cache entry or older local index results when NewsAPI cannot be called."""
+    if lookup.state == CacheState.EXPIRED:
+        return _stale_or_error(lookup, query, {})
+    local_result = await asyncio.to_thread(
+        _search_local_index, query, language, page_size, config.SEARCH_CACHE_STALE_IF_ERROR
+    )
+    if local_result is not None:
+        return local_result
+    return error_response
+
+def _with_quota(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach the remaining NewsAPI quota to a response."""
+    return {**response, "quota": newsapi_quota.remaining()}
+
+def _since_cursor(result: Dict[str, Any], since: Optional[str], page_size: int) -> Dict[str, Any]:
+    """
+    Attach the result's cursor and, given a client cursor, keep only the articles published after it.
+
+    has_more is set when articles newer than the client cursor may be missing: the result was
+    merged from an incremental fetch that filled the page, or every article of a full page is
+    newer than the client cursor. Callers can then page through them with search_news_pages.
+    """
+    if "error" in result:
+        return result
+    articles = result["articles"]
+    cursor = result.get("cursor") or newest_published_at(articles)
+    has_more = bool(result.get("has_more"))
+    since_at = parse_timestamp(since)
+    if since_at is not None:
+        newer = [article for article in articles if (published_time(article) or since_at) > since_at]
+        has_more = has_more or len(newer) == len(articles) >= page_size
+        articles = newer
+        if cursor is None or parse_timestamp(cursor) < since_at:
+            cursor = since
+    return {**result, "articles": articles, "cursor": cursor, "has_more": has_more}
+
+def _validate_response_options(fields: Optional[List[str]], max_description_length: Optional[int],
+                               layout: str) -> Optional[Dict[str, Any]]:
+    """Return an error response if the response options are invalid, otherwise None."""
+    if fields is not None:
+        unknown = [field for field in fields if field not in ARTICLE_FIELDS]
+        if unknown or not fields:
+            logger.error(f"Invalid fields: {fields}")
+            return {"error": "Invalid fields", "message": f"fields must be a non-empty list of {', '.join(ARTICLE_FIELDS)}"}
+
+    if max_description_length is not None and max_description_length < 0:
+        logger.error(f"Invalid description length: {max_description_length}")
+        return {"error": "Invalid description length", "message": "max_description_length must not be negative"}
+
+    if layout not in RESPONSE_LAYOUTS:
+        logger.error(f"Invalid layout: {layout}")
+        return {"error": "Invalid layout", "message": f"layout must be one of {', '.join(RESPONSE_LAYOUTS)}"}
+
+    return None
+
+def _truncate(text: Optional[str], max_length: int) -> Optional[str]:
+    """Cut text to at most max_length characters, marking the cut with an ellipsis."""
+    if text is None or len(text) <= max_length:
+        return text
+    if max_length == 0:
+        return ""
+    return text[:max_length - 1].rstrip() + "\u2026"
+
+def _trim_response(result: Dict[str, Any], fields: Optional[List[str]], max_description_length: Optional[int],
+                   layout: str) -> Dict[str, Any]:
+    """Project the articles of a result onto the requested fields, cap descriptions and lay them out."""
+    if "error" in result or (fields is None and max_description_length is None and layout == "records"):
+        return result
+    fields = [field for field in ARTICLE_FIELDS if field in fields] if fields else list(ARTICLE_FIELDS)
+    columns = {field: [article[field] for article in result["articles"]] for field in fields}
+    if max_description_length is not None and "description" in columns:
+        columns["description"] = [_truncate(text, max_description_length) for text in columns["description"]]
+
+    if layout == "columns":
+        articles = columns
+    else:
+        articles = [dict(zip(fields, values)) for values in zip(*columns.values())]
+    return {**result, "articles": articles}
+
+async def _search(query: str, language: str, page_size: int, use_local_index: bool,
+                  since: Optional[str]) -> Dict[str, Any]:
+    """Answer a validated search from the local index, the cache or NewsAPI, with cache fallbacks on errors."""
+    if use_local_index:
+        local_result = await asyncio.to_thread(_search_local_index, query, language, page_size)
+        if local_result is not None:
+            return _since_cursor(local_result, since, page_size)
+
+    key = _cache_key(query, language, page_size)
+    lookup = await _cache_io(search_cache.get, key)
+    annotate(search_cache=lookup.state.value)
+    if lookup.state in (CacheState.FRESH, CacheState.STALE):
+        if lookup.state == CacheState.STALE:
+            _refresh_in_background(key, query, language, page_size, lookup.value)
+        logger.info(f"Serving {lookup.state.value} cached news for query: {query}")
+        return _since_cursor(lookup.value, since, page_size)
+
+    try:
+        logger.info(f"Fetching news for query: {query}")
+        result = await _fetch_news(query, language, page_size, lookup.value)
+
+    except QuotaExceededError as e:
+        logger.warning(f"NewsAPI quota exhausted for query '{query}': {str(e)}")
+        return _since_cursor(await _unavailable_fallback(lookup, query, language, page_size, {
+            "error": "Quota exceeded", "message": str(e), "retry_after": round(e.retry_after, 1)
+        }), since, page_size)
+
+    except CircuitOpenError as e:
+        logger.warning(f"NewsAPI circuit open for query '{query}': {str(e)}")
+        return _since_cursor(await _unavailable_fallback(lookup, query, language, page_size, {
+            "error": "Upstream unavailable", "message": str(e), "retry_after": round(e.retry_after, 1)
+        }), since, page_size)
+
+    except Exception as e:
+        logger.error(f"Error in search_news: {str(e)}")
+        return _since_cursor(_stale_or_error(lookup, query, {"error": "API error", "message": str(e)}), since, page_size)
+
+    return _since_cursor(result, since, page_size)
+
+async def search_news(query: str, language: str, page_size: int, use_local_index: bool = False,
+                      since: Optional[str] = None, fields: Optional[List[str]] = None,
+                      max_description_length: Optional[int] = None, layout: str = "records") -> Dict[str, Any]:
     """Search for recent news articles matching a specific query.
-    
+
     Args:
         query: Search news query
         language: News language (e.g., "en")
         page_size: Amount of articles to return per page
-        
+        use_local_index: Answer from the local article index when a recent fetch covers the query;
+            queries using NewsAPI operators (quotes, +/-, AND/OR/NOT, parentheses) always go to NewsAPI
+        since: Cursor of an earlier response; only articles published after it are returned
+        fields: Article fields to return (title, description, url, source_name, published_at); all by default
+        max_description_length: Cut descriptions longer than this many characters
+        layout: "records" for a list of articles, or "columns" for one list per field, which
+            avoids repeating the field names in every article
+
     Returns:
-        A dictionary with a list of articles
+        A dictionary with the articles, a cursor (the newest publication time seen) to pass as
+        `since` on the next call, has_more (true when newer articles than `since` may have
+        been left out for lack of room, see _since_cursor), and the remaining NewsAPI quota
     """
-    if not query:
-        logger.error("Query parameter is required")
-        return {"error": "Query parameter is required"}
-    
-    if page_size < 1 or page_size > 100:
-        logger.error(f"Invalid page size: {page_size}")
-        return {"error": "Invalid page size", "message": "Page size must be between 1 and 100"}
-    
-    try:
-        api_key = config.NEWSAPI_API_KEY
-        if not api_key:
-            logger.error("NEWSAPI_API_KEY not configured")
-            return {"error": "Configuration error", "message": "NEWSAPI_API_KEY is required in environment variables"}
-            
-        newsapi = NewsApiClient(api_key=api_key)
-        logger.info(f"Fetching news for query: {query}")
-        
-        news_data = newsapi.get_everything(
-            q=query,
-            language=language,
-            page_size=page_size,
-            sort_by='publishedAt'
-        )
-        
-        formatted_articles = []
-        for article in news_data["articles"]:
-            formatted_article = {
-                "title": article["title"],
-                "description": article["description"],
-                "url": article["url"],
-                "source_name": article["source"]["name"],
-                "published_at": article["publishedAt"]
-            }
-            formatted_articles.append(formatted_article)
-        
-        return {"articles": formatted_articles}
-        
-    except ValueError as ve:
-        logger.error(f"Configuration error: {str(ve)}")
-        return {"error": "Configuration error", "message": str(ve)}
-    except Exception as e:
-        logger.error(f"Error in search_news: {str(e)}")
-        return {"error": "API error", "message": str(e)}
+    validation_error = (validate_search_params(query, page_size, config.NEWSAPI_API_KEY)
+                        or _validate_response_options(fields, max_description_length, layout))
+    if validation_error:
+        return validation_error
+
+    if since is not None and parse_timestamp(since) is None:
+        logger.error(f"Invalid cursor: {since}")
+        return {"error": "Invalid cursor", "message": "since must be an ISO 8601 timestamp, e.g. a previous cursor"}
+
+    result = await _search(query, language, page_size, use_local_index, since)
+    return _with_quota(_trim_response(result, fields, max_description_length, layout))
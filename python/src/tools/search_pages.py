@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import math
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional
+
+from fastmcp import Context
+
+from src.config import config
+from src.services.articles import Article, format_articles, newest_published_at, parse_timestamp, published_time
+from src.services.news_api import call_newsapi, validate_search_params, NewsApiError, MAX_RESULTS_REACHED_CODE
+from src.services.quota import newsapi_quota, QuotaExceededError
+from src.services.resilience import CircuitOpenError
+from src.services.serialization import dumps
+from src.services.tracing import annotate, tracer
+
+logger = logging.getLogger(__name__)
+
+# Largest page NewsAPI serves
+MAX_PAGE_SIZE = 100
+
+
+class ArticleBatch(NamedTuple):
+    """One page of formatted articles, as yielded by iter_news_pages."""
+    page: int
+    articles: List[Article]
+    total_results: int
+
+
+def _page_batch(news_data: Dict[str, Any], page: int, page_size: int, max_articles: int,
+                cutoff: Optional[datetime]) -> ArticleBatch:
+    """Format one page, keeping its share of max_articles and the articles published at or after the cutoff."""
+    articles = format_articles(news_data)[:max(0, max_articles - (page - 1) * page_size)]
+    if cutoff is not None:
+        articles = [
+            article for article in articles
+            if (published_time(article) or cutoff) >= cutoff
+        ]
+    return ArticleBatch(page, articles, news_data.get("totalResults", 0))
+
+
+async def _fetch_page(query: str, language: str, page_size: int, page: int,
+                      until: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Fetch one page of results, or return None if it lies beyond what NewsAPI lets us page through."""
+    params = {"q": query, "language": language, "page_size": page_size, "sort_by": 'publishedAt', "page": page}
+    if until:
+        params["from_date"] = until
+    with tracer.span("search.fetch_page", query=query, page=page, page_size=page_size):
+        try:
+            return await call_newsapi(params, config.NEWSAPI_API_KEY)
+        except NewsApiError as e:
+            if e.code == MAX_RESULTS_REACHED_CODE:
+                logger.warning(f"NewsAPI stops paging query '{query}' at page {page}: {str(e)}")
+                return None
+            raise
+
+
+async def iter_news_pages(query: str, language: str, max_articles: int, until: Optional[str] = None,
+                          page_size: int = MAX_PAGE_SIZE,
+                          concurrency: Optional[int] = None) -> AsyncIterator[ArticleBatch]:
+    """
+    Page through the results of a query, newest first, yielding each page as it arrives.
+
+    The first page is fetched alone to learn the number of results; the following pages are
+    fetched concurrently, at most `concurrency` at a time, and yielded in the order they arrive.
+    Only the pages in flight are held in memory. Paging stops once max_articles are covered,
+    the results are exhausted or a page reaches articles published before `until`; pages that
+    are still in flight then are cancelled, as they are when the caller stops iterating.
+
+    Args:
+        query: Search news query
+        language: News language (e.g., "en")
+        max_articles: Maximum number of articles to yield in total
+        until: Optional ISO 8601 time; older articles are neither requested nor yielded
+        page_size: Articles per page, at most 100
+        concurrency: Maximum number of pages in flight, SEARCH_PAGE_CONCURRENCY by default
+
+    Yields:
+        ArticleBatch tuples; pages left empty by the cutoff are skipped
+
+    Raises:
+        QuotaExceededError, CircuitOpenError, NewsApiError, httpx.HTTPError: If a page fails
+    """
+    concurrency = max(1, concurrency or config.SEARCH_PAGE_CONCURRENCY)
+    page_size = min(page_size, max_articles, MAX_PAGE_SIZE)
+    cutoff = parse_timestamp(until)
+    last_page = math.ceil(max_articles / page_size)
+    total_known = False
+
+    in_flight: Dict[asyncio.Task, int] = {}
+    next_page = 1
+    try:
+        while True:
+            # The first page tells how many pages there are, so it is fetched alone
+            while len(in_flight) < (concurrency if total_known else 1) and next_page <= last_page:
+                task = asyncio.create_task(_fetch_page(query, language, page_size, next_page, until))
+                in_flight[task] = next_page
+                next_page += 1
+            if not in_flight:
+                return
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=in_flight.get):
+                page = in_flight.pop(task)
+                news_data = task.result()
+                if page > last_page:
+                    # An earlier page of the same round turned out to be the last one
+                    continue
+                if news_data is None:
+                    last_page = min(last_page, page - 1)
+                    continue
+
+                batch = _page_batch(news_data, page, page_size, max_articles, cutoff)
+                raw_count = len(news_data.get("articles", []))
+                if not total_known:
+                    total_known = True
+                    last_page = min(last_page, max(1, math.ceil(batch.total_results / page_size)))
+                # Results are sorted by publication time, so a short page or one reaching the cutoff is the last
+                if raw_count < page_size or len(batch.articles) < raw_count:
+                    last_page = min(last_page, page)
+                # Hold only the formatted batch while the caller handles it
+                del news_data
+                if batch.articles:
+                    yield batch
+
+            for task, page in list(in_flight.items()):
+                if page > last_page:
+                    task.cancel()
+                    del in_flight[task]
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+async def search_news_pages(query: str, language: str = "en", max_articles: int = 500, until: Optional[str] = None,
+                            stream_only: bool = False, ctx: Optional[Context] = None) -> Dict[str, Any]:
+    """Search deep result sets of more than 100 news articles, page by page.
+
+    Pages are fetched concurrently and every page is sent to the client as a progress
+    notification as soon as it arrives. Each page costs one request of the NewsAPI quota.
+
+    Args:
+        query: Search news query
+        language: News language (e.g., "en")
+        max_articles: Maximum number of articles, up to SEARCH_PAGES_MAX_ARTICLES
+        until: Optional ISO 8601 time; stop at articles published before it
+        stream_only: Only stream the pages as progress notifications and leave the articles
+            out of the result, so neither side holds the full result set
+        ctx: MCP request context, injected by the server
+
+    Returns:
+        A dictionary with the articles (unless stream_only), their count, the cursor (newest
+        publication time) and the remaining NewsAPI quota
+    """
+    validation_error = validate_search_params(query, 1, config.NEWSAPI_API_KEY)
+    if validation_error:
+        return validation_error
+
+    if max_articles < 1 or max_articles > config.SEARCH_PAGES_MAX_ARTICLES:
+        logger.error(f"Invalid max_articles: {max_articles}")
+        return {
+            "error": "Invalid parameter",
+            "message": f"max_articles must be between 1 and {config.SEARCH_PAGES_MAX_ARTICLES}"
+        }
+
+    if until is not None and parse_timestamp(until) is None:
+        logger.error(f"Invalid until: {until}")
+        return {"error": "Invalid parameter", "message": "until must be an ISO 8601 timestamp"}
+
+    batches: List[ArticleBatch] = []
+    article_count, page_count, total_results, cursor = 0, 0, 0, None
+    try:
+        async for batch in iter_news_pages(query, language, max_articles, until):
+            article_count += len(batch.articles)
+            page_count += 1
+            total_results = batch.total_results
+            # Page 1 holds the newest articles and is always yielded first
+            cursor = cursor or newest_published_at(batch.articles)
+            if not stream_only:
+                batches.append(batch)
+            if ctx is not None:
+                try:
+                    await ctx.report_progress(
+                        article_count, max_articles,
+                        dumps({"page": batch.page, "articles": batch.articles})
+                    )
+                except Exception as e:
+                    # A client that stopped listening must not fail the tool call
+                    logger.warning(f"Failed to send page {batch.page} of query '{query}': {str(e)}")
+
+    except QuotaExceededError as e:
+        logger.warning(f"NewsAPI quota exhausted while paging query '{query}': {str(e)}")
+        return {"error": "Quota exceeded", "message": str(e), "retry_after": round(e.retry_after, 1),
+                "article_count": article_count, "quota": newsapi_quota.remaining()}
+
+    except CircuitOpenError as e:
+        logger.warning(f"NewsAPI circuit open while paging query '{query}': {str(e)}")
+        return {"error": "Upstream unavailable", "message": str(e), "retry_after": round(e.retry_after, 1),
+                "article_count": article_count, "quota": newsapi_quota.remaining()}
+
+    except Exception as e:
+        logger.error(f"Error in search_news_pages: {str(e)}")
+        return {"error": "API error", "message": str(e), "article_count": article_count,
+                "quota": newsapi_quota.remaining()}
+
+    annotate(article_count=article_count, page_count=page_count)
+    result = {
+        "article_count": article_count,
+        "page_count": page_count,
+        "total_results": total_results,
+        "cursor": cursor,
+        "quota": newsapi_quota.remaining(),
+    }
+    if not stream_only:
+        # Pages arrive out of order, the articles are returned newest first
+        result["articles"] = [article for batch in sorted(batches) for article in batch.articles]
+    return result
@@ -1,18 +1,108 @@
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from fastmcp import Context
+
+from src.config import config
+from src.tools.progress import field_progress_reporter
 from src.tools.search_news import search_news
-from src.services.llm import llm_service
+from src.services.llm import llm_service, SENTIMENT_ANALYSIS_SCHEMAS
+from src.services.dedup import collapse_near_duplicates
+from src.services.entity_extractor import local_entity_extractor
+from src.services.local_sentiment import local_sentiment_scorer, EscalationCounter
+from src.services.metrics import metrics
+from src.services.tracing import annotate, tracer
 
 logger = logging.getLogger(__name__)
 
-def extract_key_info_and_sentiment(query: str, language: str = "en", max_articles_to_analyze: int = 5) -> Dict[str, Any]:
+# Share of sentiment requests the local tier could not answer confidently enough
+sentiment_escalations = EscalationCounter()
+metrics.gauge_function(
+    "news_mcp_sentiment_escalation_rate", "Share of sentiment requests escalated from the local tier to the LLM",
+    (), lambda: {(): sentiment_escalations.stats()["escalation_rate"]})
+
+def _success_response(query: str, article_count: int, sentiment_analysis: Dict[str, Any],
+                      metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": "success",
+        "result": {
+            "query": query,
+            "analyzed_article_count": article_count,
+            "overall_sentiment": sentiment_analysis["overall_sentiment"],
+            "sentiment_confidence": sentiment_analysis["sentiment_confidence"],
+            "key_entities": sentiment_analysis["key_entities"],
+            "key_takeaway_summary": sentiment_analysis["key_takeaway_summary"]
+        },
+        "metadata": metadata
+    }
+
+async def _analyze_search_result(query: str, search_result: Dict[str, Any], ctx: Optional[Context],
+                                 record_escalation: bool) -> Dict[str, Any]:
+    """Deduplicate and score the articles of a search result, escalating to the LLM when the local tier is unsure."""
+    articles = search_result["articles"]
+    if not articles:
+        logger.warning(f"No articles found for query: {query}")
+        return {"error": "No articles found", "message": f"No articles found for query: {query}"}
+
+    with tracer.span("sentiment.deduplicate", article_count=len(articles)) as span:
+        articles, deduplication = collapse_near_duplicates(articles, config.DEDUP_SIMILARITY_THRESHOLD)
+        span.set_attributes(unique_article_count=len(articles))
+
+    with tracer.span("sentiment.local_score", article_count=len(articles)) as span:
+        local_analysis = local_sentiment_scorer.analyze(articles)
+        span.set_attributes(confidence=local_analysis["confidence"])
+    escalated = local_analysis["confidence"] < config.LOCAL_SENTIMENT_CONFIDENCE_THRESHOLD
+    annotate(analysis_tier="llm" if escalated else "local")
+    if record_escalation:
+        sentiment_escalations.record(escalated)
+    if not escalated:
+        logger.info(f"Answering sentiment for query '{query}' locally with confidence {local_analysis['confidence']}")
+        with tracer.span("sentiment.local_entities", article_count=len(articles)):
+            local_analysis["key_entities"] = local_entity_extractor.key_entities(articles)
+        return _success_response(query, len(articles), local_analysis, {
+            "analysis_tier": "local",
+            "entity_source": "gazetteer",
+            "local_confidence": local_analysis["confidence"],
+            "deduplication": deduplication,
+            "newsapi_quota": search_result.get("quota")
+        })
+
+    try:
+        sentiment_analysis = await llm_service.aanalyze_sentiment(
+            query, articles, on_field=field_progress_reporter(ctx, len(SENTIMENT_ANALYSIS_SCHEMAS))
+        )
+
+        return _success_response(query, len(articles), sentiment_analysis, {
+            "analysis_tier": "llm",
+            "entity_source": "llm",
+            "local_confidence": local_analysis["confidence"],
+            "deduplication": deduplication,
+            "newsapi_quota": search_result.get("quota"),
+            "prompt_packing": sentiment_analysis.get("prompt_packing"),
+            "chunk_count": sentiment_analysis.get("chunk_count", 1)
+        })
+    except Exception as e:
+        logger.error(f"Error analyzing sentiment: {str(e)}")
+        return {"error": "LLM processing error", "message": str(e)}
+
+async def extract_key_info_and_sentiment(query: str, language: str = "en", max_articles_to_analyze: int = 5,
+                                         ctx: Optional[Context] = None) -> Dict[str, Any]:
     """Analyze news articles to extract key entities and determine sentiment.
     
+    Syndicated copies of the same story are collapsed to one article first, keeping its source
+    count, so they neither inflate the prompt nor skew the sentiment. Articles are then scored
+    locally; only when the local confidence is below
+    LOCAL_SENTIMENT_CONFIDENCE_THRESHOLD is the request escalated to the LLM, whose result
+    fields are sent as progress notifications as soon as they are known. Local answers take
+    their key entities from the gazetteer, so they only name entities the gazetteer knows;
+    metadata.entity_source tells which extractor produced them.
+    
     Args:
         query: Search news query
         language: News language (e.g., "en")
-        max_articles_to_analyze: Maximum articles to analyze
+        max_articles_to_analyze: Maximum articles to analyze; more than SENTIMENT_CHUNK_SIZE
+            articles are analyzed in parallel chunks and merged
+        ctx: MCP request context, injected by the server
         
     Returns:
         A dictionary with sentiment analysis and key information
@@ -21,40 +111,42 @@ def extract_key_info_and_sentiment(query: str, language: str = "en", max_article
         logger.error("Query parameter is required")
         return {"error": "Query parameter is required"}
     
-    if max_articles_to_analyze < 1 or max_articles_to_analyze > 10:
+    if max_articles_to_analyze < 1 or max_articles_to_analyze > config.SENTIMENT_MAX_ARTICLES:
         logger.error(f"Invalid max_articles_to_analyze: {max_articles_to_analyze}")
-        return {"error": "Invalid parameter", "message": "max_articles_to_analyze must be between 1 and 10"}
+        return {
+            "error": "Invalid parameter",
+            "message": f"max_articles_to_analyze must be between 1 and {config.SENTIMENT_MAX_ARTICLES}"
+        }
     
     try:
-        search_result = search_news(query, language, max_articles_to_analyze)
+        search_result = await search_news(query, language, max_articles_to_analyze)
         
         if "error" in search_result:
             logger.error(f"Error searching for articles: {search_result['error']}")
             return search_result
         
-        articles = search_result["articles"]
-        if not articles:
-            logger.warning(f"No articles found for query: {query}")
-            return {"error": "No articles found", "message": f"No articles found for query: {query}"}
-        
-        try:
-            sentiment_analysis = llm_service.analyze_sentiment(query, articles)
-            
-            return {
-                "status": "success",
-                "result": {
-                    "query": query,
-                    "analyzed_article_count": len(articles),
-                    "overall_sentiment": sentiment_analysis["overall_sentiment"],
-                    "sentiment_confidence": sentiment_analysis["sentiment_confidence"],
-                    "key_entities": sentiment_analysis["key_entities"],
-                    "key_takeaway_summary": sentiment_analysis["key_takeaway_summary"]
-                }
-            }
-        except Exception as e:
-            logger.error(f"Error analyzing sentiment: {str(e)}")
-            return {"error": "LLM processing error", "message": str(e)}
+        return await _analyze_search_result(query, search_result, ctx, record_escalation=True)
         
     except Exception as e:
         logger.error(f"Error in extract_key_info_and_sentiment: {str(e)}")
         return {"error": "Processing error", "message": str(e)}
+
+async def precompute_sentiment(query: str, search_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyze a search result fetched in the background, filling the LLM result cache for later calls.
+    
+    Used by the prefetch scheduler with the result it just refreshed. The search cache is not
+    read and the escalation counter is not updated, so background work does not skew the hit
+    and escalation rates of user traffic.
+    
+    Args:
+        query: Search news query the result was fetched for
+        search_result: Result of the refreshed search
+        
+    Returns:
+        A dictionary with sentiment analysis and key information, or an error
+    """
+    try:
+        return await _analyze_search_result(query, search_result, None, record_escalation=False)
+    except Exception as e:
+        logger.error(f"Error precomputing sentiment for query '{query}': {str(e)}")
+        return {"error": "Processing error", "message": str(e)}
@@ -5,7 +5,7 @@ import pytest
 from unittest.mock import patch
 from src.tools.search_news import search_news
 
-class TestSearchNewsIntegration(unittest.TestCase):
+class TestSearchNewsIntegration(unittest.IsolatedAsyncioTestCase):
     """Integration tests for search_news that make real API calls.
     
     NOTE: These tests require a valid NEWSAPI_API_KEY in your environment.
@@ -21,12 +21,12 @@ class TestSearchNewsIntegration(unittest.TestCase):
         print(f"Using NEWSAPI_API_KEY: {self.api_key[:5]}..." if self.api_key else "No API key found")
     
     @patch('src.tools.search_news.config')
-    def test_real_search_api_call(self, mock_config):
+    async def test_real_search_api_call(self, mock_config):
         """Test a real API call to NewsAPI."""
         mock_config.NEWSAPI_API_KEY = self.api_key
         
         query = "technology"
-        result = search_news(query, "en", 5)
+        result = await search_news(query, "en", 5)
         
         self.assertIn("articles", result)
         self.assertIsInstance(result["articles"], list)
@@ -42,12 +42,12 @@ class TestSearchNewsIntegration(unittest.TestCase):
             self.assertTrue(article["url"])
     
     @patch('src.tools.search_news.config')
-    def test_real_search_with_specific_query(self, mock_config):
+    async def test_real_search_with_specific_query(self, mock_config):
         """Test searching for a more specific query."""
         mock_config.NEWSAPI_API_KEY = self.api_key
         
         query = "artificial intelligence"
-        result = search_news(query, "en", 3)
+        result = await search_news(query, "en", 3)
         
         self.assertIn("articles", result)
         
@@ -58,13 +58,13 @@ class TestSearchNewsIntegration(unittest.TestCase):
             print(f"- {article['title']}")
     
     @patch('src.tools.search_news.config')
-    def test_real_search_with_language_filter(self, mock_config):
+    async def test_real_search_with_language_filter(self, mock_config):
         """Test searching with a language filter."""
         # Set API key on the mocked config object
         mock_config.NEWSAPI_API_KEY = self.api_key
         
         query = "science"
-        result = search_news(query, "fr", 3)
+        result = await search_news(query, "fr", 3)
         
         self.assertIn("articles", result)
         self.assertNotIn("error", result)
@@ -5,9 +5,18 @@ from pathlib import Path
 from dotenv import load_dotenv
 import importlib
 import sys
+from unittest.mock import patch
+
+# NumPy can only be initialized once per process, so load it before any test snapshots
+# and restores sys.modules (test_main does) and would otherwise drop it
+import numpy  # noqa: F401
 
 sys.path.insert(0, str(Path(__file__).parents[1]))
 
+# Tests must never read or write the on-disk caches configured for the server
+os.environ["ARTICLE_STORE_PATH"] = ""
+os.environ["LLM_CACHE_PATH"] = ""
+
 
 def pytest_configure(config):
     """Configure pytest with custom markers."""
@@ -57,6 +66,54 @@ def setup_test_env():
     os.environ.update(original_env)
 
 
+@pytest.fixture(autouse=True)
+def clear_search_cache():
+    """Start every test with an empty search cache so cached results never leak between tests."""
+    from src.tools.search_news import search_cache
+    search_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_article_store():
+    """Give every test a private in-memory article store instead of the configured database."""
+    from src.services.article_store import ArticleStore
+    store = ArticleStore(":memory:")
+    with patch("src.tools.search_news.article_store", store):
+        yield store
+    store.close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_newsapi_quota():
+    """Give every test an unlimited NewsAPI quota so tests never use up the shared daily allowance."""
+    from src.services.quota import QuotaScheduler
+    quota = QuotaScheduler(name="NewsAPI", daily_limit=0, requests_per_second=0)
+    with patch("src.services.news_api.newsapi_quota", quota), \
+            patch("src.tools.search_news.newsapi_quota", quota), \
+            patch("src.tools.search_pages.newsapi_quota", quota):
+        yield quota
+
+
+@pytest.fixture(autouse=True)
+def isolated_newsapi_resilience():
+    """Give every test a closed NewsAPI circuit without retries, so failing tests never affect later ones."""
+    from src.services.resilience import CircuitBreaker, ResilientCaller, RetryBudget
+    from src.services.news_api import _is_transient_newsapi_error
+    caller = ResilientCaller(
+        name="NewsAPI",
+        is_retryable=_is_transient_newsapi_error,
+        max_attempts=1,
+        base_delay=0,
+        max_delay=0,
+        retry_budget=RetryBudget(ratio=0, reserve=0),
+        breaker=CircuitBreaker("NewsAPI", failure_threshold=1000, recovery_timeout=0),
+    )
+    with patch("src.services.news_api.newsapi_resilience", caller):
+        yield caller
+
+
+
 @pytest.fixture
 def fresh_config():
     """Provide a freshly initialized config object with current environment variables."""
@@ -68,4 +125,4 @@ def fresh_config():
         return Config()
     except Exception as e:
         print(f"Error creating fresh config: {e}")
-        return None 
\ No newline at end of file
+        return None 
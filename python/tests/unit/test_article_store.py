@@ -0,0 +1,163 @@
+import unittest
+from unittest.mock import patch
+
+from src.services.article_store import ArticleStore, covering_term_sets, has_query_operators, query_terms
+
+
+def _article(index, title, description="Description"):
+    return {
+        "title": title,
+        "description": description,
+        "url": f"https://example.com/{index}",
+        "source_name": "Test Source",
+        "published_at": f"2023-01-0{index}T12:00:00Z"
+    }
+
+
+class TestArticleStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = ArticleStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_query_terms_are_normalized(self):
+        self.assertEqual(query_terms("Apple  iPhone apple!"), ("apple", "iphone"))
+
+    def test_exact_query_is_served_newest_first(self):
+        self.store.save_articles("apple", "en", 2, [_article(1, "Apple one"), _article(2, "Apple two")])
+
+        articles = self.store.search("Apple", "en", 2, max_age=60)
+
+        self.assertEqual([article["title"] for article in articles], ["Apple two", "Apple one"])
+
+    def test_articles_are_deduplicated_by_url(self):
+        self.store.save_articles("apple", "en", 5, [_article(1, "Old title")])
+        self.store.save_articles("iphone", "en", 5, [_article(1, "New title")])
+
+        count = self.store._connection.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        self.assertEqual(count, 1)
+        self.assertEqual(self.store.search("apple", "en", 5, max_age=60)[0]["title"], "New title")
+
+    def test_larger_page_than_fetched_is_not_covered(self):
+        self.store.save_articles("apple", "en", 2, [_article(1, "Apple one"), _article(2, "Apple two")])
+
+        self.assertIsNone(self.store.search("apple", "en", 10, max_age=60))
+
+    def test_narrower_query_uses_full_text_index_of_complete_fetch(self):
+        self.store.save_articles("apple", "en", 10, [
+            _article(1, "Apple ships new iPhone"),
+            _article(2, "Apple earnings beat estimates"),
+        ])
+
+        articles = self.store.search("apple iphone", "en", 10, max_age=60)
+
+        self.assertEqual([article["title"] for article in articles], ["Apple ships new iPhone"])
+
+    def test_old_fetch_is_not_used(self):
+        with patch('src.services.article_store.time.time', return_value=1000.0):
+            self.store.save_articles("apple", "en", 1, [_article(1, "Apple one")])
+        with patch('src.services.article_store.time.time', return_value=2000.0):
+            self.assertIsNone(self.store.search("apple", "en", 1, max_age=60))
+
+    def test_other_language_is_not_used(self):
+        self.store.save_articles("apple", "en", 1, [_article(1, "Apple one")])
+
+        self.assertIsNone(self.store.search("apple", "fr", 1, max_age=60))
+
+
+    def test_candidate_term_sets_are_bounded_for_long_queries(self):
+        self.assertEqual(covering_term_sets(("apple", "iphone")), ["apple", "iphone", "apple iphone"])
+        terms = tuple(f"term{index}" for index in range(12))
+        self.assertEqual(len(covering_term_sets(terms)), 13)
+
+    def test_broader_fetch_of_a_long_query_is_found(self):
+        self.store.save_articles("apple", "en", 10, [_article(1, "Apple ships new iPhone")])
+        query = "apple iphone pro max ultra mini plus air case screen"
+
+        self.assertEqual(self.store.search(query, "en", 10, max_age=60), [])
+
+
+class TestArticleStoreQueryOperators(unittest.TestCase):
+
+    OPERATOR_QUERIES = (
+        "apple -iphone",
+        "+apple iphone",
+        '"apple iphone"',
+        "apple NOT iphone",
+        "apple AND iphone",
+        "apple OR iphone",
+        "(apple iphone)",
+    )
+
+    def setUp(self):
+        self.store = ArticleStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_operators_are_detected(self):
+        for query in self.OPERATOR_QUERIES:
+            self.assertTrue(has_query_operators(query), query)
+        self.assertFalse(has_query_operators("covid-19 vaccine apple"))
+
+    def test_queries_with_operators_are_not_answered_locally(self):
+        self.store.save_articles("apple iphone", "en", 10, [_article(1, "Apple ships new iPhone")])
+        self.store.save_articles("apple", "en", 10, [_article(2, "Apple ships new iPhone case")])
+
+        for query in self.OPERATOR_QUERIES:
+            self.assertIsNone(self.store.search(query, "en", 10, max_age=60), query)
+
+    def test_fetches_of_queries_with_operators_are_not_recorded(self):
+        for query in self.OPERATOR_QUERIES:
+            self.store.save_articles(query, "en", 10, [_article(1, "Apple earnings beat estimates")])
+
+        self.assertIsNone(self.store.search("apple iphone", "en", 10, max_age=60))
+        self.assertIsNone(self.store.search("apple", "en", 10, max_age=60))
+
+
+class TestArticleStoreRetention(unittest.TestCase):
+
+    def setUp(self):
+        self.store = ArticleStore(":memory:", retention=100.0)
+
+    def tearDown(self):
+        self.store.close()
+
+    def count(self, table):
+        return self.store._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_old_fetches_and_unreferenced_articles_are_pruned(self):
+        with patch('src.services.article_store.time.time', return_value=1000.0):
+            self.store.save_articles("apple", "en", 2, [_article(1, "Apple one"), _article(2, "Apple two")])
+        with patch('src.services.article_store.time.time', return_value=1050.0):
+            # Replaces the "apple" fetch, leaving article 2 unreferenced
+            self.store.save_articles("apple", "en", 1, [_article(1, "Apple one")])
+        with patch('src.services.article_store.time.time', return_value=1000.0 + 3 * 3600):
+            self.store.save_articles("iphone", "en", 1, [_article(3, "iPhone three")])
+
+        self.assertEqual(self.count("fetches"), 1)
+        self.assertEqual(self.count("articles"), 1)
+        self.assertEqual(self.store._connection.execute(
+            "SELECT COUNT(*) FROM articles_fts WHERE articles_fts MATCH 'apple'").fetchone()[0], 0)
+
+    def test_articles_of_remaining_fetches_are_kept(self):
+        with patch('src.services.article_store.time.time', return_value=1000.0):
+            self.store.save_articles("apple", "en", 1, [_article(1, "Apple one")])
+        with patch('src.services.article_store.time.time', return_value=1000.0 + 2 * 3600):
+            self.store.save_articles("apple", "en", 2, [_article(1, "Apple one"), _article(2, "Apple two")])
+
+        self.assertEqual(self.count("articles"), 2)
+
+    def test_pruning_runs_at_most_once_per_interval(self):
+        with patch('src.services.article_store.time.time', return_value=1000.0):
+            self.store.save_articles("apple", "en", 1, [_article(1, "Apple one")])
+        with patch('src.services.article_store.time.time', return_value=1200.0):
+            self.store.save_articles("iphone", "en", 1, [_article(2, "iPhone two")])
+
+        self.assertEqual(self.count("fetches"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import unittest
+from datetime import datetime, timezone
+
+from src.services.articles import Article, parse_timestamp, published_time
+from src.services.cache import TTLCache
+from src.services.serialization import dumps, loads
+
+
+def raw_article(source_name="Test Source", published_at="2024-01-01T12:30:00Z"):
+    return {
+        "source": {"id": None, "name": source_name},
+        "author": "Author",
+        "title": "Test Article",
+        "description": "Test Description",
+        "url": "https://example.com/article",
+        "urlToImage": "https://example.com/image.jpg",
+        "publishedAt": published_at,
+        "content": "Test Content",
+    }
+
+
+ARTICLE_DICT = {
+    "title": "Test Article",
+    "description": "Test Description",
+    "url": "https://example.com/article",
+    "source_name": "Test Source",
+    "published_at": "2024-01-01T12:30:00Z",
+}
+
+
+class TestArticle(unittest.TestCase):
+
+    def test_article_reads_like_the_formatted_dict(self):
+        article = Article.from_newsapi(raw_article())
+
+        self.assertEqual(article, ARTICLE_DICT)
+        self.assertEqual({**article}, ARTICLE_DICT)
+        self.assertEqual(article["source_name"], "Test Source")
+        self.assertEqual(article.get("content"), None)
+        with self.assertRaises(KeyError):
+            article["published"]
+
+    def test_article_has_no_instance_dict(self):
+        article = Article.from_newsapi(raw_article())
+
+        self.assertFalse(hasattr(article, "__dict__"))
+        with self.assertRaises(AttributeError):
+            article.content = "Test Content"
+
+    def test_source_names_are_interned(self):
+        first = Article.from_newsapi(raw_article(source_name="".join(["Test ", "Source"])))
+        second = Article.from_newsapi(raw_article(source_name="".join(["Test ", "Source"])))
+
+        self.assertIs(first.source_name, second.source_name)
+
+    def test_publication_time_is_parsed_once(self):
+        article = Article.from_newsapi(raw_article(published_at="2024-01-01T12:30:00+02:00"))
+
+        self.assertEqual(article.published, datetime(2024, 1, 1, 10, 30, tzinfo=timezone.utc))
+        self.assertEqual(article.published_at, "2024-01-01T12:30:00+02:00")
+        self.assertEqual(published_time(article), article.published)
+
+    def test_malformed_publication_time_is_kept_as_given(self):
+        article = Article.from_newsapi(raw_article(published_at="yesterday"))
+
+        self.assertEqual(article["published_at"], "yesterday")
+        self.assertIsNone(published_time(article))
+
+    def test_published_time_of_plain_dicts(self):
+        self.assertEqual(published_time(ARTICLE_DICT), datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc))
+        self.assertIsNone(published_time({"published_at": None}))
+        self.assertEqual(parse_timestamp("2024-01-01T12:30:00"), datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc))
+
+
+class TestSerialization(unittest.TestCase):
+
+    def test_articles_are_serialized_as_the_formatted_dicts(self):
+        articles = [Article.from_newsapi(raw_article()), Article.from_newsapi(raw_article(published_at="yesterday"))]
+
+        encoded = dumps({"articles": articles, "total": 2})
+
+        self.assertEqual(json.loads(encoded), {"articles": [ARTICLE_DICT, {**ARTICLE_DICT, "published_at": "yesterday"}],
+                                               "total": 2})
+        self.assertNotIn("\n", encoded)
+
+    def test_round_trip_and_fallbacks(self):
+        value = {"articles": [Article.from_newsapi(raw_article())], 1: {"nested": object}}
+
+        decoded = loads(dumps(value))
+
+        self.assertEqual(decoded["articles"], [ARTICLE_DICT])
+        self.assertEqual(decoded["1"], {"nested": str(object)})
+
+    def test_cache_size_of_articles_matches_their_dicts(self):
+        records = {"articles": [Article.from_newsapi(raw_article())]}
+
+        self.assertEqual(TTLCache._estimate_size(records), TTLCache._estimate_size({"articles": [ARTICLE_DICT]}))
+
+if __name__ == '__main__':
+    unittest.main()
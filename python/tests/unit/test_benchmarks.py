@@ -0,0 +1,107 @@
+import json
+import unittest
+
+from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+from starlette.testclient import TestClient
+
+from benchmarks.run import percentile
+from benchmarks.startup import parse_importtime
+from benchmarks.stub_servers import UpstreamProfile, create_newsapi_app, create_openai_app
+
+NO_LATENCY = UpstreamProfile(latency=0)
+# Field names of the extraction and sentiment prompts; src.services.llm needs an OpenAI key to import
+EXTRACT_FIELDS = ("people", "organizations", "locations", "key_quotes")
+SENTIMENT_FIELDS = ("overall_sentiment", "sentiment_confidence", "key_entities", "key_takeaway_summary")
+
+
+class TestStubServers(unittest.TestCase):
+
+    def test_newsapi_stub_returns_requested_page_size(self):
+        client = TestClient(create_newsapi_app(NO_LATENCY))
+
+        payload = client.get("/v2/everything", params={"q": "markets", "pageSize": 7}).json()
+
+        self.assertEqual(payload["status"], "ok")
+        self.assertEqual(len(payload["articles"]), 7)
+        self.assertEqual(len({article["url"] for article in payload["articles"]}), 7)
+
+    def test_newsapi_stub_serves_pages_up_to_its_result_count(self):
+        client = TestClient(create_newsapi_app(NO_LATENCY))
+
+        last_page = client.get("/v2/everything", params={"q": "markets", "pageSize": 300, "page": 4}).json()
+
+        self.assertEqual(last_page["totalResults"], 1000)
+        self.assertEqual(len(last_page["articles"]), 100)
+
+    def test_newsapi_stub_injects_errors(self):
+        client = TestClient(create_newsapi_app(UpstreamProfile(latency=0, error_rate=1.0)))
+
+        response = client.get("/v2/everything", params={"q": "markets"})
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()["status"], "error")
+
+    def test_openai_stub_answers_the_requested_schema(self):
+        client = TestClient(create_openai_app(NO_LATENCY))
+        for fields in (EXTRACT_FIELDS, SENTIMENT_FIELDS):
+            parser = StructuredOutputParser.from_response_schemas(
+                [ResponseSchema(name=field, description=field) for field in fields]
+            )
+
+            response = client.post("/v1/chat/completions", json={
+                "model": "gpt-4o-mini",
+                "messages": [{"role": "user", "content": parser.get_format_instructions()}],
+            }).json()
+
+            parsed = parser.parse(response["choices"][0]["message"]["content"])
+            self.assertEqual(set(parsed), set(fields))
+            self.assertGreater(response["usage"]["total_tokens"], 0)
+
+    def test_openai_stub_streams_chunks_and_usage(self):
+        client = TestClient(create_openai_app(NO_LATENCY, stream_chunk_delay=0))
+
+        response = client.post("/v1/chat/completions", json={
+            "model": "gpt-4o-mini",
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            "messages": [{"role": "user", "content": "overall_sentiment"}],
+        })
+
+        events = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+        self.assertEqual(events[-1], "[DONE]")
+        chunks = [json.loads(event) for event in events[:-1]]
+        content = "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks if chunk["choices"])
+        self.assertIn("overall_sentiment", content)
+        self.assertIn("usage", chunks[-1])
+
+
+class TestPercentile(unittest.TestCase):
+
+    def test_nearest_rank(self):
+        values = [float(value) for value in range(1, 101)]
+
+        self.assertEqual(percentile(values, 0.50), 50.0)
+        self.assertEqual(percentile(values, 0.99), 99.0)
+        self.assertEqual(percentile([], 0.95), 0.0)
+
+
+class TestImportTimeParsing(unittest.TestCase):
+
+    def test_parses_self_and_cumulative_times_with_nesting(self):
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     src.services",
+            "import time:      2618 |       2738 |   src.config",
+            "import time:     13003 |     842825 | src.main",
+            "INFO:src.config:Config initialized.",
+        ])
+
+        timings = parse_importtime(output)
+
+        self.assertEqual([timing.module for timing in timings], ["src.services", "src.config", "src.main"])
+        self.assertEqual(timings[-1].cumulative_us, 842825)
+        self.assertEqual([timing.depth for timing in timings], [2, 1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
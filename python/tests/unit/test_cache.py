@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import patch
+
+from src.services.cache import TTLCache, CacheState
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = TTLCache(name="test", max_bytes=1000, ttl=10, stale_while_revalidate=5, stale_if_error=60)
+
+    @patch('src.services.cache.time.monotonic')
+    def test_entry_states_follow_its_age(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        self.cache.set("key", {"articles": []})
+
+        mock_monotonic.return_value = 105.0
+        self.assertEqual(self.cache.get("key").state, CacheState.FRESH)
+
+        mock_monotonic.return_value = 112.0
+        self.assertEqual(self.cache.get("key").state, CacheState.STALE)
+
+        mock_monotonic.return_value = 130.0
+        lookup = self.cache.get("key")
+        self.assertEqual(lookup.state, CacheState.EXPIRED)
+        self.assertEqual(lookup.value, {"articles": []})
+
+        mock_monotonic.return_value = 200.0
+        self.assertEqual(self.cache.get("key").state, CacheState.MISS)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_lru_eviction_by_size(self):
+        cache = TTLCache(name="test", max_bytes=30, ttl=10)
+        cache.set("a", "x" * 10)
+        cache.set("b", "y" * 10)
+        cache.get("a")
+        cache.set("c", "z" * 10)
+
+        self.assertEqual(cache.get("a").state, CacheState.FRESH)
+        self.assertEqual(cache.get("b").state, CacheState.MISS)
+        self.assertEqual(cache.get("c").state, CacheState.FRESH)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.stats()["bytes"], 30)
+
+    def test_oversized_value_is_not_cached(self):
+        cache = TTLCache(name="test", max_bytes=10, ttl=10)
+        cache.set("big", "x" * 100)
+
+        self.assertEqual(cache.get("big").state, CacheState.MISS)
+
+    def test_hit_and_miss_counters(self):
+        self.cache.get("missing")
+        self.cache.set("key", "value")
+        self.cache.get("key")
+        self.cache.get("key")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_peek_leaves_counters_and_recency_alone(self):
+        cache = TTLCache(name="test", max_bytes=30, ttl=10)
+        cache.set("a", "x" * 10)
+        cache.set("b", "y" * 10)
+
+        self.assertEqual(cache.peek("a").value, "x" * 10)
+        self.assertEqual(cache.peek("missing").state, CacheState.MISS)
+        cache.set("c", "z" * 10)
+
+        self.assertEqual(cache.peek("a").state, CacheState.MISS)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (0, 0))
+
+    def test_only_one_refresh_per_key(self):
+        self.assertTrue(self.cache.try_begin_refresh("key"))
+        self.assertFalse(self.cache.try_begin_refresh("key"))
+        self.cache.end_refresh("key")
+        self.assertTrue(self.cache.try_begin_refresh("key"))
+
+
+if __name__ == '__main__':
+    unittest.main()
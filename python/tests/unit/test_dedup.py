@@ -0,0 +1,59 @@
+import unittest
+
+from src.services.dedup import collapse_near_duplicates, minhash_signature
+
+
+def _article(title, description, source_name, url):
+    return {"title": title, "description": description, "source_name": source_name, "url": url}
+
+
+WIRE_DESCRIPTION = ("The central bank raised interest rates by a quarter point on Wednesday, "
+                    "citing persistent inflation and a strong labor market across the region.")
+
+
+class TestNearDuplicateCollapsing(unittest.TestCase):
+
+    def test_signatures_are_deterministic(self):
+        article = _article("Rates rise", WIRE_DESCRIPTION, "Wire", "https://a")
+
+        self.assertTrue((minhash_signature(article) == minhash_signature(dict(article))).all())
+
+    def test_syndicated_copies_collapse_to_the_first_article(self):
+        articles = [
+            _article("Central bank raises rates", WIRE_DESCRIPTION, "Wire", "https://a"),
+            _article("Central bank raises rates", WIRE_DESCRIPTION + " Markets fell.", "Daily", "https://b"),
+            _article("Local team wins the cup", "Fans celebrated late into the night downtown.", "Sports", "https://c"),
+            _article("Central bank raises rates", WIRE_DESCRIPTION, "Wire", "https://d"),
+        ]
+        representatives, report = collapse_near_duplicates(articles, 0.6)
+
+        self.assertEqual([article["url"] for article in representatives], ["https://a", "https://c"])
+        self.assertEqual(representatives[0]["source_count"], 3)
+        self.assertEqual(representatives[0]["sources"], ["Wire", "Daily"])
+        self.assertNotIn("source_count", representatives[1])
+        self.assertEqual(report["fetched_article_count"], 4)
+        self.assertEqual(report["unique_article_count"], 2)
+        self.assertEqual(report["collapsed_article_count"], 2)
+        self.assertEqual(report["duplicate_clusters"][0]["source_count"], 3)
+
+    def test_distinct_articles_are_kept(self):
+        articles = [
+            _article("Rates rise", WIRE_DESCRIPTION, "Wire", "https://a"),
+            _article("Storm hits coast", "Thousands lost power as the storm made landfall overnight.", "News", "https://b"),
+            _article(None, None, "Empty", "https://c"),
+            _article(None, None, "Empty", "https://d"),
+        ]
+        representatives, report = collapse_near_duplicates(articles, 0.6)
+
+        self.assertEqual(len(representatives), 4)
+        self.assertEqual(report["duplicate_clusters"], [])
+
+    def test_threshold_above_one_disables_collapsing(self):
+        article = _article("Rates rise", WIRE_DESCRIPTION, "Wire", "https://a")
+        representatives, _ = collapse_near_duplicates([article, dict(article)], 1.1)
+
+        self.assertEqual(len(representatives), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
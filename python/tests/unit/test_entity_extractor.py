@@ -0,0 +1,71 @@
+import unittest
+
+from src.services.entity_extractor import AhoCorasickAutomaton, LocalEntityExtractor, merge_extractions
+
+
+class TestAhoCorasickAutomaton(unittest.TestCase):
+
+    def test_finds_overlapping_patterns_in_one_pass(self):
+        automaton = AhoCorasickAutomaton({"he": 1, "she": 2, "his": 3, "hers": 4})
+        matches = automaton.find_all("ushers")
+
+        self.assertEqual(sorted(matches), [(1, 4, 2), (2, 4, 1), (2, 6, 4)])
+
+
+class TestLocalEntityExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = LocalEntityExtractor({
+            "people": [{"name": "Joe Biden", "aliases": ["President Biden"]}],
+            "organizations": ["New York Times", "WHO", "Apple"],
+            "locations": ["New York", "Paris"],
+        })
+
+    def test_aliases_resolve_to_canonical_names(self):
+        result = self.extractor.extract("President Biden visits Paris", "Joe Biden met officials.")
+
+        self.assertEqual(result["people"], ["Joe Biden"])
+        self.assertEqual(result["locations"], ["Paris"])
+
+    def test_longest_match_wins_and_words_must_be_whole(self):
+        result = self.extractor.extract("The New York Times reports", "Pineapple prices rise in paris")
+
+        self.assertEqual(result["organizations"], ["New York Times"])
+        self.assertEqual(result["locations"], ["Paris"])
+
+    def test_all_caps_acronyms_are_case_sensitive(self):
+        result = self.extractor.extract("WHO warns of outbreak", "Officials who spoke declined to comment")
+
+        self.assertEqual(result["organizations"], ["WHO"])
+
+    def test_quotes_are_detected(self):
+        result = self.extractor.extract("Deal signed", "CEO said 'This collaboration marks a new era' today.")
+
+        self.assertEqual(result["key_quotes"], ["This collaboration marks a new era"])
+
+    def test_key_entities_are_ranked_by_articles_mentioning_them(self):
+        entities = self.extractor.key_entities([
+            {"title": "Paris talks", "description": "Joe Biden meets Apple executives"},
+            {"title": "Apple in New York", "description": None},
+            {"title": "Apple earnings", "description": "Shares rise in New York"},
+        ])
+
+        self.assertEqual(entities, {
+            "people": ["Joe Biden"],
+            "organizations": ["Apple"],
+            "locations": ["New York", "Paris"],
+        })
+
+    def test_merge_keeps_primary_order_and_drops_duplicates(self):
+        merged = merge_extractions(
+            {"people": ["Jane Doe"], "organizations": ["apple"], "locations": [], "key_quotes": []},
+            {"people": ["Joe Biden"], "organizations": ["Apple"], "locations": ["Paris"], "key_quotes": []},
+        )
+
+        self.assertEqual(merged["people"], ["Jane Doe", "Joe Biden"])
+        self.assertEqual(merged["organizations"], ["apple"])
+        self.assertEqual(merged["locations"], ["Paris"])
+
+
+if __name__ == '__main__':
+    unittest.main()
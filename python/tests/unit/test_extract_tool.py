@@ -1,18 +1,13 @@
 import unittest
-import os
+import json
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
-class TestExtractInformationFromArticle(unittest.TestCase):
+class TestExtractInformationFromArticle(unittest.IsolatedAsyncioTestCase):
     
-    def setUp(self):
-        """Check if API keys are available and skip tests if they aren't."""
-        if not os.environ.get('OPENAI_API_KEY'):
-            self.skipTest("Skipping test as missing API keys")
-    
-    @patch('src.tools.extract_tool.search_news')
+    @patch('src.tools.extract_tool.search_news', new_callable=AsyncMock)
     @patch('src.tools.extract_tool.llm_service')
-    def test_successful_extraction(self, mock_llm_service, mock_search_news):
+    async def test_successful_extraction(self, mock_llm_service, mock_search_news):
         mock_search_news.return_value = {
             "articles": [
                 {
@@ -26,24 +21,25 @@ class TestExtractInformationFromArticle(unittest.TestCase):
         }
         
         # Mock the LLM service to return structured information
-        mock_llm_service.extract_article_information.return_value = {
+        mock_llm_service.aextract_article_information = AsyncMock(return_value={
             "people": ["Jane Doe", "John Smith"],
             "organizations": ["TechCorp Inc.", "Innovate Solutions", "Global Tech Summit"],
             "locations": ["Metropolis"],
             "key_quotes": ["This collaboration marks a new era"]
-        }
+        })
         
         # Call the function with a test query
         from src.tools.extract_tool import extract_information_from_article
-        result = extract_information_from_article("tech summit", "en")
+        result = await extract_information_from_article("tech summit", "en")
         
         # Verify that search_news was called with the correct parameters
-        mock_search_news.assert_called_with("tech summit", "en", 1)
+        mock_search_news.assert_awaited_with("tech summit", "en", 1)
         
         # Verify that the LLM service was called with the article title and description
-        mock_llm_service.extract_article_information.assert_called_with(
+        mock_llm_service.aextract_article_information.assert_awaited_with(
             "Global Tech Summit Announces Partnership",
-            "TechCorp Inc. and Innovate Solutions have announced a partnership at the Global Tech Summit in Metropolis. Jane Doe, CEO of TechCorp, said 'This collaboration marks a new era'."
+            "TechCorp Inc. and Innovate Solutions have announced a partnership at the Global Tech Summit in Metropolis. Jane Doe, CEO of TechCorp, said 'This collaboration marks a new era'.",
+            on_field=None
         )
         
         # Verify the function returned the expected result
@@ -54,46 +50,46 @@ class TestExtractInformationFromArticle(unittest.TestCase):
         self.assertEqual(result["result"]["locations"], ["Metropolis"])
         self.assertEqual(result["result"]["key_quotes"], ["This collaboration marks a new era"])
     
-    def test_empty_query(self):
+    async def test_empty_query(self):
         # Test with an empty query
         from src.tools.extract_tool import extract_information_from_article
-        result = extract_information_from_article("", "en")
+        result = await extract_information_from_article("", "en")
         
         # Verify the error response
         self.assertIn("error", result)
         self.assertEqual(result["error"], "Query parameter is required")
     
-    @patch('src.tools.extract_tool.search_news')
-    def test_no_articles_found(self, mock_search_news):
+    @patch('src.tools.extract_tool.search_news', new_callable=AsyncMock)
+    async def test_no_articles_found(self, mock_search_news):
         # Mock search_news to return no articles
         mock_search_news.return_value = {"articles": []}
         
         # Call the function with a test query
         from src.tools.extract_tool import extract_information_from_article
-        result = extract_information_from_article("nonexistent topic", "en")
+        result = await extract_information_from_article("nonexistent topic", "en")
         
         # Verify the error response
         self.assertIn("error", result)
         self.assertEqual(result["error"], "No articles found")
         self.assertIn("No articles found for query", result["message"])
     
-    @patch('src.tools.extract_tool.search_news')
-    def test_search_error(self, mock_search_news):
+    @patch('src.tools.extract_tool.search_news', new_callable=AsyncMock)
+    async def test_search_error(self, mock_search_news):
         # Mock search_news to return an error
         mock_search_news.return_value = {"error": "API error", "message": "Rate limit exceeded"}
         
         # Call the function with a test query
         from src.tools.extract_tool import extract_information_from_article
-        result = extract_information_from_article("test query", "en")
+        result = await extract_information_from_article("test query", "en")
         
         # Verify that the search error is propagated
         self.assertIn("error", result)
         self.assertEqual(result["error"], "API error")
         self.assertEqual(result["message"], "Rate limit exceeded")
     
-    @patch('src.tools.extract_tool.search_news')
+    @patch('src.tools.extract_tool.search_news', new_callable=AsyncMock)
     @patch('src.tools.extract_tool.llm_service')
-    def test_llm_processing_error(self, mock_llm_service, mock_search_news):
+    async def test_llm_processing_error(self, mock_llm_service, mock_search_news):
         mock_search_news.return_value = {
             "articles": [
                 {
@@ -106,14 +102,187 @@ class TestExtractInformationFromArticle(unittest.TestCase):
             ]
         }
         
-        mock_llm_service.extract_article_information.side_effect = Exception("LLM API Error")
+        mock_llm_service.aextract_article_information = AsyncMock(side_effect=Exception("LLM API Error"))
         
         from src.tools.extract_tool import extract_information_from_article
-        result = extract_information_from_article("test query", "en")
+        result = await extract_information_from_article("test query", "en")
         
         self.assertIn("error", result)
         self.assertEqual(result["error"], "LLM processing error")
         self.assertEqual(result["message"], "LLM API Error")
 
+
+    @patch('src.tools.extract_tool.search_news', new_callable=AsyncMock)
+    @patch('src.tools.extract_tool.llm_service')
+    async def test_fields_are_reported_as_progress(self, mock_llm_service, mock_search_news):
+        mock_search_news.return_value = {"articles": [{"title": "Title", "description": "Description"}]}
+        
+        async def extract(title, description, on_field=None):
+            await on_field("people", ["Jane Doe"])
+            await on_field("organizations", ["TechCorp"])
+            return {"people": ["Jane Doe"], "organizations": ["TechCorp"], "locations": [], "key_quotes": []}
+        
+        mock_llm_service.aextract_article_information = AsyncMock(side_effect=extract)
+        ctx = MagicMock()
+        ctx.report_progress = AsyncMock()
+        
+        from src.tools.extract_tool import extract_information_from_article
+        result = await extract_information_from_article("tech summit", "en", ctx=ctx)
+        
+        self.assertEqual(result["result"]["people"], ["Jane Doe"])
+        self.assertEqual(ctx.report_progress.await_count, 2)
+        progress, total, message = ctx.report_progress.await_args.args
+        self.assertEqual((progress, total), (2, 4))
+        self.assertEqual(json.loads(message), {"field": "organizations", "value": ["TechCorp"]})
+
+
+    @patch('src.tools.extract_tool.search_news', new_callable=AsyncMock)
+    async def test_call_without_progress_token_is_retried(self, mock_search_news):
+        import httpx
+        import openai
+        from src.services.llm import LLMService
+        from src.services.resilience import CircuitBreaker, ResilientCaller, RetryBudget
+        mock_search_news.return_value = {"articles": [{"title": "Title", "description": "Description"}]}
+        response = MagicMock()
+        response.content = '```json\n{"people": [], "organizations": ["Apple"], "locations": [], "key_quotes": []}\n```'
+        service = LLMService()
+        service.result_cache = None
+        service.llm = MagicMock()
+        service.llm.ainvoke = AsyncMock(side_effect=[
+            openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1")), response
+        ])
+        service.resilience = ResilientCaller(
+            "OpenAI", lambda error: isinstance(error, openai.APIConnectionError), max_attempts=3,
+            base_delay=0, max_delay=0, retry_budget=RetryBudget(ratio=1.0, reserve=10),
+            breaker=CircuitBreaker("OpenAI", failure_threshold=100, recovery_timeout=60),
+        )
+        # A client that registered no progress handler sends no progress token
+        ctx = MagicMock()
+        ctx.request_context.meta = None
+        
+        from src.tools.extract_tool import extract_information_from_article
+        with patch('src.tools.extract_tool.llm_service', service):
+            result = await extract_information_from_article("apple", "en", ctx=ctx)
+        
+        self.assertEqual(result["result"]["organizations"], ["Apple"])
+        self.assertEqual(service.llm.ainvoke.await_count, 2)
+        service.llm.astream.assert_not_called()
+        ctx.report_progress.assert_not_called()
+
+    @patch('src.tools.extract_tool.search_news', new_callable=AsyncMock)
+    @patch('src.tools.extract_tool.llm_service')
+    async def test_fast_mode_skips_llm(self, mock_llm_service, mock_search_news):
+        mock_search_news.return_value = {"articles": [{
+            "title": "Tim Cook unveils new iPhone in Cupertino",
+            "description": "Apple Inc. said \"This is our best iPhone ever\" at the event."
+        }]}
+        mock_llm_service.aextract_article_information = AsyncMock()
+        
+        from src.tools.extract_tool import extract_information_from_article
+        result = await extract_information_from_article("iphone", "en", mode="fast")
+        
+        mock_llm_service.aextract_article_information.assert_not_awaited()
+        self.assertEqual(result["result"]["people"], ["Tim Cook"])
+        self.assertEqual(result["result"]["organizations"], ["Apple"])
+        self.assertEqual(result["result"]["locations"], ["Cupertino"])
+        self.assertEqual(result["result"]["key_quotes"], ["This is our best iPhone ever"])
+    
+    @patch('src.tools.extract_tool.search_news', new_callable=AsyncMock)
+    @patch('src.tools.extract_tool.llm_service')
+    async def test_hybrid_mode_merges_local_and_llm_results(self, mock_llm_service, mock_search_news):
+        mock_search_news.return_value = {"articles": [{
+            "title": "Tim Cook meets Jane Doe in Cupertino",
+            "description": "The Apple chief discussed the deal."
+        }]}
+        mock_llm_service.aextract_article_information = AsyncMock(return_value={
+            "people": ["Jane Doe", "tim cook"], "organizations": ["Apple"], "locations": [], "key_quotes": []
+        })
+        
+        from src.tools.extract_tool import extract_information_from_article
+        result = await extract_information_from_article("apple", "en", mode="hybrid")
+        
+        self.assertEqual(result["result"]["people"], ["Jane Doe", "tim cook"])
+        self.assertEqual(result["result"]["organizations"], ["Apple"])
+        self.assertEqual(result["result"]["locations"], ["Cupertino"])
+    
+    async def test_invalid_mode(self):
+        from src.tools.extract_tool import extract_information_from_article
+        result = await extract_information_from_article("test query", "en", mode="turbo")
+        
+        self.assertEqual(result["error"], "Invalid parameter")
+        self.assertEqual(result["message"], "mode must be one of llm, fast, hybrid")
+
+
+class TestExtractInformationFromArticles(unittest.IsolatedAsyncioTestCase):
+    
+    @staticmethod
+    def _articles(count):
+        return {
+            "articles": [
+                {
+                    "title": f"Article {index}",
+                    "description": f"Description {index}",
+                    "url": f"https://example.com/{index}",
+                    "source_name": "Test Source",
+                    "published_at": "2023-01-01T12:00:00Z"
+                }
+                for index in range(count)
+            ]
+        }
+    
+    @patch('src.tools.extract_tool.search_news', new_callable=AsyncMock)
+    @patch('src.tools.extract_tool.llm_service')
+    async def test_batch_extraction_with_partial_failure(self, mock_llm_service, mock_search_news):
+        mock_search_news.return_value = self._articles(3)
+        
+        async def extract(title, description, on_field=None):
+            if title == "Article 1":
+                raise Exception("LLM API Error")
+            return {"people": [title], "organizations": [], "locations": [], "key_quotes": []}
+        
+        mock_llm_service.aextract_article_information = AsyncMock(side_effect=extract)
+        
+        from src.tools.extract_tool import extract_information_from_articles
+        result = await extract_information_from_articles("test query", "en", 3)
+        
+        mock_search_news.assert_awaited_once_with("test query", "en", 3)
+        articles = result["result"]["articles"]
+        self.assertEqual(len(articles), 3)
+        self.assertEqual(articles[0]["people"], ["Article 0"])
+        self.assertEqual(articles[1]["error"], "LLM processing error")
+        self.assertEqual(articles[1]["message"], "LLM API Error")
+        self.assertEqual(articles[2]["url"], "https://example.com/2")
+        self.assertEqual(result["result"]["failed_article_count"], 1)
+    
+    @patch('src.tools.extract_tool.search_news', new_callable=AsyncMock)
+    @patch('src.tools.extract_tool.llm_service')
+    async def test_batch_extraction_respects_concurrency_limit(self, mock_llm_service, mock_search_news):
+        import asyncio
+        
+        mock_search_news.return_value = self._articles(6)
+        running = [0]
+        peak = [0]
+        
+        async def extract(title, description, on_field=None):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.05)
+            running[0] -= 1
+            return {"people": [], "organizations": [], "locations": [], "key_quotes": []}
+        
+        mock_llm_service.aextract_article_information = AsyncMock(side_effect=extract)
+        
+        from src.tools.extract_tool import extract_information_from_articles
+        result = await extract_information_from_articles("test query", "en", 6, max_concurrency=2)
+        
+        self.assertEqual(len(result["result"]["articles"]), 6)
+        self.assertEqual(peak[0], 2)
+    
+    async def test_invalid_max_articles(self):
+        from src.tools.extract_tool import extract_information_from_articles
+        result = await extract_information_from_articles("test query", "en", 0)
+        
+        self.assertEqual(result["error"], "Invalid parameter")
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import patch
+
+from src.services.llm_cache import LLMResultCache
+
+
+class TestLLMResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LLMResultCache(":memory:", max_bytes=1024)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_round_trip(self):
+        key = LLMResultCache.make_key("gpt-4o-mini", "0", "1", "prompt")
+        self.cache.set(key, {"people": ["Jane Doe"]})
+
+        self.assertEqual(self.cache.get(key), {"people": ["Jane Doe"]})
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_key_changes_with_model_temperature_and_prompt_version(self):
+        base = LLMResultCache.make_key("gpt-4o-mini", "0", "1", "prompt")
+
+        self.assertNotEqual(base, LLMResultCache.make_key("gpt-4o", "0", "1", "prompt"))
+        self.assertNotEqual(base, LLMResultCache.make_key("gpt-4o-mini", "0.7", "1", "prompt"))
+        self.assertNotEqual(base, LLMResultCache.make_key("gpt-4o-mini", "0", "2", "prompt"))
+        self.assertNotEqual(base, LLMResultCache.make_key("gpt-4o-mini", "0", "1", "other prompt"))
+
+    @patch('src.services.llm_cache.time.time')
+    def test_least_recently_used_entries_are_evicted(self, mock_time):
+        mock_time.side_effect = [float(tick) for tick in range(10)]
+        value = {"summary": "x" * 300}
+        self.cache.set("a", value)
+        self.cache.set("b", value)
+        self.cache.get("a")
+        self.cache.set("c", value)
+        self.cache.set("d", value)
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertLessEqual(self.cache.stats()["bytes"], 1024)
+        self.assertGreaterEqual(self.cache.stats()["evictions"], 1)
+
+    def test_results_persist_across_instances(self):
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "llm_cache.db")
+            first = LLMResultCache(path, max_bytes=1024)
+            first.set("key", {"overall_sentiment": "positive"})
+            first.close()
+
+            second = LLMResultCache(path, max_bytes=1024)
+            self.assertEqual(second.get("key"), {"overall_sentiment": "positive"})
+            second.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
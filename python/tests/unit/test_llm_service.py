@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 import unittest
@@ -7,8 +8,8 @@ import pytest
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-class TestLLMService(unittest.TestCase):
-    """Tests for the LLMService class in llm.py."""
+class TestLLMServiceReal(unittest.TestCase):
+    """Tests for the LLMService class in llm.py that call the OpenAI API."""
     def setUp(self):
         from src.config import config
         if not config.OPENAI_API_KEY:
@@ -24,7 +25,7 @@ class TestLLMService(unittest.TestCase):
                            "CEO Tim Cook announced the new device at an event in Cupertino, California. " \
                            "The new model includes improved camera technology and enhanced battery life."
         
-        result = self.llm_service.extract_article_information(test_title, test_description)
+        result = asyncio.run(self.llm_service.aextract_article_information(test_title, test_description))
         
         self.assertIn("people", result)
         self.assertIn("organizations", result)
@@ -54,7 +55,7 @@ class TestLLMService(unittest.TestCase):
             }
         ]
         
-        result = self.llm_service.analyze_sentiment(test_query, test_articles)
+        result = asyncio.run(self.llm_service.aanalyze_sentiment(test_query, test_articles))
         
         # Check structure without asserting exact content
         self.assertIn("overall_sentiment", result)
@@ -73,18 +74,198 @@ class TestLLMService(unittest.TestCase):
         self.assertIn("organizations", result["key_entities"])
         self.assertIn("locations", result["key_entities"])
 
-    # Include mock tests for when API is unavailable
+
+
+class TestLLMService(unittest.TestCase):
+    """Tests for the LLMService class in llm.py with the model mocked; no API key is needed."""
+    def setUp(self):
+        from src.services.llm import LLMService
+        self.llm_service = LLMService()
+
     @patch('src.services.llm.config')
     def test_missing_api_key(self, mock_config):
         mock_config.OPENAI_API_KEY = None
         
+        from src.services.llm import LLMService
+        # The model is created lazily, so the missing key surfaces on first use
+        service = LLMService()
         with self.assertRaises(ValueError) as context:
-            from src.services.llm import LLMService
-            LLMService()
+            service.llm
         
         self.assertIn("No OpenAI API key provided", str(context.exception))
 
-    @pytest.mark.skip_if_no_openai
+    def test_identical_concurrent_prompts_share_one_llm_call(self):
+        from unittest.mock import MagicMock
+        
+        response = MagicMock()
+        response.content = '```json\n{"people": ["Tim Cook"], "organizations": ["Apple"], "locations": [], "key_quotes": []}\n```'
+        
+        async def slow_ainvoke(prompt):
+            await asyncio.sleep(0.1)
+            return response
+        
+        async def extract_concurrently():
+            return await asyncio.gather(*[
+                self.llm_service.aextract_article_information("Title", "Description") for _ in range(4)
+            ])
+        
+        self.llm_service.llm = MagicMock()
+        self.llm_service.llm.ainvoke = MagicMock(side_effect=slow_ainvoke)
+        results = asyncio.run(extract_concurrently())
+        
+        self.llm_service.llm.ainvoke.assert_called_once()
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(result["people"] == ["Tim Cook"] for result in results))
+
+    def test_repeated_prompt_is_served_from_result_cache(self):
+        from unittest.mock import MagicMock, AsyncMock
+        from src.services.llm_cache import LLMResultCache
+        
+        response = MagicMock()
+        response.content = '```json\n{"people": [], "organizations": ["Apple"], "locations": [], "key_quotes": []}\n```'
+        self.llm_service.llm = MagicMock()
+        self.llm_service.llm.ainvoke = AsyncMock(return_value=response)
+        self.llm_service.result_cache = LLMResultCache(":memory:", max_bytes=1024 * 1024)
+        
+        first = asyncio.run(self.llm_service.aextract_article_information("Title", "Description"))
+        second = asyncio.run(self.llm_service.aextract_article_information("Title", "Description"))
+        asyncio.run(self.llm_service.aextract_article_information("Other title", "Description"))
+        
+        self.assertEqual(first, second)
+        self.assertEqual(self.llm_service.llm.ainvoke.await_count, 2)
+        self.assertEqual(self.llm_service.result_cache.stats()["hits"], 1)
+
+    def test_async_extraction_uses_ainvoke(self):
+        import asyncio
+        from unittest.mock import MagicMock, AsyncMock
+        
+        response = MagicMock()
+        response.content = '```json\n{"people": ["Tim Cook"], "organizations": ["Apple"], "locations": [], "key_quotes": []}\n```'
+        self.llm_service.llm = MagicMock()
+        self.llm_service.llm.ainvoke = AsyncMock(return_value=response)
+        
+        result = asyncio.run(self.llm_service.aextract_article_information("Title", "Description"))
+        
+        self.llm_service.llm.ainvoke.assert_awaited_once()
+        self.llm_service.llm.invoke.assert_not_called()
+        self.assertEqual(result["organizations"], ["Apple"])
+
+    def test_async_sentiment_parse_error_is_reported(self):
+        import asyncio
+        from unittest.mock import MagicMock, AsyncMock
+        
+        response = MagicMock()
+        response.content = "not json"
+        self.llm_service.llm = MagicMock()
+        self.llm_service.llm.ainvoke = AsyncMock(return_value=response)
+        
+        with self.assertRaises(ValueError) as context:
+            asyncio.run(self.llm_service.aanalyze_sentiment("query", [{"title": "Title", "description": "Description"}]))
+        
+        self.assertIn("Failed to parse sentiment analysis response", str(context.exception))
+
+    def test_large_sentiment_analysis_is_map_reduced(self):
+        import asyncio
+        from unittest.mock import MagicMock, AsyncMock
+        
+        chunk_response = MagicMock()
+        chunk_response.content = (
+            '```json\n{"overall_sentiment": "positive", "sentiment_confidence": "high", '
+            '"key_entities": {"people": [], "organizations": ["Apple"], "locations": []}, '
+            '"key_takeaway_summary": "Chunk summary"}\n```'
+        )
+        merge_response = MagicMock()
+        merge_response.content = '```json\n{"key_takeaway_summary": "Merged summary"}\n```'
+        
+        async def ainvoke(prompt):
+            return merge_response if "Summary 1:" in prompt else chunk_response
+        
+        self.llm_service.llm = MagicMock()
+        self.llm_service.llm.ainvoke = AsyncMock(side_effect=ainvoke)
+        articles = [{"title": f"Title {i}", "description": "Description"} for i in range(25)]
+        
+        with patch('src.services.llm.config.SENTIMENT_CHUNK_SIZE', 10):
+            result = asyncio.run(self.llm_service.aanalyze_sentiment("query", articles))
+        
+        self.assertEqual(self.llm_service.llm.ainvoke.await_count, 4)
+        self.assertEqual(result["chunk_count"], 3)
+        self.assertEqual(result["overall_sentiment"], "positive")
+        self.assertEqual(result["key_entities"]["organizations"], ["Apple"])
+        self.assertEqual(result["key_takeaway_summary"], "Merged summary")
+
+    def test_streamed_fields_are_reported_before_completion(self):
+        import asyncio
+        from unittest.mock import MagicMock
+        
+        content = '```json\n{"people": ["Tim Cook"], "organizations": ["Apple"], "locations": [], "key_quotes": []}\n```'
+        reported = []
+        
+        async def astream(prompt):
+            for start in range(0, len(content), 5):
+                chunk = MagicMock()
+                chunk.content = content[start:start + 5]
+                reported.append(("chunk", start))
+                yield chunk
+        
+        async def on_field(name, value):
+            reported.append((name, value))
+        
+        self.llm_service.llm = MagicMock()
+        self.llm_service.llm.astream = astream
+        result = asyncio.run(self.llm_service.aextract_article_information("Title", "Description", on_field=on_field))
+        
+        fields = [entry for entry in reported if entry[0] != "chunk"]
+        self.assertEqual([name for name, _ in fields], ["people", "organizations", "locations", "key_quotes"])
+        self.assertEqual(fields[0], ("people", ["Tim Cook"]))
+        self.assertIn("chunk", [name for name, _ in reported[reported.index(fields[0]):]])
+        self.assertEqual(result["organizations"], ["Apple"])
+        self.llm_service.llm.ainvoke.assert_not_called()
+
+    def test_stream_is_retried_until_a_field_was_reported(self):
+        import openai
+        import httpx
+        from unittest.mock import MagicMock
+        from src.services.resilience import CircuitBreaker, ResilientCaller, RetryBudget
+        
+        content = '```json\n{"people": ["Tim Cook"], "organizations": ["Apple"], "locations": [], "key_quotes": []}\n```'
+        connection_error = openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1"))
+        
+        def streaming(fail_after):
+            streams = []
+            
+            async def astream(prompt):
+                streams.append(prompt)
+                sent = 0
+                for start in range(0, len(content), 5):
+                    if len(streams) == 1 and sent >= fail_after:
+                        raise connection_error
+                    chunk = MagicMock()
+                    chunk.content = content[start:start + 5]
+                    sent += len(chunk.content)
+                    yield chunk
+            return astream, streams
+        
+        async def on_field(name, value):
+            pass
+        
+        self.llm_service.resilience = ResilientCaller(
+            "OpenAI", lambda error: isinstance(error, openai.APIConnectionError), max_attempts=3,
+            base_delay=0, max_delay=0, retry_budget=RetryBudget(ratio=1.0, reserve=10),
+            breaker=CircuitBreaker("OpenAI", failure_threshold=100, recovery_timeout=60),
+        )
+        self.llm_service.llm = MagicMock()
+        
+        self.llm_service.llm.astream, streams = streaming(fail_after=0)
+        result = asyncio.run(self.llm_service.aextract_article_information("Title", "Description", on_field=on_field))
+        self.assertEqual(len(streams), 2)
+        self.assertEqual(result["organizations"], ["Apple"])
+        
+        # Once "people" has been reported the stream can no longer be repeated
+        self.llm_service.llm.astream, streams = streaming(fail_after=content.index('"organizations"'))
+        with self.assertRaises(openai.APIConnectionError):
+            asyncio.run(self.llm_service.aextract_article_information("Other", "Description", on_field=on_field))
+        self.assertEqual(len(streams), 1)
+
     def test_schema_definitions(self):
         from src.services.llm import EXTRACT_INFO_SCHEMAS, SENTIMENT_ANALYSIS_SCHEMAS
         
@@ -103,5 +284,82 @@ class TestLLMService(unittest.TestCase):
         self.assertIn("key_takeaway_summary", schema_names)
 
 
+class TestLazyInitialization(unittest.TestCase):
+    """The LLM client libraries load on first use, not when the server imports the module."""
+
+    def test_import_does_not_load_llm_client_libraries(self):
+        import subprocess
+        
+        env = {**os.environ, "OPENAI_API_KEY": "sk-test", "LLM_CACHE_PATH": ""}
+        code = ("import sys; import src.services.llm; "
+                "print(sorted({name.split('.')[0] for name in sys.modules} & {'langchain', 'langchain_openai', 'openai', 'tiktoken'}))")
+        python_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+        completed = subprocess.run([sys.executable, "-c", code], cwd=python_dir, env=env,
+                                   capture_output=True, text=True, check=True)
+        
+        self.assertEqual(completed.stdout.strip(), "[]")
+
+    def test_compiled_prompts_match_prompt_templates(self):
+        from langchain.prompts import PromptTemplate
+        from src.services.llm import LLMService, EXTRACT_PROMPT_TEMPLATE, SUMMARY_MERGE_PROMPT_TEMPLATE
+        
+        service = LLMService()
+        expected = PromptTemplate(
+            template=EXTRACT_PROMPT_TEMPLATE,
+            input_variables=["title", "description"],
+            partial_variables={"format_instructions": service.extract_parser.get_format_instructions()},
+        ).format(title="Title with {braces}", description="Description")
+        self.assertEqual(service._build_extract_prompt("Title with {braces}", "Description"), expected)
+        
+        expected = PromptTemplate(
+            template=SUMMARY_MERGE_PROMPT_TEMPLATE,
+            input_variables=["query", "summaries"],
+            partial_variables={"format_instructions": service.summary_parser.get_format_instructions()},
+        ).format(query="markets", summaries="Summary 1:\nfirst\n\nSummary 2:\nsecond")
+        self.assertEqual(service._build_summary_merge_prompt("markets", ["first", "second"]), expected)
+
+    def test_warm_up_builds_the_model_once(self):
+        from src.services.llm import LLMService
+        
+        service = LLMService()
+        with patch.object(LLMService, "_initialize_llm", return_value=object()) as initialize:
+            service.warm_up()
+            service.warm_up()
+        
+        initialize.assert_called_once()
+        self.assertIn("_sentiment_template", service.__dict__)
+
+    def test_cold_sentiment_call_loads_the_tokenizer_off_the_event_loop(self):
+        import threading
+        from unittest.mock import MagicMock, AsyncMock
+        from src.services.llm import LLMService
+        
+        loading_threads = []
+        response = MagicMock()
+        response.content = ('```json\n{"overall_sentiment": "neutral", "sentiment_confidence": "low", '
+                            '"key_entities": {"people": [], "organizations": [], "locations": []}, '
+                            '"key_takeaway_summary": "Summary"}\n```')
+        service = LLMService()
+        service.result_cache = None
+        service.llm = MagicMock()
+        service.llm.ainvoke = AsyncMock(return_value=response)
+        
+        with patch('src.services.llm.load_tokenizer', side_effect=lambda model: loading_threads.append(threading.current_thread())):
+            asyncio.run(service.aanalyze_sentiment("query", [{"title": "Title", "description": "Description"}]))
+        
+        self.assertEqual(len(loading_threads), 1)
+        self.assertIsNot(loading_threads[0], threading.main_thread())
+
+    @patch('src.services.llm.config')
+    def test_warm_up_without_api_key_does_not_raise(self, mock_config):
+        from src.services.llm import LLMService
+        mock_config.OPENAI_API_KEY = None
+        
+        service = LLMService()
+        service.warm_up()
+        
+        self.assertIsNone(service._llm)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
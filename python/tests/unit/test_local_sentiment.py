@@ -0,0 +1,83 @@
+import unittest
+
+from src.config import Config
+from src.services.local_sentiment import (
+    DEFAULT_LEXICON, EscalationCounter, LocalSentimentScorer, NEUTRAL_MAX_CONFIDENCE
+)
+
+
+class TestLocalSentimentScorer(unittest.TestCase):
+
+    def setUp(self):
+        self.scorer = LocalSentimentScorer(DEFAULT_LEXICON)
+
+    def test_clearly_positive_articles_are_confident(self):
+        result = self.scorer.analyze([
+            {"title": "Shares soar on record profits", "description": "Strong growth lifts the outlook"},
+            {"title": "Breakthrough praised by analysts", "description": "A robust recovery"},
+        ])
+
+        self.assertEqual(result["overall_sentiment"], "positive")
+        self.assertGreaterEqual(result["confidence"], 0.8)
+        self.assertEqual(result["sentiment_confidence"], "high")
+        self.assertIn("Shares soar on record profits", result["key_takeaway_summary"])
+
+    def test_negation_flips_polarity(self):
+        result = self.scorer.analyze([{"title": "Talks did not fail", "description": "No crisis, never a collapse"}])
+
+        self.assertEqual(result["overall_sentiment"], "positive")
+
+    def test_disagreeing_articles_lower_confidence(self):
+        agreeing = self.scorer.analyze([
+            {"title": "Stocks plunge", "description": "Fears of recession"},
+            {"title": "Markets crash", "description": "Layoffs and losses"},
+        ])
+        mixed = self.scorer.analyze([
+            {"title": "Stocks plunge", "description": "Fears of recession"},
+            {"title": "Markets crash", "description": "Layoffs and losses"},
+            {"title": "Retailer soars", "description": "Record profits"},
+        ])
+
+        self.assertEqual(agreeing["overall_sentiment"], "negative")
+        self.assertLess(mixed["confidence"], agreeing["confidence"])
+
+    def test_few_lexicon_hits_escalate(self):
+        result = self.scorer.analyze([{"title": "Company reports gains", "description": "Quarterly update"}])
+
+        self.assertEqual(result["overall_sentiment"], "positive")
+        self.assertLess(result["confidence"], Config().LOCAL_SENTIMENT_CONFIDENCE_THRESHOLD)
+
+    def test_mixed_news_leaning_one_way_escalates(self):
+        result = self.scorer.analyze([
+            {"title": "Shares rally on strong profits", "description": "Record growth"},
+            {"title": "Regulators warn of fraud", "description": "Losses feared"},
+            {"title": "Retailer soars", "description": "Optimism returns"},
+        ])
+
+        self.assertEqual(result["overall_sentiment"], "positive")
+        self.assertLess(result["confidence"], Config().LOCAL_SENTIMENT_CONFIDENCE_THRESHOLD)
+
+    def test_articles_without_signal_are_neutral_with_low_confidence(self):
+        result = self.scorer.analyze([{"title": "Council meets on Tuesday", "description": None}])
+
+        self.assertEqual(result["overall_sentiment"], "neutral")
+        self.assertEqual(result["confidence"], 0.0)
+        self.assertLessEqual(result["confidence"], NEUTRAL_MAX_CONFIDENCE)
+
+
+class TestEscalationCounter(unittest.TestCase):
+
+    def test_escalation_rate(self):
+        counter = EscalationCounter()
+        self.assertEqual(counter.stats()["escalation_rate"], 0.0)
+
+        counter.record(escalated=False)
+        counter.record(escalated=False)
+        counter.record(escalated=True)
+        counter.record(escalated=False)
+
+        self.assertEqual(counter.stats(), {"local_answers": 3, "escalations": 1, "escalation_rate": 0.25})
+
+
+if __name__ == '__main__':
+    unittest.main()
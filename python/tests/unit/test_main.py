@@ -1,7 +1,7 @@
 import pytest
 import sys
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -16,6 +16,7 @@ class TestMainModule:
         # Create the mock modules
         self.mock_search_news = MagicMock()
         self.mock_extract_tool = MagicMock()
+        self.mock_batch_extract_tool = MagicMock()
         self.mock_sentiment_tool = MagicMock()
         self.mock_config = MagicMock()
         self.mock_config.PORT = 3000
@@ -30,26 +31,29 @@ class TestMainModule:
         mock_modules = {
             'config': self.mock_config,
             'tools.search_news': MagicMock(search_news=self.mock_search_news),
-            'tools.extract_tool': MagicMock(extract_information_from_article=self.mock_extract_tool),
+            'tools.extract_tool': MagicMock(extract_information_from_article=self.mock_extract_tool,
+                                           extract_information_from_articles=self.mock_batch_extract_tool),
             'tools.sentiment_tool': MagicMock(extract_key_info_and_sentiment=self.mock_sentiment_tool)
         }
         
         with patch.dict('sys.modules', mock_modules):
             with patch('src.main.search_news', self.mock_search_news):
                 with patch('src.main.extract_information_from_article', self.mock_extract_tool):
-                    with patch('src.main.extract_key_info_and_sentiment', self.mock_sentiment_tool):
-                        from src import main
-                        
-                        mock_fast_mcp.assert_called_once_with("news_assistant_mcp")
-                        
-                        assert mock_mcp.tool.call_count == 3
-                        mock_mcp.run.assert_not_called()
+                    with patch('src.main.extract_information_from_articles', self.mock_batch_extract_tool):
+                        with patch('src.main.extract_key_info_and_sentiment', self.mock_sentiment_tool):
+                            from src import main
+                            
+                            mock_fast_mcp.assert_called_once_with("news_assistant_mcp", tool_serializer=main.dumps)
+                            
+                            assert mock_mcp.tool.call_count == 5
+                            mock_mcp.run.assert_not_called()
     
     @pytest.mark.skip_if_no_openai
     @patch('fastmcp.FastMCP')
     def test_mcp_run(self, mock_fast_mcp):
         """Test that the MCP server runs with the correct parameters when executed as script."""
         mock_mcp = MagicMock()
+        mock_mcp.run_async = AsyncMock()
         mock_fast_mcp.return_value = mock_mcp
         
         # Fix path to main.py - use more specific path construction
@@ -73,6 +77,7 @@ class TestMainModule:
             'config': self.mock_config,
             'search_news': self.mock_search_news,
             'extract_information_from_article': self.mock_extract_tool,
+            'extract_information_from_articles': self.mock_batch_extract_tool,
             'extract_key_info_and_sentiment': self.mock_sentiment_tool
         }
         
@@ -81,7 +86,8 @@ class TestMainModule:
             
         exec(main_code, module_globals)
         
-        mock_mcp.run.assert_called_once_with(
+        # Served with run_async so the prefetch scheduler shares the server's event loop
+        mock_mcp.run_async.assert_awaited_once_with(
             transport="sse", 
             host="0.0.0.0", 
             port=3000, 
@@ -0,0 +1,152 @@
+import asyncio
+import unittest
+
+from src.services.local_sentiment import EscalationCounter
+from src.services.metrics import (
+    MetricsRegistry, _Metric, instrument_tool, llm_tokens, metrics, quota_requests, quota_waiting, record_llm_usage,
+    sentiment_requests, tool_duration, tool_errors, tool_in_flight, upstream_duration,
+)
+from src.services.quota import QuotaExceededError, QuotaScheduler
+from src.services.resilience import CircuitBreaker, ResilientCaller, RetryBudget
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_counter_and_gauge_render_per_label_set(self):
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests", ("route",))
+        in_flight = registry.gauge("in_flight", "Running requests")
+        requests.inc(("/a",))
+        requests.inc(("/a",), 2)
+        requests.inc(('say "hi"',))
+        in_flight.inc()
+        in_flight.dec()
+
+        rendered = registry.render()
+
+        self.assertIn("# TYPE requests_total counter", rendered)
+        self.assertIn('requests_total{route="/a"} 3', rendered)
+        self.assertIn('requests_total{route="say \\"hi\\""} 1', rendered)
+        self.assertIn("in_flight 0", rendered)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", ("op",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value, ("read",))
+
+        rendered = registry.render()
+
+        self.assertIn('latency_seconds_bucket{op="read",le="0.1"} 2', rendered)
+        self.assertIn('latency_seconds_bucket{op="read",le="1"} 3', rendered)
+        self.assertIn('latency_seconds_bucket{op="read",le="+Inf"} 4', rendered)
+        self.assertIn('latency_seconds_sum{op="read"} 3.65', rendered)
+        self.assertIn('latency_seconds_count{op="read"} 4', rendered)
+
+    def test_duplicate_names_are_rejected(self):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests")
+
+        with self.assertRaises(ValueError):
+            registry.gauge("requests_total", "Requests")
+
+    def test_function_gauge_is_read_at_scrape_time(self):
+        registry = MetricsRegistry()
+        values = {("NewsAPI",): 5, ("OpenAI",): None}
+        registry.gauge_function("remaining", "Remaining", ("upstream",), lambda: values)
+
+        first = registry.render()
+        values[("NewsAPI",)] = 4
+
+        self.assertIn('remaining{upstream="NewsAPI"} 5', first)
+        self.assertNotIn("OpenAI", first)
+        self.assertIn('remaining{upstream="NewsAPI"} 4', registry.render())
+
+    def test_metric_without_samples_cannot_be_created(self):
+        class Untyped(_Metric):
+            type_name = "untyped"
+
+        with self.assertRaises(TypeError):
+            Untyped("untyped_total", "Untyped")
+
+
+class TestInstrumentation(unittest.IsolatedAsyncioTestCase):
+
+    async def test_tool_calls_and_error_responses_are_recorded(self):
+        async def sample_tool(query: str) -> dict:
+            """Sample tool."""
+            self.assertEqual(tool_in_flight.value(("sample_tool",)), 1)
+            if not query:
+                return {"error": "Query parameter is required"}
+            return {"articles": []}
+
+        instrumented = instrument_tool(sample_tool)
+        calls_before = tool_duration.count(("sample_tool",))
+        errors_before = tool_errors.value(("sample_tool", "Query parameter is required"))
+
+        await instrumented("news")
+        await instrumented(query="")
+
+        self.assertEqual(instrumented.__name__, "sample_tool")
+        self.assertEqual(instrumented.__doc__, "Sample tool.")
+        self.assertEqual(tool_duration.count(("sample_tool",)) - calls_before, 2)
+        self.assertEqual(tool_errors.value(("sample_tool", "Query parameter is required")) - errors_before, 1)
+        self.assertEqual(tool_in_flight.value(("sample_tool",)), 0)
+
+    async def test_upstream_attempts_are_timed_by_outcome(self):
+        caller = ResilientCaller("metrics-test", lambda error: False, max_attempts=1, base_delay=0, max_delay=0,
+                                 retry_budget=RetryBudget(0, 0),
+                                 breaker=CircuitBreaker("metrics-test", failure_threshold=5, recovery_timeout=60))
+
+        async def fail():
+            raise ValueError("bad request")
+
+        await caller.call(lambda: asyncio.sleep(0))
+        with self.assertRaises(ValueError):
+            await caller.call(fail)
+
+        self.assertEqual(upstream_duration.count(("metrics-test", "ok")), 1)
+        self.assertEqual(upstream_duration.count(("metrics-test", "error")), 1)
+
+    async def test_quota_outcomes_and_waiters_are_recorded(self):
+        quota = QuotaScheduler(name="metrics-quota", daily_limit=2, requests_per_second=0)
+        before = {outcome: quota_requests.value(("metrics-quota", outcome)) for outcome in ("granted", "rejected")}
+
+        await quota.acquire(1.0)
+        await quota.acquire(1.0)
+        with self.assertRaises(QuotaExceededError):
+            await quota.acquire(1.0)
+
+        self.assertEqual(quota_requests.value(("metrics-quota", "granted")) - before["granted"], 2)
+        self.assertEqual(quota_requests.value(("metrics-quota", "rejected")) - before["rejected"], 1)
+        self.assertEqual(quota_waiting.value(("metrics-quota",)), 0)
+
+    def test_quota_and_escalations_are_exported(self):
+        import src.tools.sentiment_tool  # registers the escalation rate gauge
+        local_before = sentiment_requests.value(("local",))
+        escalated_before = sentiment_requests.value(("llm",))
+        counter = EscalationCounter()
+
+        counter.record(escalated=False)
+        counter.record(escalated=True)
+        rendered = metrics.render()
+
+        self.assertEqual(sentiment_requests.value(("local",)) - local_before, 1)
+        self.assertEqual(sentiment_requests.value(("llm",)) - escalated_before, 1)
+        self.assertIn("# TYPE news_mcp_quota_daily_remaining gauge", rendered)
+        self.assertIn("# TYPE news_mcp_quota_requests_total counter", rendered)
+        self.assertIn("news_mcp_sentiment_escalation_rate ", rendered)
+
+    def test_llm_usage_is_counted(self):
+        prompt_before = llm_tokens.value(("prompt",))
+        completion_before = llm_tokens.value(("completion",))
+
+        record_llm_usage({"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+        record_llm_usage(None)
+
+        self.assertEqual(llm_tokens.value(("prompt",)) - prompt_before, 120)
+        self.assertEqual(llm_tokens.value(("completion",)) - completion_before, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+import httpx
+
+from src.services.news_api import AsyncNewsApiClient, NewsApiError
+
+
+def _ok_payload():
+    return {
+        "status": "ok",
+        "totalResults": 1,
+        "articles": [
+            {
+                "source": {"id": None, "name": "Test Source"},
+                "title": "Test Title",
+                "description": "Test Description",
+                "url": "https://example.com/1",
+                "publishedAt": "2023-01-01T12:00:00Z"
+            }
+        ]
+    }
+
+
+class TestAsyncNewsApiClient(unittest.IsolatedAsyncioTestCase):
+
+    async def test_get_everything_sends_expected_request(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=_ok_payload())
+
+        client = AsyncNewsApiClient(transport=httpx.MockTransport(handler))
+        result = await client.get_everything(api_key="test-key", q="test query", language="en", page_size=2)
+        await client.aclose()
+
+        self.assertEqual(result["articles"][0]["title"], "Test Title")
+        self.assertEqual(requests[0].url.path, "/v2/everything")
+        self.assertEqual(requests[0].url.params["q"], "test query")
+        self.assertEqual(requests[0].url.params["language"], "en")
+        self.assertEqual(requests[0].url.params["pageSize"], "2")
+        self.assertEqual(requests[0].url.params["sortBy"], "publishedAt")
+        self.assertEqual(requests[0].headers["X-Api-Key"], "test-key")
+        self.assertNotIn("from", requests[0].url.params)
+
+    async def test_from_date_is_sent_as_from(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=_ok_payload())
+
+        client = AsyncNewsApiClient(transport=httpx.MockTransport(handler))
+        await client.get_everything(api_key="test-key", q="test query", language="en", page_size=2,
+                                    from_date="2023-01-01T12:00:00Z")
+        await client.aclose()
+
+        self.assertEqual(requests[0].url.params["from"], "2023-01-01T12:00:00Z")
+
+    async def test_connection_pool_is_reused(self):
+        client = AsyncNewsApiClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=_ok_payload())))
+
+        await client.get_everything(api_key="test-key", q="one", language="en", page_size=1)
+        first_client = client._client
+        await client.get_everything(api_key="test-key", q="two", language="en", page_size=1)
+
+        self.assertIs(client._client, first_client)
+        await client.aclose()
+
+    async def test_error_payload_raises(self):
+        error_payload = {"status": "error", "code": "rateLimited", "message": "Rate limit exceeded"}
+        client = AsyncNewsApiClient(transport=httpx.MockTransport(lambda request: httpx.Response(429, json=error_payload)))
+
+        with self.assertRaises(NewsApiError) as context:
+            await client.get_everything(api_key="test-key", q="test", language="en", page_size=1)
+        await client.aclose()
+
+        self.assertIn("Rate limit exceeded", str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
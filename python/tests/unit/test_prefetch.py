@@ -0,0 +1,153 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from src.prefetch import PrefetchScheduler, load_watchlist, quota_interval
+from src.services.quota import QuotaExceededError, QuotaScheduler
+
+
+def make_quota(daily_limit=100, requests_per_second=1.0):
+    return QuotaScheduler(name="NewsAPI", daily_limit=daily_limit, requests_per_second=requests_per_second)
+
+
+class TestWatchlist(unittest.TestCase):
+
+    def test_queries_from_list_and_file_are_merged_without_duplicates(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "watchlist.txt")
+            with open(path, "w", encoding="utf-8") as watchlist_file:
+                watchlist_file.write("# hot topics\nElections\n\n  central   banks \nmarkets\n")
+
+            watchlist = load_watchlist("markets, AI ,,", path)
+
+        self.assertEqual(watchlist, ["markets", "AI", "Elections", "central banks"])
+
+    def test_missing_file_keeps_the_listed_queries(self):
+        self.assertEqual(load_watchlist("markets", "/nonexistent/watchlist.txt"), ["markets"])
+
+    def test_interval_is_stretched_to_fit_the_quota_share(self):
+        quota = make_quota(daily_limit=1000, requests_per_second=0.1)
+
+        self.assertEqual(quota_interval(2, 240.0, quota, 0.5), 345.6)
+        self.assertEqual(quota_interval(1, 300.0, quota, 0.5), 300.0)
+        self.assertEqual(quota_interval(20, 1.0, make_quota(daily_limit=0, requests_per_second=0.1), 0.5), 400.0)
+
+
+class TestPrefetchScheduler(unittest.IsolatedAsyncioTestCase):
+
+    @patch('src.prefetch.refresh_search', new_callable=AsyncMock)
+    async def test_refresh_fetches_the_search(self, mock_refresh):
+        scheduler = PrefetchScheduler(["markets"], page_size=3, quota=make_quota())
+
+        await scheduler.refresh("markets")
+
+        mock_refresh.assert_awaited_once_with("markets", "en", 3)
+        self.assertEqual(scheduler.stats()["refreshed"], 1)
+
+    @patch('src.prefetch.precompute_sentiment', new_callable=AsyncMock)
+    @patch('src.prefetch.refresh_search', new_callable=AsyncMock)
+    async def test_sentiment_is_precomputed_from_the_refreshed_result(self, mock_refresh, mock_sentiment):
+        mock_refresh.return_value = {"articles": [], "cursor": None}
+        mock_sentiment.return_value = {"query": "markets", "sentiment_analysis": {}}
+        scheduler = PrefetchScheduler(["markets"], sentiment=True, quota=make_quota())
+
+        await scheduler.refresh("markets")
+
+        mock_sentiment.assert_awaited_once_with("markets", mock_refresh.return_value)
+        self.assertEqual(scheduler.stats()["sentiment_precomputed"], 1)
+
+    @patch('src.tools.sentiment_tool.llm_service')
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config.NEWSAPI_API_KEY', "test_api_key")
+    async def test_prefetch_cycle_leaves_user_traffic_counters_unchanged(self, mock_client, mock_llm_service):
+        from src.tools.search_news import search_cache, search_news
+        from src.tools.sentiment_tool import sentiment_escalations
+        mock_client.get_everything = AsyncMock(return_value={"status": "ok", "articles": [{
+            "source": {"id": None, "name": "Test Source"},
+            "title": "Markets open the week",
+            "description": "Traders return after the holiday",
+            "url": "https://example.com/1",
+            "publishedAt": "2023-01-01T12:00:00Z",
+        }]})
+        mock_llm_service.aanalyze_sentiment = AsyncMock(return_value={
+            "overall_sentiment": "neutral", "sentiment_confidence": "medium",
+            "key_entities": {"people": [], "organizations": [], "locations": []},
+            "key_takeaway_summary": "Quiet start",
+        })
+        await search_news("markets", "en", 5)
+        search_counters = search_cache.stats()
+        escalation_counters = sentiment_escalations.stats()
+        scheduler = PrefetchScheduler(["markets"], sentiment=True, quota=make_quota(0, 0))
+
+        await scheduler.refresh("markets")
+
+        self.assertEqual(scheduler.stats()["sentiment_precomputed"], 1)
+        mock_llm_service.aanalyze_sentiment.assert_awaited_once()
+        self.assertEqual(mock_client.get_everything.await_count, 2)
+        for counter in ("hits", "misses", "stale_hits"):
+            self.assertEqual(search_cache.stats()[counter], search_counters[counter], counter)
+        self.assertEqual(sentiment_escalations.stats(), escalation_counters)
+
+    @patch('src.prefetch.refresh_search', new_callable=AsyncMock)
+    async def test_quota_reserved_for_interactive_calls_is_not_spent(self, mock_refresh):
+        quota = make_quota(daily_limit=10)
+        scheduler = PrefetchScheduler(["markets"], quota=quota, quota_share=0.3)
+        quota._used_today = 3
+
+        await scheduler.refresh("markets")
+        quota._used_today = 2
+        await scheduler.refresh("markets")
+
+        mock_refresh.assert_awaited_once()
+        self.assertEqual(scheduler.stats()["skipped_quota"], 1)
+
+    @patch('src.prefetch.refresh_search', new_callable=AsyncMock)
+    async def test_failures_are_counted_without_stopping(self, mock_refresh):
+        mock_refresh.side_effect = [QuotaExceededError("Quota exhausted", 10.0), RuntimeError("Upstream down")]
+        scheduler = PrefetchScheduler(["markets"], quota=make_quota())
+
+        await scheduler.refresh("markets")
+        await scheduler.refresh("markets")
+
+        stats = scheduler.stats()
+        self.assertEqual((stats["skipped_quota"], stats["failed"], stats["refreshed"]), (1, 1, 0))
+
+    async def test_first_refreshes_are_staggered_over_one_interval(self):
+        scheduler = PrefetchScheduler(["a", "b", "c", "d"], interval=400.0, quota=make_quota(0, 0))
+        scheduled = []
+
+        async def record(query, initial_delay):
+            scheduled.append((query, initial_delay))
+
+        with patch.object(scheduler, '_run_query', side_effect=record):
+            scheduler.start()
+            self.assertTrue(scheduler.stats()["running"])
+            await asyncio.sleep(0)
+            await scheduler.stop()
+
+        self.assertEqual(scheduled, [("a", 0.0), ("b", 100.0), ("c", 200.0), ("d", 300.0)])
+        self.assertFalse(scheduler.stats()["running"])
+
+    @patch('src.prefetch.refresh_search', new_callable=AsyncMock)
+    async def test_running_scheduler_refreshes_each_query(self, mock_refresh):
+        scheduler = PrefetchScheduler(["a", "b"], interval=0.2, jitter=0.0, quota=make_quota(0, 0))
+
+        scheduler.start()
+        await asyncio.sleep(0.15)
+        await scheduler.stop()
+
+        self.assertEqual([call.args[0] for call in mock_refresh.await_args_list], ["a", "b"])
+
+    def test_jitter_spreads_later_refreshes(self):
+        scheduler = PrefetchScheduler(["markets"], interval=100.0, jitter=0.2, quota=make_quota(0, 0))
+
+        delays = [scheduler.next_delay() for _ in range(200)]
+
+        self.assertTrue(all(80.0 <= delay <= 120.0 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
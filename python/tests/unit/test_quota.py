@@ -0,0 +1,68 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+from src.services.quota import QuotaExceededError, QuotaScheduler, SECONDS_PER_DAY
+
+
+class TestQuotaScheduler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_burst_then_rate_limited(self):
+        quota = QuotaScheduler(name="test", daily_limit=0, requests_per_second=20, burst=2)
+
+        started = time.monotonic()
+        for _ in range(4):
+            await quota.acquire(timeout=1.0)
+        elapsed = time.monotonic() - started
+
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertEqual(quota.stats()["granted"], 4)
+        self.assertEqual(quota.stats()["queued"], 2)
+
+    async def test_waiting_past_the_deadline_is_rejected_immediately(self):
+        quota = QuotaScheduler(name="test", daily_limit=0, requests_per_second=1, burst=1)
+        await quota.acquire(timeout=0)
+
+        started = time.monotonic()
+        with self.assertRaises(QuotaExceededError) as context:
+            await quota.acquire(timeout=0.1)
+
+        self.assertLess(time.monotonic() - started, 0.05)
+        self.assertGreater(context.exception.retry_after, 0.5)
+        self.assertEqual(quota.stats()["rejected"], 1)
+
+    async def test_queued_callers_are_served_in_order(self):
+        quota = QuotaScheduler(name="test", daily_limit=0, requests_per_second=50, burst=1)
+        await quota.acquire(timeout=0)
+        order = []
+
+        async def caller(index):
+            await quota.acquire(timeout=1.0)
+            order.append(index)
+
+        await asyncio.gather(*(caller(index) for index in range(4)))
+
+        self.assertEqual(order, [0, 1, 2, 3])
+
+    async def test_daily_limit_resets_at_midnight_utc(self):
+        quota = QuotaScheduler(name="test", daily_limit=2, requests_per_second=0)
+        await quota.acquire(timeout=0)
+        await quota.acquire(timeout=0)
+
+        self.assertEqual(quota.remaining()["daily_remaining"], 0)
+        with self.assertRaises(QuotaExceededError):
+            await quota.acquire(timeout=1.0)
+
+        with patch('src.services.quota.time.time', return_value=time.time() + SECONDS_PER_DAY):
+            self.assertEqual(quota.remaining()["daily_remaining"], 2)
+
+    async def test_upstream_rate_limit_exhausts_the_day(self):
+        quota = QuotaScheduler(name="test", daily_limit=100, requests_per_second=0)
+        quota.mark_exhausted()
+
+        self.assertEqual(quota.remaining()["daily_remaining"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
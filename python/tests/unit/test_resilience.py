@@ -0,0 +1,210 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from src.services.resilience import CircuitBreaker, CircuitOpenError, CircuitState, ResilientCaller, RetryBudget
+
+
+class TransientError(Exception):
+    pass
+
+
+def _caller(max_attempts=3, budget=None, breaker=None, hedging=False):
+    return ResilientCaller(
+        name="test",
+        is_retryable=lambda error: isinstance(error, TransientError),
+        max_attempts=max_attempts,
+        base_delay=0,
+        max_delay=0,
+        retry_budget=budget or RetryBudget(ratio=1.0, reserve=10),
+        breaker=breaker or CircuitBreaker("test", failure_threshold=100, recovery_timeout=60),
+        hedging=hedging,
+    )
+
+
+class FlakyUpstream:
+    """Fails with TransientError a given number of times, then answers."""
+
+    def __init__(self, failures, error=TransientError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("upstream failed")
+        return "ok"
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_consecutive_failures_and_fails_fast(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        with self.assertRaises(CircuitOpenError) as context:
+            breaker.before_call()
+        self.assertGreater(context.exception.retry_after, 59)
+        self.assertEqual(breaker.short_circuited, 1)
+
+    def test_success_resets_the_failure_count(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.01)
+        breaker.record_failure()
+
+        with patch('src.services.resilience.time.monotonic', return_value=breaker._opened_at + 1):
+            breaker.before_call()
+            self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+            with self.assertRaises(CircuitOpenError):
+                breaker.before_call()
+            breaker.record_success()
+
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        self.assertEqual(breaker.transitions, {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1})
+
+    def test_failed_probe_reopens_the_circuit(self):
+        breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=0.01)
+        for _ in range(3):
+            breaker.record_failure()
+
+        with patch('src.services.resilience.time.monotonic', return_value=breaker._opened_at + 1):
+            breaker.before_call()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertEqual(breaker.transitions["half_open->open"], 1)
+
+
+class TestRetryBudget(unittest.TestCase):
+
+    def test_retries_are_limited_to_the_earned_ratio(self):
+        budget = RetryBudget(ratio=0.5, reserve=1)
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+
+        budget.record_request()
+        budget.record_request()
+
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+
+
+class TestResilientCaller(unittest.IsolatedAsyncioTestCase):
+
+    async def test_transient_errors_are_retried(self):
+        caller = _caller(max_attempts=3)
+        upstream = FlakyUpstream(failures=2)
+
+        self.assertEqual(await caller.call(upstream), "ok")
+
+        self.assertEqual(upstream.calls, 3)
+        self.assertEqual(caller.stats()["retries"], 2)
+        self.assertEqual(caller.stats()["failures"], 2)
+
+    async def test_attempts_are_bounded(self):
+        caller = _caller(max_attempts=2)
+        upstream = FlakyUpstream(failures=5)
+
+        with self.assertRaises(TransientError):
+            await caller.call(upstream)
+
+        self.assertEqual(upstream.calls, 2)
+
+    async def test_non_retryable_errors_are_raised_at_once(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+        caller = _caller(breaker=breaker)
+        upstream = FlakyUpstream(failures=1, error=ValueError)
+
+        with self.assertRaises(ValueError):
+            await caller.call(upstream)
+
+        self.assertEqual(upstream.calls, 1)
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+    async def test_exhausted_retry_budget_stops_retries(self):
+        caller = _caller(max_attempts=3, budget=RetryBudget(ratio=0, reserve=0))
+        upstream = FlakyUpstream(failures=1)
+
+        with self.assertRaises(TransientError):
+            await caller.call(upstream)
+
+        self.assertEqual(upstream.calls, 1)
+        self.assertEqual(caller.stats()["retry_budget_exhausted"], 1)
+
+    async def test_non_idempotent_calls_are_not_retried(self):
+        caller = _caller(max_attempts=3)
+        upstream = FlakyUpstream(failures=1)
+
+        with self.assertRaises(TransientError):
+            await caller.call(upstream, idempotent=False)
+
+        self.assertEqual(upstream.calls, 1)
+
+    async def test_non_idempotent_calls_are_retried_while_allowed(self):
+        caller = _caller(max_attempts=3)
+        upstream = FlakyUpstream(failures=1)
+        blocked = FlakyUpstream(failures=1)
+
+        self.assertEqual(await caller.call(upstream, idempotent=False, retry_while=lambda: True), "ok")
+        with self.assertRaises(TransientError):
+            await caller.call(blocked, idempotent=False, retry_while=lambda: False)
+
+        self.assertEqual(upstream.calls, 2)
+        self.assertEqual(blocked.calls, 1)
+
+    async def test_open_circuit_fails_fast_without_calling_upstream(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+        caller = _caller(max_attempts=5, breaker=breaker)
+        upstream = FlakyUpstream(failures=10)
+
+        with self.assertRaises(CircuitOpenError):
+            await caller.call(upstream)
+        with self.assertRaises(CircuitOpenError):
+            await caller.call(upstream)
+
+        self.assertEqual(upstream.calls, 2)
+        self.assertEqual(caller.stats()["circuit_state"], "open")
+        self.assertEqual(caller.stats()["short_circuited"], 2)
+
+    async def test_slow_call_is_hedged_after_the_p95_delay(self):
+        caller = _caller(hedging=True)
+        for _ in range(50):
+            caller._latencies.append(0.01)
+        calls = []
+
+        async def upstream():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                await asyncio.sleep(1)
+                return "slow"
+            return "fast"
+
+        self.assertEqual(await asyncio.wait_for(caller.call(upstream), 0.5), "fast")
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(caller.stats()["hedges"], 1)
+        self.assertEqual(caller.stats()["hedge_wins"], 1)
+
+    async def test_no_hedging_without_latency_history(self):
+        caller = _caller(hedging=True)
+        upstream = FlakyUpstream(failures=0)
+
+        await caller.call(upstream)
+
+        self.assertIsNone(caller.stats()["hedge_delay"])
+        self.assertEqual(caller.stats()["hedges"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,21 +1,30 @@
+import asyncio
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock
 import sys
 import os
-from src.tools.search_news import search_news
+import tempfile
+from contextlib import contextmanager
+from src.services.cache import CacheState
+from src.services.shared_cache import SqliteTTLCache
+from src.tools.search_news import search_news, refresh_search, search_cache, _cache_key, _background_tasks
 
-class TestSearchNews(unittest.TestCase):
+
+@contextmanager
+def use_quota(quota):
+    """Use `quota` both for the tokens NewsAPI calls take and for the quota search_news reports."""
+    with patch('src.services.news_api.newsapi_quota', quota), patch('src.tools.search_news.newsapi_quota', quota):
+        yield quota
+
+
+class TestSearchNews(unittest.IsolatedAsyncioTestCase):
     
-    @patch('src.tools.search_news.NewsApiClient')
+    @patch('src.services.news_api.news_api_client')
     @patch('src.tools.search_news.config')
-    def test_successful_search(self, mock_config, mock_newsapi):
+    async def test_successful_search(self, mock_config, mock_client):
         # Mock the config to return a valid API key
         mock_config.NEWSAPI_API_KEY = "test_api_key"
         
-        # Mock the NewsAPI client instance
-        mock_client_instance = MagicMock()
-        mock_newsapi.return_value = mock_client_instance
-        
         # Create sample response data
         mock_response = {
             "status": "ok",
@@ -44,15 +53,15 @@ class TestSearchNews(unittest.TestCase):
             ]
         }
         
-        # Set up the mock to return test data
-        mock_client_instance.get_everything.return_value = mock_response
+        # Set up the shared client mock to return test data
+        mock_client.get_everything = AsyncMock(return_value=mock_response)
         
         # Call the function with test parameters
-        result = search_news("test query", "en", 2)
+        result = await search_news("test query", "en", 2)
         
-        # Verify the client was initialized and called with correct parameters
-        mock_newsapi.assert_called_once()
-        mock_client_instance.get_everything.assert_called_with(
+        # Verify the client was called with correct parameters
+        mock_client.get_everything.assert_awaited_once_with(
+            api_key="test_api_key",
             q="test query",
             language="en",
             page_size=2,
@@ -68,44 +77,42 @@ class TestSearchNews(unittest.TestCase):
         self.assertEqual(result["articles"][0]["published_at"], "2023-01-01T12:00:00Z")
         
     @patch('src.tools.search_news.config')
-    def test_missing_api_key(self, mock_config):
+    async def test_missing_api_key(self, mock_config):
         mock_config.NEWSAPI_API_KEY = None
         
-        result = search_news("test query", "en", 5)
+        result = await search_news("test query", "en", 5)
         
         self.assertIn("error", result)
         self.assertEqual(result["error"], "Configuration error")
         self.assertIn("NEWSAPI_API_KEY is required", result["message"])
     
-    def test_empty_query(self):
-        result = search_news("", "en", 5)
+    async def test_empty_query(self):
+        result = await search_news("", "en", 5)
         
         self.assertIn("error", result)
         self.assertEqual(result["error"], "Query parameter is required")
     
-    @patch('src.tools.search_news.NewsApiClient')
+    @patch('src.services.news_api.news_api_client')
     @patch('src.tools.search_news.config')
-    def test_api_exception(self, mock_config, mock_newsapi):
+    async def test_api_exception(self, mock_config, mock_client):
         # Mock the config to return a valid API key so we get past the API key check
         mock_config.NEWSAPI_API_KEY = "test_api_key"
         
         # Mock the NewsAPI client to raise an exception
-        mock_client_instance = MagicMock()
-        mock_newsapi.return_value = mock_client_instance
-        mock_client_instance.get_everything.side_effect = Exception("API Error")
+        mock_client.get_everything = AsyncMock(side_effect=Exception("API Error"))
         
         # Call the function
-        result = search_news("test query", "en", 5)
+        result = await search_news("test query", "en", 5)
         
         # Verify error response
         self.assertIn("error", result)
         self.assertEqual(result["error"], "API error")
         self.assertEqual(result["message"], "API Error")
     
-    def test_invalid_page_size(self):
+    async def test_invalid_page_size(self):
         # Test with invalid page sizes
-        result_low = search_news("test", "en", 0)
-        result_high = search_news("test", "en", 101)
+        result_low = await search_news("test", "en", 0)
+        result_high = await search_news("test", "en", 101)
         
         # Verify the error responses
         self.assertIn("error", result_low)
@@ -116,5 +123,430 @@ class TestSearchNews(unittest.TestCase):
         self.assertEqual(result_high["error"], "Invalid page size")
         self.assertEqual(result_high["message"], "Page size must be between 1 and 100")
 
+
+class TestSearchNewsCaching(unittest.IsolatedAsyncioTestCase):
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_repeated_query_is_served_from_cache(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_client.get_everything = AsyncMock(return_value={"status": "ok", "articles": []})
+
+        first = await search_news("Test  Query", "en", 3)
+        second = await search_news("test query", "EN", 3)
+
+        mock_client.get_everything.assert_awaited_once()
+        self.assertEqual(first, second)
+        self.assertEqual(search_cache.stats()["hits"], 1)
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_expired_entry_served_on_api_error(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_client.get_everything = AsyncMock(side_effect=Exception("API Error"))
+        cached = {"articles": [{"title": "Cached"}]}
+        search_cache.set(_cache_key("test query", "en", 5), cached, ttl=0)
+
+        with patch.object(search_cache, 'stale_while_revalidate', 0):
+            result = await search_news("test query", "en", 5)
+
+        self.assertEqual(result["articles"], cached["articles"])
+        self.assertEqual(search_cache.stats()["stale_errors_served"], 1)
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_stale_entry_is_revalidated_in_background(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_client.get_everything = AsyncMock(return_value={"status": "ok", "articles": []})
+        key = _cache_key("test query", "en", 5)
+        search_cache.set(key, {"articles": [{"title": "Old"}]}, ttl=0)
+
+        result = await search_news("test query", "en", 5)
+        await asyncio.gather(*_background_tasks)
+
+        self.assertEqual(result["articles"][0]["title"], "Old")
+        mock_client.get_everything.assert_awaited_once()
+        self.assertEqual(search_cache.get(key).state, CacheState.FRESH)
+        self.assertEqual(search_cache.get(key).value["articles"], [])
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_refresh_replaces_a_fresh_entry(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_client.get_everything = AsyncMock(return_value={"status": "ok", "articles": []})
+        key = _cache_key("test query", "en", 5)
+        search_cache.set(key, {"articles": [{"title": "Old"}]})
+
+        await refresh_search("test query", "en", 5)
+        stats_after_refresh = search_cache.stats()
+        result = await search_news("test query", "en", 5)
+
+        mock_client.get_everything.assert_awaited_once()
+        self.assertEqual(result["articles"], [])
+        # The refresh's own lookup is not counted as user traffic
+        self.assertEqual((stats_after_refresh["hits"], stats_after_refresh["misses"]), (0, 0))
+        with self.assertRaises(ValueError):
+            await refresh_search("", "en", 5)
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_local_index_answers_covered_query(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_config.ARTICLE_STORE_MAX_AGE = 60
+        mock_client.get_everything = AsyncMock(return_value={
+            "status": "ok",
+            "articles": [
+                {
+                    "source": {"id": None, "name": "Test Source"},
+                    "title": "Apple ships new iPhone",
+                    "description": "Description",
+                    "url": "https://example.com/1",
+                    "publishedAt": "2023-01-01T12:00:00Z"
+                }
+            ]
+        })
+
+        await search_news("apple", "en", 10)
+        result = await search_news("apple iphone", "en", 5, use_local_index=True)
+
+        mock_client.get_everything.assert_awaited_once()
+        self.assertEqual(result["served_from"], "local_index")
+        self.assertEqual(result["articles"][0]["title"], "Apple ships new iPhone")
+
+
+class TestSearchNewsSharedCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "search_cache.db")
+        self.cache = SqliteTTLCache(name="search_news", path=path, max_bytes=100000, ttl=60)
+        self.other_worker = SqliteTTLCache(name="search_news", path=path, max_bytes=100000, ttl=60)
+        self.addCleanup(self.cache.close)
+        self.addCleanup(self.other_worker.close)
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_waits_for_a_fetch_running_on_another_worker(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_client.get_everything = AsyncMock(return_value={"status": "ok", "articles": []})
+        key = _cache_key("test query", "en", 5)
+        self.assertTrue(self.other_worker.try_begin_fetch(key))
+
+        async def other_worker_fetch():
+            await asyncio.sleep(0.1)
+            self.other_worker.set(key, {"articles": [{"title": "From worker 2"}]})
+            self.other_worker.end_fetch(key)
+
+        with patch('src.tools.search_news.search_cache', self.cache):
+            result, _ = await asyncio.gather(search_news("test query", "en", 5), other_worker_fetch())
+
+        mock_client.get_everything.assert_not_awaited()
+        self.assertEqual(result["articles"][0]["title"], "From worker 2")
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_fetched_result_is_a_hit_for_other_workers(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_client.get_everything = AsyncMock(return_value={"status": "ok", "articles": []})
+
+        with patch('src.tools.search_news.search_cache', self.cache):
+            await search_news("test query", "en", 5)
+
+        key = _cache_key("test query", "en", 5)
+        self.assertEqual(self.other_worker.get(key).state, CacheState.FRESH)
+        # The fetch lease was released
+        self.assertTrue(self.other_worker.try_begin_fetch(key))
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_shared_cache_is_read_off_the_event_loop(self, mock_config, mock_client):
+        import threading
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        self.cache.set(_cache_key("test query", "en", 5), {"articles": [{"title": "Cached"}]})
+        threads = []
+        get = self.cache.get
+
+        def record_thread(key):
+            threads.append(threading.current_thread())
+            return get(key)
+
+        with patch('src.tools.search_news.search_cache', self.cache), \
+                patch.object(self.cache, 'get', side_effect=record_thread):
+            result = await search_news("test query", "en", 5)
+
+        self.assertEqual(result["articles"][0]["title"], "Cached")
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+
+def _raw_article(index, published_at):
+    return {
+        "source": {"id": None, "name": "Test Source"},
+        "title": f"Story {index}",
+        "description": "Description",
+        "url": f"https://example.com/{index}",
+        "publishedAt": published_at
+    }
+
+
+class TestSearchNewsIncremental(unittest.IsolatedAsyncioTestCase):
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_refresh_requests_only_newer_articles_and_merges_them(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_config.SEARCH_INCREMENTAL = True
+        mock_client.get_everything = AsyncMock(side_effect=[
+            {"status": "ok", "articles": [_raw_article(2, "2023-01-02T12:00:00Z"), _raw_article(1, "2023-01-01T12:00:00Z")]},
+            {"status": "ok", "articles": [_raw_article(3, "2023-01-03T12:00:00Z"), _raw_article(2, "2023-01-02T12:00:00Z")]},
+        ])
+
+        first = await search_news("test query", "en", 2)
+        await refresh_search("test query", "en", 2)
+        second = await search_news("test query", "en", 2)
+
+        self.assertEqual(first["cursor"], "2023-01-02T12:00:00Z")
+        self.assertEqual(mock_client.get_everything.await_args_list[1].kwargs["from_date"], "2023-01-02T12:00:00Z")
+        self.assertNotIn("from_date", mock_client.get_everything.await_args_list[0].kwargs)
+        self.assertEqual([article["title"] for article in second["articles"]], ["Story 3", "Story 2"])
+        self.assertEqual(second["cursor"], "2023-01-03T12:00:00Z")
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_delta_filling_the_page_is_flagged(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_config.SEARCH_INCREMENTAL = True
+        mock_client.get_everything = AsyncMock(side_effect=[
+            {"status": "ok", "articles": [_raw_article(2, "2023-01-02T12:00:00Z"), _raw_article(1, "2023-01-01T12:00:00Z")]},
+            # Two newer articles fill the page; anything between them and the cursor was not fetched
+            {"status": "ok", "articles": [_raw_article(5, "2023-01-05T12:00:00Z"), _raw_article(4, "2023-01-04T12:00:00Z")]},
+        ])
+
+        first = await search_news("test query", "en", 2)
+        await refresh_search("test query", "en", 2)
+        second = await search_news("test query", "en", 2, since=first["cursor"])
+
+        self.assertFalse(first["has_more"])
+        self.assertEqual([article["title"] for article in second["articles"]], ["Story 5", "Story 4"])
+        self.assertTrue(second["has_more"])
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_delta_reaching_the_cursor_is_not_flagged(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_config.SEARCH_INCREMENTAL = True
+        mock_client.get_everything = AsyncMock(side_effect=[
+            {"status": "ok", "articles": [_raw_article(2, "2023-01-02T12:00:00Z"), _raw_article(1, "2023-01-01T12:00:00Z")]},
+            {"status": "ok", "articles": [_raw_article(3, "2023-01-03T12:00:00Z"), _raw_article(2, "2023-01-02T12:00:00Z")]},
+        ])
+
+        first = await search_news("test query", "en", 2)
+        await refresh_search("test query", "en", 2)
+        second = await search_news("test query", "en", 2, since=first["cursor"])
+
+        self.assertEqual([article["title"] for article in second["articles"]], ["Story 3"])
+        self.assertFalse(second["has_more"])
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_full_page_is_fetched_when_incremental_mode_is_off(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_config.SEARCH_INCREMENTAL = False
+        mock_client.get_everything = AsyncMock(return_value={
+            "status": "ok", "articles": [_raw_article(1, "2023-01-01T12:00:00Z")]
+        })
+
+        await search_news("test query", "en", 2)
+        await refresh_search("test query", "en", 2)
+
+        self.assertNotIn("from_date", mock_client.get_everything.await_args.kwargs)
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_since_cursor_returns_only_newer_articles(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_client.get_everything = AsyncMock(return_value={
+            "status": "ok",
+            "articles": [_raw_article(2, "2023-01-02T12:00:00Z"), _raw_article(1, "2023-01-01T12:00:00Z")]
+        })
+
+        newer = await search_news("test query", "en", 5, since="2023-01-01T12:00:00Z")
+        nothing_new = await search_news("test query", "en", 5, since="2023-01-05T00:00:00+00:00")
+        invalid = await search_news("test query", "en", 5, since="yesterday")
+
+        self.assertEqual([article["title"] for article in newer["articles"]], ["Story 2"])
+        self.assertEqual(newer["cursor"], "2023-01-02T12:00:00Z")
+        self.assertEqual(nothing_new["articles"], [])
+        self.assertEqual(nothing_new["cursor"], "2023-01-05T00:00:00+00:00")
+        self.assertEqual(invalid["error"], "Invalid cursor")
+        mock_client.get_everything.assert_awaited_once()
+
+
+class TestSearchNewsResponseOptions(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        config_patcher = patch('src.tools.search_news.config')
+        mock_config = config_patcher.start()
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        self.addCleanup(config_patcher.stop)
+        client_patcher = patch('src.services.news_api.news_api_client')
+        self.mock_client = client_patcher.start()
+        self.addCleanup(client_patcher.stop)
+        articles = [_raw_article(index, f"2023-01-0{index}T12:00:00Z") for index in (2, 1)]
+        articles[0]["description"] = "A long description of the second story"
+        self.mock_client.get_everything = AsyncMock(return_value={"status": "ok", "articles": articles})
+
+    async def test_fields_are_projected_in_article_order(self):
+        result = await search_news("test query", "en", 5, fields=["url", "title"])
+
+        self.assertEqual(result["articles"], [
+            {"title": "Story 2", "url": "https://example.com/2"},
+            {"title": "Story 1", "url": "https://example.com/1"},
+        ])
+        self.assertEqual(result["cursor"], "2023-01-02T12:00:00Z")
+        self.assertIn("quota", result)
+
+    async def test_descriptions_are_capped(self):
+        result = await search_news("test query", "en", 5, max_description_length=11)
+
+        self.assertEqual([article["description"] for article in result["articles"]], ["A long des\u2026", "Description"])
+        self.assertEqual(result["articles"][1]["published_at"], "2023-01-01T12:00:00Z")
+
+    async def test_columns_layout_has_one_list_per_field(self):
+        result = await search_news("test query", "en", 5, fields=["title", "published_at"], layout="columns")
+
+        self.assertEqual(result["articles"], {
+            "title": ["Story 2", "Story 1"],
+            "published_at": ["2023-01-02T12:00:00Z", "2023-01-01T12:00:00Z"],
+        })
+
+    async def test_trimming_leaves_the_cached_result_untouched(self):
+        await search_news("test query", "en", 5, fields=["title"], max_description_length=3)
+
+        result = await search_news("test query", "en", 5)
+
+        self.mock_client.get_everything.assert_awaited_once()
+        self.assertEqual(result["articles"][0]["description"], "A long description of the second story")
+
+    async def test_invalid_options(self):
+        unknown_field = await search_news("test query", "en", 5, fields=["title", "content"])
+        no_fields = await search_news("test query", "en", 5, fields=[])
+        negative_length = await search_news("test query", "en", 5, max_description_length=-1)
+        unknown_layout = await search_news("test query", "en", 5, layout="table")
+
+        self.assertEqual(unknown_field["error"], "Invalid fields")
+        self.assertEqual(no_fields["error"], "Invalid fields")
+        self.assertEqual(negative_length["error"], "Invalid description length")
+        self.assertEqual(unknown_layout["error"], "Invalid layout")
+        self.mock_client.get_everything.assert_not_awaited()
+
+
+class TestSearchNewsQuota(unittest.IsolatedAsyncioTestCase):
+
+    def _exhausted_quota(self):
+        from src.services.quota import QuotaScheduler
+        quota = QuotaScheduler(name="NewsAPI", daily_limit=1, requests_per_second=0)
+        quota.mark_exhausted()
+        return quota
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_remaining_quota_is_reported(self, mock_config, mock_client):
+        from src.services.quota import QuotaScheduler
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_client.get_everything = AsyncMock(return_value={"status": "ok", "articles": []})
+
+        with use_quota(QuotaScheduler(name="NewsAPI", daily_limit=10, requests_per_second=0)):
+            result = await search_news("test query", "en", 5)
+
+        self.assertEqual(result["quota"]["daily_remaining"], 9)
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_exhausted_quota_returns_error_without_calling_api(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_config.NEWSAPI_QUOTA_WAIT_TIMEOUT = 1.0
+        mock_config.SEARCH_CACHE_STALE_IF_ERROR = 3600
+        mock_client.get_everything = AsyncMock()
+
+        with use_quota(self._exhausted_quota()):
+            result = await search_news("test query", "en", 5)
+
+        mock_client.get_everything.assert_not_awaited()
+        self.assertEqual(result["error"], "Quota exceeded")
+        self.assertGreater(result["retry_after"], 0)
+        self.assertEqual(result["quota"]["daily_remaining"], 0)
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_exhausted_quota_falls_back_to_local_index(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_config.NEWSAPI_QUOTA_WAIT_TIMEOUT = 1.0
+        mock_config.SEARCH_CACHE_STALE_IF_ERROR = 3600
+        mock_config.ARTICLE_STORE_MAX_AGE = 60
+        mock_client.get_everything = AsyncMock(return_value={
+            "status": "ok",
+            "articles": [{
+                "source": {"id": None, "name": "Test Source"},
+                "title": "Old story",
+                "description": "Description",
+                "url": "https://example.com/1",
+                "publishedAt": "2023-01-01T12:00:00Z"
+            }]
+        })
+        await search_news("test query", "en", 5)
+        search_cache.clear()
+
+        with use_quota(self._exhausted_quota()):
+            result = await search_news("test query", "en", 5)
+
+        mock_client.get_everything.assert_awaited_once()
+        self.assertEqual(result["served_from"], "local_index")
+        self.assertEqual(result["articles"][0]["title"], "Old story")
+
+class TestSearchNewsResilience(unittest.IsolatedAsyncioTestCase):
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_transient_error_is_retried_with_a_quota_token_per_attempt(self, mock_config, mock_client):
+        import httpx
+        from src.services.quota import QuotaScheduler
+        from src.services.resilience import CircuitBreaker, ResilientCaller, RetryBudget
+        from src.services.news_api import _is_transient_newsapi_error
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_client.get_everything = AsyncMock(side_effect=[
+            httpx.ConnectTimeout("timed out"),
+            {"status": "ok", "articles": []},
+        ])
+        caller = ResilientCaller("NewsAPI", _is_transient_newsapi_error, max_attempts=3, base_delay=0, max_delay=0,
+                                 retry_budget=RetryBudget(ratio=1.0, reserve=1),
+                                 breaker=CircuitBreaker("NewsAPI", failure_threshold=5, recovery_timeout=60))
+
+        with patch('src.services.news_api.newsapi_resilience', caller), \
+                use_quota(QuotaScheduler(name="NewsAPI", daily_limit=10, requests_per_second=0)):
+            result = await search_news("test query", "en", 5)
+
+        self.assertEqual(result["articles"], [])
+        self.assertEqual(mock_client.get_everything.await_count, 2)
+        self.assertEqual(result["quota"]["daily_remaining"], 8)
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_news.config')
+    async def test_open_circuit_returns_error_without_calling_api(self, mock_config, mock_client):
+        mock_config.NEWSAPI_API_KEY = "test_api_key"
+        mock_config.SEARCH_CACHE_STALE_IF_ERROR = 3600
+        mock_client.get_everything = AsyncMock()
+
+        from src.services.news_api import newsapi_resilience
+        newsapi_resilience.breaker.failure_threshold = 1
+        newsapi_resilience.breaker.recovery_timeout = 60
+        newsapi_resilience.breaker.record_failure()
+        result = await search_news("test query", "en", 5)
+
+        mock_client.get_everything.assert_not_awaited()
+        self.assertEqual(result["error"], "Upstream unavailable")
+        self.assertGreater(result["retry_after"], 0)
+
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from src.services.news_api import NewsApiError
+from src.tools.search_pages import iter_news_pages, search_news_pages
+
+NEWEST = datetime(2024, 1, 31, tzinfo=timezone.utc)
+
+
+def published_at(index):
+    """Articles are an hour apart, index 0 being the newest."""
+    return (NEWEST - timedelta(hours=index)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeNewsApi:
+    """Serves `total` articles sorted newest first and records the pages in flight."""
+
+    def __init__(self, total, delays=None, max_results=None):
+        self.total = total
+        self.delays = delays or {}
+        self.max_results = max_results
+        self.pages = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_everything(self, api_key, q, language, page_size, sort_by, page, from_date=None):
+        self.pages.append(page)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(page, 0.01))
+            if self.max_results is not None and (page - 1) * page_size >= self.max_results:
+                raise NewsApiError("You have requested too many results", "maximumResultsReached", 426)
+            first = (page - 1) * page_size
+            articles = [
+                {
+                    "source": {"id": None, "name": "Test Source"},
+                    "title": f"Story {index}",
+                    "description": "Description",
+                    "url": f"https://example.com/{index}",
+                    "publishedAt": published_at(index),
+                }
+                for index in range(first, min(first + page_size, self.total))
+            ]
+            return {"status": "ok", "totalResults": self.total, "articles": articles}
+        finally:
+            self.in_flight -= 1
+
+
+class TestIterNewsPages(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        config_patcher = patch('src.tools.search_pages.config.NEWSAPI_API_KEY', "test_api_key")
+        config_patcher.start()
+        self.addCleanup(config_patcher.stop)
+
+    def use_api(self, api):
+        client_patcher = patch('src.services.news_api.news_api_client', api)
+        client_patcher.start()
+        self.addCleanup(client_patcher.stop)
+        return api
+
+    async def collect(self, **kwargs):
+        return [batch async for batch in iter_news_pages("markets", "en", **kwargs)]
+
+    async def test_pages_are_fetched_concurrently_up_to_the_limit(self):
+        api = self.use_api(FakeNewsApi(total=1000, delays={2: 0.05}))
+
+        batches = await self.collect(max_articles=450, concurrency=2)
+
+        self.assertEqual(sorted(api.pages), [1, 2, 3, 4, 5])
+        self.assertEqual(api.max_in_flight, 2)
+        pages = [batch.page for batch in batches]
+        self.assertEqual(pages[0], 1)
+        # The slow page 2 is overtaken by page 3
+        self.assertLess(pages.index(3), pages.index(2))
+        sizes = {batch.page: len(batch.articles) for batch in batches}
+        self.assertEqual(sizes, {1: 100, 2: 100, 3: 100, 4: 100, 5: 50})
+
+    async def test_paging_stops_at_the_end_of_the_results(self):
+        api = self.use_api(FakeNewsApi(total=130))
+
+        batches = await self.collect(max_articles=1000, concurrency=4)
+
+        self.assertEqual(sorted(api.pages), [1, 2])
+        self.assertEqual(sum(len(batch.articles) for batch in batches), 130)
+
+    async def test_paging_stops_at_the_date_cutoff(self):
+        api = self.use_api(FakeNewsApi(total=1000))
+
+        batches = await self.collect(max_articles=1000, until=published_at(149), concurrency=1)
+
+        self.assertEqual(api.pages, [1, 2])
+        articles = [article for batch in batches for article in batch.articles]
+        self.assertEqual(len(articles), 150)
+        self.assertEqual(articles[-1]["published_at"], published_at(149))
+
+    async def test_maximum_results_reached_ends_paging(self):
+        self.use_api(FakeNewsApi(total=1000, max_results=100))
+
+        batches = await self.collect(max_articles=500, concurrency=2)
+
+        self.assertEqual([batch.page for batch in batches], [1])
+
+    async def test_stopping_iteration_cancels_pages_in_flight(self):
+        api = self.use_api(FakeNewsApi(total=1000, delays={3: 10.0}))
+
+        pages = iter_news_pages("markets", "en", max_articles=1000, concurrency=2)
+        async for batch in pages:
+            if batch.page == 2:
+                break
+        await pages.aclose()
+
+        self.assertEqual(api.in_flight, 0)
+
+
+class TestSearchNewsPages(unittest.IsolatedAsyncioTestCase):
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_pages.config.NEWSAPI_API_KEY', "test_api_key")
+    async def test_pages_are_returned_newest_first_and_streamed(self, mock_client):
+        api = FakeNewsApi(total=1000, delays={2: 0.05})
+        mock_client.get_everything = api.get_everything
+        ctx = AsyncMock()
+
+        result = await search_news_pages("markets", max_articles=300, ctx=ctx)
+
+        self.assertEqual(result["article_count"], 300)
+        self.assertEqual(result["page_count"], 3)
+        self.assertEqual(result["cursor"], published_at(0))
+        self.assertEqual([article["title"] for article in result["articles"][99:102]],
+                         ["Story 99", "Story 100", "Story 101"])
+        self.assertEqual(ctx.report_progress.await_count, 3)
+        progress, total, message = ctx.report_progress.await_args_list[-1].args
+        self.assertEqual((progress, total), (300, 300))
+        self.assertEqual(len(json.loads(message)["articles"]), 100)
+
+    @patch('src.services.news_api.news_api_client')
+    @patch('src.tools.search_pages.config.NEWSAPI_API_KEY', "test_api_key")
+    async def test_stream_only_leaves_articles_out_of_the_result(self, mock_client):
+        mock_client.get_everything = FakeNewsApi(total=150).get_everything
+
+        result = await search_news_pages("markets", max_articles=500, stream_only=True)
+
+        self.assertNotIn("articles", result)
+        self.assertEqual(result["article_count"], 150)
+
+    async def test_invalid_parameters(self):
+        with patch('src.tools.search_pages.config.NEWSAPI_API_KEY', "test_api_key"):
+            too_many = await search_news_pages("markets", max_articles=100000)
+            bad_date = await search_news_pages("markets", until="last week")
+
+        self.assertEqual(too_many["error"], "Invalid parameter")
+        self.assertEqual(bad_date["error"], "Invalid parameter")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from src.services.sentiment_reduce import chunk_articles, merge_entities, merge_packing_reports, merge_sentiments
+
+
+class TestSentimentReduce(unittest.TestCase):
+
+    def test_chunks_are_balanced(self):
+        chunks = chunk_articles(list(range(21)), 10)
+
+        self.assertEqual([len(chunk) for chunk in chunks], [7, 7, 7])
+        self.assertEqual([item for chunk in chunks for item in chunk], list(range(21)))
+        self.assertEqual(chunk_articles(list(range(4)), 10), [[0, 1, 2, 3]])
+
+    def test_sentiment_vote_is_weighted_by_articles_and_confidence(self):
+        results = [
+            {"overall_sentiment": "Positive", "sentiment_confidence": "High"},
+            {"overall_sentiment": "negative", "sentiment_confidence": "low"},
+            {"overall_sentiment": "negative", "sentiment_confidence": "low"},
+        ]
+        merged = merge_sentiments(results, [10, 10, 10])
+
+        self.assertEqual(merged["overall_sentiment"], "positive")
+        self.assertEqual(merged["sentiment_confidence"], "low")
+
+    def test_unanimous_confident_chunks_stay_confident(self):
+        results = [{"overall_sentiment": "neutral", "sentiment_confidence": "high"}] * 3
+        merged = merge_sentiments(results, [10, 10, 5])
+
+        self.assertEqual(merged, {"overall_sentiment": "neutral", "sentiment_confidence": "high"})
+
+    def test_entities_are_unioned_and_ranked_by_mentions(self):
+        results = [
+            {"key_entities": {"people": ["Alice", "Bob"], "organizations": ["Acme"], "locations": []}},
+            {"key_entities": {"people": ["bob", "Carol"], "organizations": [], "locations": ["Paris"]}},
+            {"key_entities": "not a dict"},
+        ]
+        merged = merge_entities(results)
+
+        self.assertEqual(merged["people"], ["Bob", "Alice", "Carol"])
+        self.assertEqual(merged["organizations"], ["Acme"])
+        self.assertEqual(merged["locations"], ["Paris"])
+
+    def test_packing_reports_are_summed(self):
+        report = {"token_budget": 100, "tokens_before": 150, "tokens_after": 100,
+                  "trimmed_tokens": 50, "truncated_descriptions": 2}
+        merged = merge_packing_reports([report, report])
+
+        self.assertEqual(merged["token_budget"], 100)
+        self.assertEqual(merged["tokens_before"], 300)
+        self.assertEqual(merged["truncated_descriptions"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,18 +1,15 @@
 import unittest
-import os
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
-class TestExtractKeyInfoAndSentiment(unittest.TestCase):
-    
-    def setUp(self):
-        """Check if API keys are available and skip tests if they aren't."""
-        if not os.environ.get('OPENAI_API_KEY'):
-            self.skipTest("Skipping test as missing API keys")
+from src.services.entity_extractor import LocalEntityExtractor
+
+class TestExtractKeyInfoAndSentiment(unittest.IsolatedAsyncioTestCase):
     
-    @patch('src.tools.sentiment_tool.search_news')
+    @patch('src.tools.sentiment_tool.config.LOCAL_SENTIMENT_CONFIDENCE_THRESHOLD', 1.1)
+    @patch('src.tools.sentiment_tool.search_news', new_callable=AsyncMock)
     @patch('src.tools.sentiment_tool.llm_service')
-    def test_successful_sentiment_analysis(self, mock_llm_service, mock_search_news):
+    async def test_successful_sentiment_analysis(self, mock_llm_service, mock_search_news):
         # Mock search_news to return sample articles
         mock_search_news.return_value = {
             "articles": [
@@ -34,7 +31,7 @@ class TestExtractKeyInfoAndSentiment(unittest.TestCase):
         }
         
         # Mock the LLM service to return sentiment analysis
-        mock_llm_service.analyze_sentiment.return_value = {
+        mock_llm_service.aanalyze_sentiment = AsyncMock(return_value={
             "overall_sentiment": "Positive",
             "sentiment_confidence": "Medium",
             "key_entities": {
@@ -42,18 +39,22 @@ class TestExtractKeyInfoAndSentiment(unittest.TestCase):
                 "organizations": ["Company A", "Investment Fund B"],
                 "locations": ["Region C", "Europe"]
             },
-            "key_takeaway_summary": "Significant growth in renewable energy investments across Europe with Region C leading the transition."
-        }
+            "key_takeaway_summary": "Significant growth in renewable energy investments across Europe with Region C leading the transition.",
+            "prompt_packing": {"token_budget": 3000, "tokens_before": 40, "tokens_after": 40,
+                               "trimmed_tokens": 0, "truncated_descriptions": 0}
+        })
         
         # Call the function with a test query
         from src.tools.sentiment_tool import extract_key_info_and_sentiment
-        result = extract_key_info_and_sentiment("renewable energy investment", "en", 2)
+        result = await extract_key_info_and_sentiment("renewable energy investment", "en", 2)
         
         # Verify that search_news was called with the correct parameters
-        mock_search_news.assert_called_with("renewable energy investment", "en", 2)
+        mock_search_news.assert_awaited_with("renewable energy investment", "en", 2)
         
         # Verify that the LLM service was called with the correct parameters
-        mock_llm_service.analyze_sentiment.assert_called_with("renewable energy investment", mock_search_news.return_value["articles"])
+        mock_llm_service.aanalyze_sentiment.assert_awaited_with(
+            "renewable energy investment", mock_search_news.return_value["articles"], on_field=None
+        )
         
         # Verify the function returned the expected result
         self.assertEqual(result["status"], "success")
@@ -66,57 +67,89 @@ class TestExtractKeyInfoAndSentiment(unittest.TestCase):
         self.assertEqual(result["result"]["key_entities"]["locations"], ["Region C", "Europe"])
         self.assertEqual(result["result"]["key_takeaway_summary"], 
                          "Significant growth in renewable energy investments across Europe with Region C leading the transition.")
+        self.assertEqual(result["metadata"]["prompt_packing"]["trimmed_tokens"], 0)
+        self.assertEqual(result["metadata"]["analysis_tier"], "llm")
+        self.assertEqual(result["metadata"]["entity_source"], "llm")
+        self.assertEqual(result["metadata"]["deduplication"]["unique_article_count"], 2)
+    
+    @patch('src.tools.sentiment_tool.search_news', new_callable=AsyncMock)
+    @patch('src.tools.sentiment_tool.llm_service')
+    async def test_confident_local_sentiment_skips_llm(self, mock_llm_service, mock_search_news):
+        mock_search_news.return_value = {
+            "articles": [
+                {"title": "Apple shares soar after record profits", "description": "Strong growth and upbeat outlook"},
+                {"title": "Apple celebrates breakthrough in Paris", "description": "Analysts praise the robust recovery"}
+            ]
+        }
+        mock_llm_service.aanalyze_sentiment = AsyncMock()
+        extractor = LocalEntityExtractor({
+            "people": ["Tim Cook"], "organizations": ["Apple"], "locations": ["Paris"]
+        })
+        
+        from src.tools.sentiment_tool import extract_key_info_and_sentiment, sentiment_escalations
+        local_answers_before = sentiment_escalations.stats()["local_answers"]
+        with patch('src.tools.sentiment_tool.local_entity_extractor', extractor):
+            result = await extract_key_info_and_sentiment("markets", "en", 2)
+        
+        mock_llm_service.aanalyze_sentiment.assert_not_awaited()
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["result"]["overall_sentiment"], "positive")
+        self.assertEqual(result["metadata"]["analysis_tier"], "local")
+        self.assertEqual(result["metadata"]["entity_source"], "gazetteer")
+        self.assertEqual(result["result"]["key_entities"],
+                         {"people": [], "organizations": ["Apple"], "locations": ["Paris"]})
+        self.assertEqual(sentiment_escalations.stats()["local_answers"], local_answers_before + 1)
     
-    def test_empty_query(self):
+    async def test_empty_query(self):
         # Test with an empty query
         from src.tools.sentiment_tool import extract_key_info_and_sentiment
-        result = extract_key_info_and_sentiment("", "en")
+        result = await extract_key_info_and_sentiment("", "en")
         
         # Verify the error response
         self.assertIn("error", result)
         self.assertEqual(result["error"], "Query parameter is required")
     
-    def test_invalid_max_articles(self):
+    async def test_invalid_max_articles(self):
         # Test with invalid max_articles_to_analyze
         from src.tools.sentiment_tool import extract_key_info_and_sentiment
-        result = extract_key_info_and_sentiment("test query", "en", 15)
+        result = await extract_key_info_and_sentiment("test query", "en", 101)
         
         # Verify the error response
         self.assertIn("error", result)
         self.assertEqual(result["error"], "Invalid parameter")
-        self.assertEqual(result["message"], "max_articles_to_analyze must be between 1 and 10")
+        self.assertEqual(result["message"], "max_articles_to_analyze must be between 1 and 100")
     
-    @patch('src.tools.sentiment_tool.search_news')
-    def test_no_articles_found(self, mock_search_news):
+    @patch('src.tools.sentiment_tool.search_news', new_callable=AsyncMock)
+    async def test_no_articles_found(self, mock_search_news):
         # Mock search_news to return no articles
         mock_search_news.return_value = {"articles": []}
         
         # Call the function with a test query
         from src.tools.sentiment_tool import extract_key_info_and_sentiment
-        result = extract_key_info_and_sentiment("nonexistent topic", "en")
+        result = await extract_key_info_and_sentiment("nonexistent topic", "en")
         
         # Verify the error response
         self.assertIn("error", result)
         self.assertEqual(result["error"], "No articles found")
         self.assertIn("No articles found for query", result["message"])
     
-    @patch('src.tools.sentiment_tool.search_news')
-    def test_search_error(self, mock_search_news):
+    @patch('src.tools.sentiment_tool.search_news', new_callable=AsyncMock)
+    async def test_search_error(self, mock_search_news):
         # Mock search_news to return an error
         mock_search_news.return_value = {"error": "API error", "message": "Rate limit exceeded"}
         
         # Call the function with a test query
         from src.tools.sentiment_tool import extract_key_info_and_sentiment
-        result = extract_key_info_and_sentiment("test query", "en")
+        result = await extract_key_info_and_sentiment("test query", "en")
         
         # Verify that the search error is propagated
         self.assertIn("error", result)
         self.assertEqual(result["error"], "API error")
         self.assertEqual(result["message"], "Rate limit exceeded")
     
-    @patch('src.tools.sentiment_tool.search_news')
+    @patch('src.tools.sentiment_tool.search_news', new_callable=AsyncMock)
     @patch('src.tools.sentiment_tool.llm_service')
-    def test_llm_processing_error(self, mock_llm_service, mock_search_news):
+    async def test_llm_processing_error(self, mock_llm_service, mock_search_news):
         mock_search_news.return_value = {
             "articles": [
                 {
@@ -129,10 +162,10 @@ class TestExtractKeyInfoAndSentiment(unittest.TestCase):
             ]
         }
         
-        mock_llm_service.analyze_sentiment.side_effect = Exception("LLM API Error")
+        mock_llm_service.aanalyze_sentiment = AsyncMock(side_effect=Exception("LLM API Error"))
         
         from src.tools.sentiment_tool import extract_key_info_and_sentiment
-        result = extract_key_info_and_sentiment("test query", "en")
+        result = await extract_key_info_and_sentiment("test query", "en")
         
         self.assertIn("error", result)
         self.assertEqual(result["error"], "LLM processing error")
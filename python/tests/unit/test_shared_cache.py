@@ -0,0 +1,168 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from src.services.cache import CacheState
+from src.services.shared_cache import SqliteTTLCache
+
+
+class TestSqliteTTLCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "search_cache.db")
+        self.cache = self.open_cache()
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def open_cache(self, **overrides):
+        options = {"max_bytes": 1000, "ttl": 10, "stale_while_revalidate": 5, "stale_if_error": 60, **overrides}
+        return SqliteTTLCache(name="test", path=self.path, **options)
+
+    @patch('src.services.shared_cache.time.time')
+    def test_entry_states_follow_its_age(self, mock_time):
+        mock_time.return_value = 100.0
+        self.cache.set(("markets", "en", 5), {"articles": []})
+
+        mock_time.return_value = 105.0
+        self.assertEqual(self.cache.get(("markets", "en", 5)).state, CacheState.FRESH)
+
+        mock_time.return_value = 112.0
+        self.assertEqual(self.cache.get(("markets", "en", 5)).state, CacheState.STALE)
+
+        mock_time.return_value = 130.0
+        lookup = self.cache.get(("markets", "en", 5))
+        self.assertEqual(lookup.state, CacheState.EXPIRED)
+        self.assertEqual(lookup.value, {"articles": []})
+
+        mock_time.return_value = 200.0
+        self.assertEqual(self.cache.get(("markets", "en", 5)).state, CacheState.MISS)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_entries_are_shared_between_instances(self):
+        other_worker = self.open_cache()
+        self.addCleanup(other_worker.close)
+
+        self.cache.set(("markets", "en", 5), {"articles": [{"title": "Shared"}]})
+        lookup = other_worker.get(("markets", "en", 5))
+
+        self.assertEqual(lookup.state, CacheState.FRESH)
+        self.assertEqual(lookup.value["articles"][0]["title"], "Shared")
+        self.assertEqual(other_worker.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+    def test_lru_eviction_by_size(self):
+        cache = self.open_cache(max_bytes=40)
+        cache.set("a", "x" * 10)
+        cache.set("b", "y" * 10)
+        cache.set("c", "z" * 10)
+        cache.get("a")
+        cache.set("d", "w" * 10)
+
+        self.assertEqual(cache.get("a").state, CacheState.FRESH)
+        self.assertEqual(cache.get("b").state, CacheState.MISS)
+        self.assertEqual(cache.get("d").state, CacheState.FRESH)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.stats()["bytes"], 40)
+
+    def test_peek_leaves_counters_alone(self):
+        self.cache.set("key", {"articles": []})
+
+        self.assertEqual(self.cache.peek("key").value, {"articles": []})
+        self.assertEqual(self.cache.peek("missing").state, CacheState.MISS)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (0, 0))
+
+    def test_refresh_lease_is_exclusive_across_instances(self):
+        other_worker = self.open_cache()
+        self.addCleanup(other_worker.close)
+
+        self.assertTrue(self.cache.try_begin_refresh("key"))
+        self.assertFalse(other_worker.try_begin_refresh("key"))
+        self.assertTrue(other_worker.try_begin_fetch("key"))
+        self.cache.end_refresh("key")
+        self.assertTrue(other_worker.try_begin_refresh("key"))
+
+    def test_lease_expires_when_its_holder_does_not_release_it(self):
+        cache = self.open_cache(lease_seconds=10)
+        with patch('src.services.shared_cache.time.time', return_value=100.0):
+            self.assertTrue(cache.try_begin_fetch("key"))
+        with patch('src.services.shared_cache.time.time', return_value=105.0):
+            self.assertFalse(cache.try_begin_fetch("key"))
+        with patch('src.services.shared_cache.time.time', return_value=111.0):
+            self.assertTrue(cache.try_begin_fetch("key"))
+
+    async def test_waiter_receives_the_value_fetched_by_another_worker(self):
+        other_worker = self.open_cache()
+        self.addCleanup(other_worker.close)
+        self.assertTrue(other_worker.try_begin_fetch("key"))
+
+        async def finish_fetch():
+            await asyncio.sleep(0.1)
+            other_worker.set("key", {"articles": [{"title": "Fetched"}]})
+            other_worker.end_fetch("key")
+
+        lookup, _ = await asyncio.gather(self.cache.wait_for_fetch("key"), finish_fetch())
+
+        self.assertEqual(lookup.state, CacheState.FRESH)
+        self.assertEqual(lookup.value["articles"][0]["title"], "Fetched")
+        self.assertEqual(self.cache.stats()["fetch_waits"], 1)
+
+
+    def last_used_at(self, key):
+        return self.cache._connection.execute(
+            "SELECT last_used_at FROM cache_entries WHERE key = ?", (self.cache._encode_key(key),)
+        ).fetchone()[0]
+
+    @patch('src.services.shared_cache.time.time')
+    def test_reads_record_recency_in_batches(self, mock_time):
+        mock_time.return_value = 100.0
+        cache = self.open_cache()
+        cache.set("key", "value")
+
+        mock_time.return_value = 102.0
+        cache.get("key")
+        self.assertEqual(self.last_used_at("key"), 100.0)
+
+        mock_time.return_value = 106.0
+        cache.get("key")
+        self.assertEqual(self.last_used_at("key"), 106.0)
+
+        mock_time.return_value = 107.0
+        cache.get("key")
+        cache.set("other", "value")
+        self.assertEqual(self.last_used_at("key"), 107.0)
+
+    def test_locked_database_is_waited_for_briefly(self):
+        busy_timeout_ms = self.cache._connection.execute("PRAGMA busy_timeout").fetchone()[0]
+
+        self.assertEqual(busy_timeout_ms, 500)
+
+    async def test_waiting_checks_the_lease_off_the_event_loop(self):
+        other_worker = self.open_cache()
+        self.addCleanup(other_worker.close)
+        self.assertTrue(other_worker.try_begin_fetch("key"))
+        threads = set()
+        lease_held = self.cache._lease_held
+
+        def record_thread(lease_key):
+            threads.add(threading.current_thread())
+            return lease_held(lease_key)
+
+        async def finish_fetch():
+            await asyncio.sleep(0.1)
+            other_worker.end_fetch("key")
+
+        with patch.object(self.cache, '_lease_held', side_effect=record_thread):
+            await asyncio.gather(self.cache.wait_for_fetch("key"), finish_fetch())
+
+        self.assertNotIn(threading.main_thread(), threads)
+
+
+if __name__ == '__main__':
+    unittest.main()
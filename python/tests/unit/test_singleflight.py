@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+
+from src.services.singleflight import AsyncSingleFlight
+
+
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def slow_call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        results = await asyncio.gather(*[flight.do("key", slow_call) for _ in range(10)])
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 10)
+        self.assertEqual(flight.stats(), {"in_flight": 0, "coalesced": 9})
+
+    async def test_error_reaches_every_caller(self):
+        flight = AsyncSingleFlight()
+
+        async def failing_call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(*[flight.do("key", failing_call) for _ in range(3)], return_exceptions=True)
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    async def test_cancelling_one_caller_keeps_call_for_others(self):
+        flight = AsyncSingleFlight()
+        started = asyncio.Event()
+
+        async def slow_call():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "result"
+
+        first = asyncio.create_task(flight.do("key", slow_call))
+        second = asyncio.create_task(flight.do("key", slow_call))
+        await started.wait()
+        first.cancel()
+
+        self.assertEqual(await second, "result")
+        self.assertTrue(first.cancelled())
+
+    async def test_cancelling_all_callers_cancels_call(self):
+        flight = AsyncSingleFlight()
+        started = asyncio.Event()
+        finished = []
+
+        async def slow_call():
+            started.set()
+            await asyncio.sleep(1)
+            finished.append(1)
+
+        caller = asyncio.create_task(flight.do("key", slow_call))
+        await started.wait()
+        caller.cancel()
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(finished, [])
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from src.services.streaming_json import IncrementalJsonObjectParser
+
+
+class TestIncrementalJsonObjectParser(unittest.TestCase):
+
+    def _feed_in_chunks(self, text, size):
+        parser = IncrementalJsonObjectParser()
+        events = []
+        for start in range(0, len(text), size):
+            for field in parser.feed(text[start:start + size]):
+                events.append((start, field))
+        return parser, events
+
+    def test_fields_are_emitted_as_soon_as_complete(self):
+        text = '```json\n{"people": ["Jane"], "count": 3, "summary": "a, b} c"}\n```'
+        parser, events = self._feed_in_chunks(text, 1)
+
+        self.assertEqual([field for _, field in events],
+                         [("people", ["Jane"]), ("count", 3), ("summary", "a, b} c")])
+        self.assertEqual(events[0][0], text.index("]"))
+        self.assertTrue(parser.done)
+
+    def test_nested_objects_and_escaped_quotes(self):
+        text = '{"key_entities": {"people": ["A \\"B\\""], "locations": []}, "flag": true}'
+        _, events = self._feed_in_chunks(text, 4)
+
+        self.assertEqual([field for _, field in events],
+                         [("key_entities", {"people": ['A "B"'], "locations": []}), ("flag", True)])
+
+    def test_unparseable_field_is_skipped(self):
+        parser = IncrementalJsonObjectParser()
+        fields = parser.feed('{"bad": [1,], "good": "yes"}')
+
+        self.assertEqual(fields, [("good", "yes")])
+
+    def test_text_after_the_object_is_ignored(self):
+        parser = IncrementalJsonObjectParser()
+        parser.feed('{"a": 1}')
+
+        self.assertEqual(parser.feed('{"b": 2}'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+from unittest.mock import patch
+
+import httpx
+from starlette.testclient import TestClient
+
+from src.supervisor import (StickyRouter, Worker, create_router_app, merge_worker_metrics, split_limit, worker_env,
+                            worker_message_path)
+
+
+def make_workers(count):
+    workers = [Worker(index, 9000 + index, {}) for index in range(count)]
+    for worker in workers:
+        worker.ready = True
+    return workers
+
+
+class TestWorkerEnvironment(unittest.TestCase):
+
+    def test_limits_are_split_without_exceeding_the_total(self):
+        self.assertEqual([split_limit(100, 3, index) for index in range(3)], [34, 33, 33])
+        self.assertEqual(split_limit(0, 3, 1), 0)
+        self.assertEqual(split_limit(2, 4, 3), 1)
+
+    @patch('src.supervisor.config')
+    def test_worker_env_pins_the_message_path_and_shares_the_search_cache(self, mock_config):
+        mock_config.SEARCH_CACHE_PATH = "/data/search.db"
+        mock_config.NEWSAPI_DAILY_LIMIT = 100
+        mock_config.NEWSAPI_REQUESTS_PER_SECOND = 1.0
+        mock_config.NEWSAPI_BURST = 5
+
+        env = worker_env(1, 3002, 2, {"OPENAI_API_KEY": "sk-test"})
+
+        self.assertEqual(env["FASTMCP_SERVER_MESSAGE_PATH"], "/workers/1/messages/")
+        self.assertEqual(env["SEARCH_CACHE_PATH"], "/data/search.db")
+        self.assertEqual((env["PORT"], env["WORKERS"], env["HOST"]), ("3002", "1", "127.0.0.1"))
+        self.assertEqual((env["WORKER_INDEX"], env["WORKER_COUNT"]), ("1", "2"))
+        self.assertEqual(env["NEWSAPI_DAILY_LIMIT"], "50")
+        self.assertEqual(env["NEWSAPI_REQUESTS_PER_SECOND"], "0.5")
+        self.assertEqual(env["NEWSAPI_BURST"], "2")
+        self.assertEqual(env["OPENAI_API_KEY"], "sk-test")
+
+
+class TestStickyRouter(unittest.TestCase):
+
+    def test_session_messages_go_to_the_worker_in_their_path(self):
+        workers = make_workers(3)
+        router = StickyRouter(workers)
+
+        self.assertIs(router.pick(worker_message_path(2) + "?session_id=abc"), workers[2])
+        self.assertIsNone(router.pick("/workers/7/messages/"))
+
+    def test_new_streams_go_to_the_least_busy_ready_worker(self):
+        workers = make_workers(3)
+        workers[0].open_streams = 2
+        workers[2].ready = False
+        router = StickyRouter(workers)
+
+        self.assertIs(router.pick("/"), workers[1])
+        workers[1].open_streams = 2
+        self.assertEqual([router.pick("/").index for _ in range(2)], [0, 1])
+
+    def test_requests_are_forwarded_with_path_query_and_body(self):
+        received = []
+
+        def handler(request):
+            received.append((request.url.port, request.url.path, request.url.query, request.content))
+            return httpx.Response(202, stream=httpx.ByteStream(b"Accepted"))
+
+        workers = make_workers(2)
+        router = StickyRouter(workers, transport=httpx.MockTransport(handler))
+        with TestClient(create_router_app(workers, router, manage_workers=False)) as client:
+            response = client.post("/workers/1/messages/?session_id=abc", content=b'{"jsonrpc": "2.0"}')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(received, [(9001, "/workers/1/messages/", b"session_id=abc", b'{"jsonrpc": "2.0"}')])
+
+    def test_event_stream_count_is_released_when_the_stream_ends(self):
+        workers = make_workers(1)
+        transport = httpx.MockTransport(lambda request: httpx.Response(
+            200, headers={"content-type": "text/event-stream"},
+            stream=httpx.ByteStream(b"event: endpoint\ndata: /workers/0/messages/\n\n"),
+        ))
+        router = StickyRouter(workers, transport=transport)
+        with TestClient(create_router_app(workers, router, manage_workers=False)) as client:
+            response = client.get("/")
+
+        self.assertIn(b"/workers/0/messages/", response.content)
+        self.assertEqual(workers[0].open_streams, 0)
+
+    def test_worker_scrape_routes_reach_that_worker(self):
+        received = []
+
+        def handler(request):
+            received.append((request.url.port, request.url.path))
+            return httpx.Response(200, stream=httpx.ByteStream(b"ok"))
+
+        workers = make_workers(3)
+        router = StickyRouter(workers, transport=httpx.MockTransport(handler))
+        with TestClient(create_router_app(workers, router, manage_workers=False)) as client:
+            client.get("/workers/2/metrics")
+            client.get("/workers/1/stats")
+
+        self.assertEqual(received, [(9002, "/metrics"), (9001, "/stats")])
+
+    def test_stats_and_metrics_are_collected_from_every_worker(self):
+        def handler(request):
+            index = request.url.port - 9000
+            if request.url.path == "/stats":
+                return httpx.Response(200, json={"search_cache": {"hits": index}})
+            return httpx.Response(200, text=(
+                "# HELP tool_calls_total Tool calls\n# TYPE tool_calls_total counter\n"
+                f'tool_calls_total{{tool="search_news"}} {index + 1}\n'
+                "# HELP in_flight In-flight calls\n# TYPE in_flight gauge\n"
+                f"in_flight {index}\n"
+            ))
+
+        workers = make_workers(3)
+        workers[2].ready = False
+        router = StickyRouter(workers, transport=httpx.MockTransport(handler))
+        with TestClient(create_router_app(workers, router, manage_workers=False)) as client:
+            stats = client.get("/stats").json()
+            metrics = client.get("/metrics").text
+
+        self.assertEqual(stats["workers"], {"0": {"search_cache": {"hits": 0}}, "1": {"search_cache": {"hits": 1}},
+                                            "2": None})
+        self.assertEqual(metrics.splitlines(), [
+            "# HELP tool_calls_total Tool calls",
+            "# TYPE tool_calls_total counter",
+            'tool_calls_total{worker="0",tool="search_news"} 1',
+            'tool_calls_total{worker="1",tool="search_news"} 2',
+            "# HELP in_flight In-flight calls",
+            "# TYPE in_flight gauge",
+            'in_flight{worker="0"} 0',
+            'in_flight{worker="1"} 1',
+        ])
+
+    def test_merged_metrics_keep_histogram_series_together(self):
+        exposition = ("# HELP latency Latency\n# TYPE latency histogram\n"
+                      'latency_bucket{le="+Inf"} 1\nlatency_sum 0.5\nlatency_count 1\n')
+
+        merged = merge_worker_metrics({0: exposition, 1: exposition})
+
+        self.assertEqual(merged.splitlines()[2:], [
+            'latency_bucket{worker="0",le="+Inf"} 1', 'latency_sum{worker="0"} 0.5', 'latency_count{worker="0"} 1',
+            'latency_bucket{worker="1",le="+Inf"} 1', 'latency_sum{worker="1"} 0.5', 'latency_count{worker="1"} 1',
+        ])
+
+    @patch('src.supervisor.READY_WAIT_TIMEOUT', 0.1)
+    def test_no_ready_worker_is_reported_as_unavailable(self):
+        workers = make_workers(2)
+        for worker in workers:
+            worker.ready = False
+        with TestClient(create_router_app(workers, manage_workers=False)) as client:
+            response = client.get("/")
+            status = client.get("/workers").json()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["error"], "Worker unavailable")
+        self.assertEqual([worker["ready"] for worker in status["workers"]], [False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
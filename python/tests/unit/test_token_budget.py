@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+
+from src.services.token_budget import count_tokens, pack_articles, truncate_to_tokens, ARTICLE_OVERHEAD_TOKENS
+
+MODEL = "gpt-4o-mini"
+
+
+@patch('src.services.token_budget._get_encoding', return_value=None)
+class TestTokenBudget(unittest.TestCase):
+
+    def _article(self, title, description):
+        return {"title": title, "description": description, "url": "https://example.com"}
+
+    def test_count_tokens_estimates_without_tokenizer(self, _):
+        self.assertEqual(count_tokens("", MODEL), 0)
+        self.assertEqual(count_tokens("abcd", MODEL), 1)
+        self.assertEqual(count_tokens("abcde", MODEL), 2)
+
+    def test_truncate_to_tokens_marks_the_cut(self, _):
+        self.assertEqual(truncate_to_tokens("short", 10, MODEL), "short")
+        truncated = truncate_to_tokens("x" * 100, 5, MODEL)
+        self.assertTrue(truncated.endswith("..."))
+        self.assertLessEqual(count_tokens(truncated, MODEL), 5)
+
+    def test_articles_under_budget_are_unchanged(self, _):
+        articles = [self._article("Title", "A short description")]
+        packed, report = pack_articles(articles, 1000, MODEL)
+
+        self.assertIs(packed, articles)
+        self.assertEqual(report["trimmed_tokens"], 0)
+        self.assertEqual(report["truncated_descriptions"], 0)
+        self.assertEqual(report["tokens_before"], report["tokens_after"])
+
+    def test_longest_descriptions_are_truncated_first(self, _):
+        articles = [
+            self._article("Tttt", "s" * 40),
+            self._article("Tttt", "l" * 400),
+            self._article("Tttt", None),
+        ]
+        budget = 3 * (1 + ARTICLE_OVERHEAD_TOKENS) + 10 + 40
+        packed, report = pack_articles(articles, budget, MODEL)
+
+        self.assertEqual(packed[0]["description"], "s" * 40)
+        self.assertTrue(packed[1]["description"].endswith("..."))
+        self.assertIsNone(packed[2]["description"])
+        self.assertEqual([article["title"] for article in packed], ["Tttt"] * 3)
+        self.assertEqual(articles[1]["description"], "l" * 400)
+
+        self.assertEqual(report["truncated_descriptions"], 1)
+        self.assertLessEqual(report["tokens_after"], budget)
+        self.assertEqual(report["trimmed_tokens"], report["tokens_before"] - report["tokens_after"])
+
+    def test_titles_are_kept_when_they_exceed_the_budget(self, _):
+        articles = [self._article("T" * 40, "d" * 40)]
+        packed, report = pack_articles(articles, 5, MODEL)
+
+        self.assertEqual(packed[0]["title"], "T" * 40)
+        self.assertEqual(packed[0]["description"], "")
+        self.assertGreater(report["tokens_after"], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
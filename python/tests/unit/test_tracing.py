@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from src.services.tracing import (
+    JsonFileSpanExporter, OtlpHttpSpanExporter, Tracer, annotate, current_span, trace_tool, traced, tracer,
+)
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+class TestTracer(unittest.IsolatedAsyncioTestCase):
+
+    async def test_spans_nest_across_awaits_and_gathered_tasks(self):
+        exporter = RecordingExporter()
+        test_tracer = Tracer(exporter)
+
+        async def child(index):
+            with test_tracer.span("child", index=index):
+                await asyncio.sleep(0)
+
+        with test_tracer.span("root") as root:
+            await asyncio.gather(child(0), child(1))
+        test_tracer.flush()
+
+        children = [span for span in exporter.spans if span.name == "child"]
+        self.assertEqual(len(children), 2)
+        self.assertTrue(all(span.parent_id == root.span_id for span in children))
+        self.assertTrue(all(span.trace_id == root.trace_id for span in exporter.spans))
+        self.assertIsNone(root.parent_id)
+        self.assertIsNone(current_span())
+
+    def test_exceptions_mark_the_span_as_failed(self):
+        exporter = RecordingExporter()
+        test_tracer = Tracer(exporter)
+
+        with self.assertRaises(ValueError):
+            with test_tracer.span("failing"):
+                raise ValueError("bad output")
+        test_tracer.flush()
+
+        self.assertEqual(exporter.spans[0].error, "ValueError: bad output")
+        self.assertEqual(exporter.spans[0].to_dict()["status"], "error")
+
+    async def test_traced_and_annotate_use_the_current_span(self):
+        @traced("parse")
+        def parse(text):
+            annotate(length=len(text))
+            return current_span()
+
+        span = parse("abc")
+
+        self.assertEqual(span.name, "parse")
+        self.assertEqual(span.attributes, {"length": 3})
+
+    async def test_trace_tool_returns_the_trace_id_in_metadata(self):
+        async def sample_tool(query: str) -> dict:
+            """Sample tool."""
+            annotate(article_count=2)
+            self.assertEqual(current_span().attributes["query"], query)
+            return {"status": "success", "metadata": {"analysis_tier": "local"}}
+
+        result = await trace_tool(sample_tool)(query="markets")
+
+        self.assertEqual(result["metadata"]["analysis_tier"], "local")
+        self.assertRegex(result["metadata"]["trace_id"], r"^[0-9a-f]{32}$")
+
+    async def test_tool_calls_start_separate_traces(self):
+        async def sample_tool(query: str) -> dict:
+            return {"error": "No articles found"}
+
+        first = await trace_tool(sample_tool)(query="a")
+        with tracer.span("unrelated"):
+            second = await trace_tool(sample_tool)(query="b")
+
+        self.assertNotEqual(first["metadata"]["trace_id"], second["metadata"]["trace_id"])
+
+
+class TestSpanExporters(unittest.TestCase):
+
+    def test_json_file_exporter_writes_one_line_per_span(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            test_tracer = Tracer(JsonFileSpanExporter(path))
+            with test_tracer.span("root", query="markets"):
+                with test_tracer.span("llm.invoke", prompt_tokens=120):
+                    pass
+            test_tracer.flush()
+
+            with open(path, encoding="utf-8") as trace_file:
+                spans = [json.loads(line) for line in trace_file]
+
+        self.assertEqual([span["name"] for span in spans], ["llm.invoke", "root"])
+        self.assertEqual(spans[0]["parent_id"], spans[1]["span_id"])
+        self.assertEqual(spans[0]["attributes"], {"prompt_tokens": 120})
+
+    def test_otlp_exporter_posts_json_encoded_spans(self):
+        requests = []
+
+        def handler(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, json={})
+
+        exporter = OtlpHttpSpanExporter("http://collector:4318/v1/traces", "news-mcp-server")
+        exporter._client = httpx.Client(transport=httpx.MockTransport(handler))
+        test_tracer = Tracer(exporter)
+        with test_tracer.span("search.fetch", page_size=5, query="markets"):
+            pass
+        test_tracer.flush()
+
+        resource_spans = requests[0]["resourceSpans"][0]
+        span = resource_spans["scopeSpans"][0]["spans"][0]
+        self.assertEqual(resource_spans["resource"]["attributes"][0]["value"], {"stringValue": "news-mcp-server"})
+        self.assertEqual(span["name"], "search.fetch")
+        self.assertEqual(len(span["traceId"]), 32)
+        self.assertNotIn("parentSpanId", span)
+        self.assertIn({"key": "page_size", "value": {"intValue": "5"}}, span["attributes"])
+        self.assertEqual(span["status"], {"code": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()